@@ -0,0 +1,377 @@
+/**
+ * Benchmarks replacing a refreshed view with `outerHTML` against morphing it, without a browser.
+ *
+ * The client runs on a minimal DOM stand-in that counts the work done on the live document:
+ * nodes attached and detached (which need style recalculation and layout), attribute and text writes.
+ * The times measure the stand-in, the counts are what a browser would have to process.
+ *
+ * Usage:
+ *    node benchmarks/morph.js [rows]
+ */
+
+const path = require("path");
+
+const VOID_TAGS = new Set(["br", "hr", "img", "input", "link", "meta"]);
+
+const stats = {};
+
+function resetStats() {
+  Object.assign(stats, {
+    attached: 0,
+    detached: 0,
+    attributeWrites: 0,
+    textWrites: 0,
+    actions: 0,
+  });
+}
+
+function subtreeSize(node) {
+  return node.childNodes.reduce((size, child) => size + subtreeSize(child), 1);
+}
+
+class FakeNode {
+  constructor(nodeType, nodeName) {
+    this.nodeType = nodeType;
+    this.nodeName = nodeName;
+    this.parentNode = null;
+    this.childNodes = [];
+  }
+
+  get isConnected() {
+    let node = this;
+    while (node.parentNode) {
+      node = node.parentNode;
+    }
+    return node === document.documentElement;
+  }
+
+  get parentElement() {
+    return this.parentNode && this.parentNode.nodeType === 1
+      ? this.parentNode
+      : null;
+  }
+
+  get firstChild() {
+    return this.childNodes[0] || null;
+  }
+
+  get nextSibling() {
+    if (!this.parentNode) {
+      return null;
+    }
+    const siblings = this.parentNode.childNodes;
+    return siblings[siblings.indexOf(this) + 1] || null;
+  }
+
+  insertBefore(node, ref) {
+    const nodes = node.nodeType === 11 ? [...node.childNodes] : [node];
+    for (const child of nodes) {
+      if (child.parentNode) {
+        child.parentNode.detach(child);
+      }
+      const index = ref ? this.childNodes.indexOf(ref) : -1;
+      if (index === -1) {
+        this.childNodes.push(child);
+      } else {
+        this.childNodes.splice(index, 0, child);
+      }
+      child.parentNode = this;
+      if (this.isConnected) {
+        stats.attached += subtreeSize(child);
+      }
+    }
+    return node;
+  }
+
+  detach(child) {
+    if (this.isConnected) {
+      stats.detached += subtreeSize(child);
+    }
+    this.childNodes.splice(this.childNodes.indexOf(child), 1);
+    child.parentNode = null;
+  }
+
+  remove() {
+    if (this.parentNode) {
+      this.parentNode.detach(this);
+    }
+  }
+
+  replaceWith(node) {
+    this.parentNode.insertBefore(node, this);
+    this.remove();
+  }
+
+  isEqualNode(other) {
+    if (
+      this.nodeType !== other.nodeType ||
+      this.nodeName !== other.nodeName ||
+      this.data !== other.data ||
+      this.childNodes.length !== other.childNodes.length
+    ) {
+      return false;
+    }
+    if (this.nodeType === 1) {
+      if (this.attrs.size !== other.attrs.size) {
+        return false;
+      }
+      for (const [name, value] of this.attrs) {
+        if (other.attrs.get(name) !== value) {
+          return false;
+        }
+      }
+    }
+    return this.childNodes.every((child, i) =>
+      child.isEqualNode(other.childNodes[i])
+    );
+  }
+}
+
+class FakeText extends FakeNode {
+  constructor(data) {
+    super(3, "#text");
+    this._data = data;
+  }
+
+  get data() {
+    return this._data;
+  }
+
+  set data(value) {
+    this._data = value;
+    if (this.isConnected) {
+      stats.textWrites++;
+    }
+  }
+}
+
+class FakeElement extends FakeNode {
+  constructor(tag) {
+    super(1, tag.toUpperCase());
+    this.attrs = new Map();
+    if (tag === "template") {
+      this.content = new FakeNode(11, "#document-fragment");
+    }
+  }
+
+  get id() {
+    return this.getAttribute("id") || "";
+  }
+
+  get attributes() {
+    return [...this.attrs].map(([name, value]) => ({ name, value }));
+  }
+
+  getAttribute(name) {
+    return this.attrs.has(name) ? this.attrs.get(name) : null;
+  }
+
+  hasAttribute(name) {
+    return this.attrs.has(name);
+  }
+
+  setAttribute(name, value) {
+    this.attrs.set(name, String(value));
+    if (this.isConnected) {
+      stats.attributeWrites++;
+    }
+  }
+
+  removeAttribute(name) {
+    this.attrs.delete(name);
+    if (this.isConnected) {
+      stats.attributeWrites++;
+    }
+  }
+
+  matches(selector) {
+    return selector === "[id]"
+      ? this.attrs.has("id")
+      : this.nodeName === selector.toUpperCase();
+  }
+
+  closest(selector) {
+    let element = this;
+    while (element && element.nodeType === 1) {
+      if (element.matches(selector)) {
+        return element;
+      }
+      element = element.parentNode;
+    }
+    return null;
+  }
+
+  querySelectorAll(selector) {
+    const found = [];
+    const visit = (node) => {
+      for (const child of node.childNodes) {
+        if (child.nodeType === 1) {
+          if (child.matches(selector)) {
+            found.push(child);
+          }
+          visit(child);
+        }
+      }
+    };
+    visit(this);
+    return found;
+  }
+
+  set innerHTML(html) {
+    const target = this.content || this;
+    target.childNodes = [];
+    target.insertBefore(parseHtml(html), null);
+  }
+
+  get outerHTML() {
+    const attrs = this.attributes
+      .map(({ name, value }) => ` ${name}="${value}"`)
+      .join("");
+    const tag = this.nodeName.toLowerCase();
+    if (VOID_TAGS.has(tag)) {
+      return `<${tag}${attrs}>`;
+    }
+    const children = this.childNodes
+      .map((child) => (child.nodeType === 3 ? child.data : child.outerHTML))
+      .join("");
+    return `<${tag}${attrs}>${children}</${tag}>`;
+  }
+
+  set outerHTML(html) {
+    this.replaceWith(parseHtml(html));
+  }
+}
+
+/**
+ * Parses the well formed HTML rendered by the server.
+ */
+function parseHtml(html) {
+  const root = new FakeNode(11, "#document-fragment");
+  const stack = [root];
+  const tokens = /<(\/?)([a-z0-9-]+)([^>]*)>|([^<]+)/g;
+  const attributes = /([^\s=]+)(?:="([^"]*)")?/g;
+
+  for (const [, closing, tag, attrs, text] of html.matchAll(tokens)) {
+    const parent = stack[stack.length - 1];
+    if (text !== undefined) {
+      parent.insertBefore(new FakeText(text), null);
+    } else if (closing) {
+      stack.pop();
+    } else {
+      const element = new FakeElement(tag);
+      for (const [, name, value] of attrs.matchAll(attributes)) {
+        element.attrs.set(name, value === undefined ? "" : value);
+      }
+      parent.insertBefore(element, null);
+      if (!VOID_TAGS.has(tag)) {
+        stack.push(element);
+      }
+    }
+  }
+  return root;
+}
+
+const document = {
+  documentElement: new FakeElement("html"),
+  createElement: (tag) => new FakeElement(tag),
+  getElementById(id) {
+    if (this.body.id === id) {
+      return this.body;
+    }
+    return this.body.querySelectorAll("[id]").find((el) => el.id === id);
+  },
+};
+document.body = document.documentElement.insertBefore(
+  new FakeElement("body"),
+  null
+);
+
+global.document = document;
+global.window = {
+  location: { pathname: "/", href: "http://localhost/" },
+  addEventListener: () => {},
+};
+
+require(path.join(__dirname, "../src/nik/views/client.js"));
+const app = window.__nik__;
+
+for (const name of ["registerObservable", "onClick"]) {
+  app.actions[name] = () => stats.actions++;
+}
+
+/**
+ * Renders a page fragment with a nested fragment of rows, like a view inside its parent view.
+ */
+function renderPage(count, { updated = 0, added = 0 } = {}) {
+  let rows = "";
+  for (let i = 0; i < count + added; i++) {
+    const label = i < updated ? `Row ${i} (updated)` : `Row ${i}`;
+    const className = i < updated ? "row selected" : "row";
+    rows +=
+      `<li id="row_${i}" class="${className}"><span>${label}</span>` +
+      `<input id="input_${i}" type="checkbox"></li>`;
+  }
+  return (
+    `<fragment id="v_page"><h1 id="title">Rows</h1>` +
+    `<fragment id="v_rows"><ul id="list">${rows}</ul>` +
+    `<p>Total: ${count + added}</p></fragment></fragment>`
+  );
+}
+
+function renderActions(count) {
+  const rows = [];
+  for (let i = 0; i < count; i++) {
+    rows.push([`row_${i}`, "consoleLog", i]);
+  }
+  return {
+    v_page: [
+      ["registerObservable", ["sv_title", "Rows"]],
+      ["onClick", ["title", "consoleLog", "title"]],
+    ],
+    v_rows: [["registerObservable", ["sv_rows", count]], ["onClick", ...rows]],
+  };
+}
+
+// Runs of each update, the median time is reported.
+const RUNS = 25;
+
+function measure(name, count, update) {
+  const total = count + 10;
+  const html = renderPage(count, {
+    updated: Math.ceil(count / 100),
+    added: 10,
+  });
+
+  const times = [];
+  for (let run = 0; run < RUNS; run++) {
+    document.body.childNodes = [];
+    document.body.insertBefore(parseHtml(renderPage(count)), null);
+
+    resetStats();
+    const start = process.hrtime.bigint();
+    update(document.getElementById("v_page"), html, renderActions(total));
+    times.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  const elapsed = times.sort((a, b) => a - b)[Math.floor(RUNS / 2)];
+
+  console.log(
+    `${name.padEnd(10)} ${elapsed.toFixed(2).padStart(8)}ms ` +
+      `attached=${stats.attached} detached=${stats.detached} ` +
+      `attributes=${stats.attributeWrites} texts=${stats.textWrites} ` +
+      `actions=${stats.actions}`
+  );
+
+  if (document.getElementById("v_page").outerHTML !== html) {
+    throw new Error(`${name} did not render the new view.`);
+  }
+}
+
+const count = Number(process.argv[2] || 1000);
+console.log(`Refreshing ${count} rows, 1% updated and 10 added`);
+measure("outerHTML", count, (element, html, actions) => {
+  element.outerHTML = html;
+  app.run(actions);
+});
+measure("morph", count, (element, html, actions) => {
+  app.run(actions, app.morph(element, html));
+});
@@ -0,0 +1,45 @@
+"""
+Benchmarks appending items to a `State` one by one, eg: in an action adding rows in a loop.
+
+Usage:
+    PYTHONPATH=src python benchmarks/state_append.py [count] [--compare]
+
+`--compare` also times the previous deepcopy based implementation, which takes minutes for 10k appends.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from copy import deepcopy
+
+from nik.views.context import ViewContext
+from nik.views.data import State
+
+
+def append_with_state(count: int) -> float:
+    with ViewContext():
+        rows = State("rows", [])
+        start = time.perf_counter()
+        for i in range(count):
+            rows = rows.append({"id": i, "name": f"Row {i}"})
+        return time.perf_counter() - start
+
+
+def append_with_deepcopy(count: int) -> float:
+    """The previous implementation, which copied the whole list for every append."""
+    rows: list[dict] = []
+    start = time.perf_counter()
+    for i in range(count):
+        rows = deepcopy(rows)
+        rows.append({"id": i, "name": f"Row {i}"})
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    count = int(args[0]) if args else 10_000
+
+    print(f"State.append x {count}: {append_with_state(count):.3f}s")
+    if "--compare" in sys.argv:
+        print(f"deepcopy + append x {count}: {append_with_deepcopy(count):.3f}s")
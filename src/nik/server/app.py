@@ -3,15 +3,22 @@ from __future__ import annotations
 import importlib.util
 import os
 import shutil
+from collections.abc import Sequence
 from re import Pattern
 from typing import TYPE_CHECKING, Literal, TypeVar
 
+from .assets import build_client
 from .routes.codegen import SPECS, generate_routes
 from .routes.handler import RouteHandler
+from .routes.patches import FragmentCache
+from .routes.singleflight import SingleFlight
+from .routes.websocket import WebSocketHandler
+from .serviceworker import build_service_worker
 from .types import Scope, Send
 
 if TYPE_CHECKING:
     from .authentication.securecookie import SecureCookie
+    from .response import Response
     from .routes.router import Route
     from .types import Receive
 
@@ -29,15 +36,32 @@ class Nik:
         environment: Literal["development", "test", "production"],
         project_root: str | None = None,
         authentication: AuthenticationGuards | None = None,
+        websocket: bool = False,
+        websocket_origins: Sequence[str] = (),
+        service_worker: bool = False,
     ):
         self.environment = environment
         self.authentication = authentication if authentication is not None else ()
+        self.websocket = websocket
+        # Origins allowed to open the WebSocket besides the app's own (eg: "https://admin.example.com").
+        self.websocket_origins = frozenset(origin.rstrip("/").lower() for origin in websocket_origins)
         self.project_root = project_root if project_root is not None else os.getcwd()
 
         self.routes = self._load_routes()
+        self.fragments = FragmentCache()
+        self.renders: SingleFlight[Response] = SingleFlight()
+        # URL of the client script for the layouts, see `page.client_src`.
+        self.client_src = "/public/client.js"
         self._copy_js_client()
+        self.service_worker = (
+            build_service_worker(self.routes, os.path.join(self.project_root, "public")) if service_worker else None
+        )
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "websocket" and self.websocket:
+            await WebSocketHandler(self, scope, receive, send).run()
+            return
+
         assert scope["type"] == "http"
         response = await RouteHandler(self, scope, receive).run()
         await response.send(send)
@@ -63,6 +87,8 @@ class Nik:
     def _copy_js_client(self):
         current_dir = os.path.dirname(__file__)
         source = os.path.realpath(os.path.join(current_dir, "..", "views", "client.js"))
-        destination = os.path.join(self.project_root, "public", "client.js")
+        public_dir = os.path.join(self.project_root, "public")
 
-        shutil.copyfile(source, destination)
+        # The unversioned copy is kept for the layouts loading `/public/client.js`.
+        shutil.copyfile(source, os.path.join(public_dir, "client.js"))
+        self.client_src = build_client(public_dir)
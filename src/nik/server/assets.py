@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import importlib
+import os
+import re
+from collections.abc import Callable
+
+"""
+Builds the client script served to the browsers.
+
+The client is minified and written under a content hashed name (`client.<hash>.js`), so it can be cached forever:
+a new version of the client gets a new URL. Precompressed copies (`.gz`, and `.zst` when a zstd module is available)
+are written next to it and negotiated by `serve_static_file`.
+"""
+
+CLIENT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "views", "client.js")
+
+"""Files with a content hash in their name, they never change and are served with an immutable cache policy."""
+HASHED_ASSET_RE = re.compile(r"^client\.[0-9a-f]{16}\.js$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+"""Content codings of the precompressed copies by preference, with their file suffix."""
+PRECOMPRESSED_ENCODINGS = (("zstd", ".zst"), ("gzip", ".gz"))
+
+_REGEX_PREFIX_CHARS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_REGEX_PREFIX_KEYWORDS = frozenset(
+    {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "instanceof", "yield"}
+)
+
+
+def minify_js(source: str) -> str:
+    """
+    Removes the comments, the indentation and the blank lines of a script.
+    Line breaks are kept, so statements relying on automatic semicolon insertion are not changed.
+    Strings, template literals and regular expression literals are copied as is.
+    """
+    out: list[str] = []
+    # Last significant character and the identifier it ends, to tell a regular expression from a division.
+    previous = ""
+    word = ""
+    i, length = 0, len(source)
+
+    def newline():
+        while out and out[-1] in " \t":
+            out.pop()
+        if out and out[-1] != "\n":
+            out.append("\n")
+
+    while i < length:
+        char = source[i]
+        if char in "'\"`":
+            end = _skip_literal(source, i, char)
+            out.append(source[i:end])
+            previous, word, i = char, "", end
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = length if end == -1 else end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            if out and out[-1] not in " \t\n":
+                out.append(" ")
+        elif char == "/" and (not previous or previous in _REGEX_PREFIX_CHARS or word in _REGEX_PREFIX_KEYWORDS):
+            end = _skip_regex(source, i)
+            out.append(source[i:end])
+            previous, word, i = "/", "", end
+        elif char == "\n":
+            newline()
+            i += 1
+        elif char in " \t\r":
+            if out and out[-1] not in " \t\n":
+                out.append(" ")
+            i += 1
+        else:
+            out.append(char)
+            word = word + char if char.isalnum() or char in "_$" else ""
+            previous = char
+            i += 1
+
+    newline()
+    return "".join(out).lstrip("\n")
+
+
+def _skip_literal(source: str, start: int, quote: str) -> int:
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        if char == "\n" and quote != "`":
+            raise ValueError(f"Unterminated string at {start}")
+        i += 1
+    raise ValueError(f"Unterminated string at {start}")
+
+
+def _skip_regex(source: str, start: int) -> int:
+    i = start + 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            raise ValueError(f"Unterminated regular expression at {start}")
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(source) and source[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    raise ValueError(f"Unterminated regular expression at {start}")
+
+
+def _get_zstd_compress() -> Callable[[bytes], bytes] | None:
+    """The zstd compressor of the standard library (Python 3.14+) or of the `zstandard` package, if any."""
+    for module_name in ("compression.zstd", "zstandard"):
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        return module.compress
+    return None
+
+
+def build_client(public_dir: str) -> str:
+    """
+    Writes the minified client under its hashed name and its precompressed copies in `public_dir`,
+    removes the builds of the previous versions and returns the URL of the client.
+    """
+    with open(CLIENT_SOURCE, encoding="utf-8") as file:
+        content = minify_js(file.read()).encode("utf-8")
+
+    filename = f"client.{hashlib.blake2b(content, digest_size=8).hexdigest()}.js"
+    path = os.path.join(public_dir, filename)
+
+    compressed = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    zstd_compress = _get_zstd_compress()
+    if zstd_compress is not None:
+        compressed[".zst"] = zstd_compress(content)
+
+    os.makedirs(public_dir, exist_ok=True)
+    for name in os.listdir(public_dir):
+        base = name.removesuffix(".gz").removesuffix(".zst")
+        if HASHED_ASSET_RE.match(base) and base != filename:
+            os.remove(os.path.join(public_dir, name))
+
+    with open(path, "wb") as file:
+        file.write(content)
+    for suffix, data in compressed.items():
+        with open(path + suffix, "wb") as file:
+            file.write(data)
+
+    return f"/public/{filename}"
+
+
+def parse_accept_encoding(value: str | None) -> set[str]:
+    """The content codings accepted by the client, without the ones given with `q=0`."""
+    accepted = set()
+    for item in (value or "").split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if coding and not any(param.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000") for param in params):
+            accepted.add(coding.lower())
+    return accepted
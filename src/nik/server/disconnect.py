@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from .types import Message, Receive
+
+"""
+Cancels the handling of a request as soon as its client disconnects.
+
+ASGI servers only report a disconnect to the next `receive` call, which a handler busy rendering a view
+does not make. The messages are read ahead of the handler, so the disconnect is noticed right away
+and the handler task is cancelled: the views and actions stop, and the sync ones still waiting
+for a thread never run (see `run_sync_in_thread`).
+A render shared with identical requests (see `SingleFlight`) is not cancelled while another request awaits it.
+"""
+
+T = TypeVar("T")
+
+
+class DisconnectWatcher:
+    def __init__(self, receive: Receive):
+        self._receive = receive
+        self._messages: asyncio.Queue[Message] = asyncio.Queue()
+        self._reader: asyncio.Task[None] | None = None
+        self.disconnected = asyncio.Event()
+
+    async def receive(self) -> Message:
+        """The receive callable of the handler, it gets the messages read ahead."""
+        if self.disconnected.is_set() and self._messages.empty():
+            return {"type": "http.disconnect"}
+        return await self._messages.get()
+
+    async def run(self, handler: Awaitable[T]) -> T | None:
+        """Runs the handler until it completes, or returns None if the client disconnects first."""
+        if self._reader is None:
+            self._reader = asyncio.ensure_future(self._read())
+
+        task = asyncio.ensure_future(handler)
+        disconnected = asyncio.ensure_future(self.disconnected.wait())
+        try:
+            await asyncio.wait({task, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            self.close()
+            raise
+        finally:
+            disconnected.cancel()
+
+        if task.done():
+            return task.result()
+
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        return None
+
+    def close(self):
+        """Stops reading ahead, once the handler no longer needs to know about a disconnect."""
+        if self._reader is not None:
+            self._reader.cancel()
+
+    async def _read(self):
+        while True:
+            message = await self._receive()
+            self._messages.put_nowait(message)
+            if message["type"] == "http.disconnect":
+                self.disconnected.set()
+                return
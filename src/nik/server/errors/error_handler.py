@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from ..protocol import encode_actions
 from ..response import Response
 from .errors import RoutingError
 from .views import generic_error_view
@@ -10,7 +11,7 @@ def error_handler(error: Exception) -> Response:
         raise error
 
     if error.request and error.request.is_nik_request:
-        body = {"actions": error.actions} if error.actions else {}
+        body = {"actions": encode_actions(error.actions, error.request.actions_version)} if error.actions else {}
         return Response.json(body, error.status)
 
     return Response.html(
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from typing import Any
+
+from ..utils.string import to_json
+
+"""
+Wire format of the actions sent with the JSON responses.
+
+Version 1 (legacy) is a dict of view ids to action groups: `{"v_1": [["registerObservable", [key, value], ...]]}`.
+
+Version 2 is a compact encoding used when the client sends the `x-nik-actions-version: 2` header:
+    {"v": 2, "t": ["sv_count_abc", ...], "a": {"v_1": [[0, ["~0", 1]], ...]}}
+
+- Action names are replaced by their index in `ACTION_OPCODES`, unknown names are sent as is.
+- String arguments used more than once in the response are sent once in the table `t`
+  and referred to as `~<index>`. Other strings starting with `~` are escaped as `~~`.
+- Actions in `DEDUPLICATED_ACTIONS` are sent only once per response, even if several views registered them.
+  The copy of the outermost view is kept and the views are sent outermost first, see `_deduplicate`.
+"""
+
+"""Path of the optional WebSocket transport, see `routes/websocket.py`."""
+WEBSOCKET_PATH = "/_nik/ws"
+
+"""Path of the optional service worker, see `serviceworker.py`."""
+SERVICE_WORKER_PATH = "/_nik/sw.js"
+
+ACTIONS_VERSION_HEADER = "x-nik-actions-version"
+ACTIONS_VERSIONS = (1, 2)
+
+"""Opcodes of the actions, the order must match `ACTION_OPCODES` in `client.js`."""
+ACTION_OPCODES = (
+    "registerObservable",
+    "subscribeObservable",
+    "onClick",
+    "listenSubmit",
+    "updateState",
+    "bindValue",
+    "redirect",
+    "refreshView",
+    "observeWindow",
+    "subscribeStream",
+    "optimistic",
+    "loadIsland",
+)
+_OPCODES = {name: opcode for opcode, name in enumerate(ACTION_OPCODES)}
+
+"""Actions that have the same effect when they are run again, duplicates are dropped."""
+DEDUPLICATED_ACTIONS = frozenset({"registerObservable", "subscribeObservable"})
+
+REF_PREFIX = "~"
+
+ViewActions = dict[str, list[Any] | None]
+
+
+def get_actions_version(value: str | None) -> int:
+    try:
+        version = int(value or 1)
+    except ValueError:
+        return 1
+    return version if version in ACTIONS_VERSIONS else 1
+
+
+def encode_actions(actions: ViewActions | None, version: int) -> Any:
+    """Encodes the actions of the rendered views in the given wire format version."""
+    if not actions:
+        return actions
+
+    if version < 2:
+        return actions
+
+    actions = _deduplicate(actions)
+
+    # Actions are serialized first, so the values (eg: `State`s) are in their final form before they are interned.
+    groups: dict[str, list[list[Any]] | None] = json.loads(to_json(actions))
+
+    counts = Counter(
+        arg
+        for view_actions in groups.values()
+        for _, *params in view_actions or ()
+        for args in params
+        for arg in args
+        if isinstance(arg, str)
+    )
+    table = [value for value, count in counts.items() if count > 1]
+    refs = {value: f"{REF_PREFIX}{index}" for index, value in enumerate(table)}
+
+    def encode_arg(arg: Any) -> Any:
+        if not isinstance(arg, str):
+            return arg
+        if arg in refs:
+            return refs[arg]
+        if arg.startswith(REF_PREFIX):
+            return REF_PREFIX + arg
+        return arg
+
+    encoded: dict[str, list[list[Any]] | None] = {}
+    for view_id, view_actions in groups.items():
+        if view_actions is None:
+            encoded[view_id] = None
+            continue
+
+        encoded[view_id] = [
+            [_OPCODES.get(name, name), *[[encode_arg(arg) for arg in args] for args in params]]
+            for name, *params in view_actions
+        ]
+
+    return {"v": 2, "t": table, "a": encoded}
+
+
+def _deduplicate(actions: ViewActions) -> ViewActions:
+    """
+    Keeps the first copy of the deduplicated actions from the outermost view, the renderer collects the actions
+    from the innermost one. The views are returned outermost first, so an observable shared with a layout
+    belongs to the layout and is registered before the inner views subscribe to it: replacing an inner view
+    does not release it.
+    """
+    seen: set[str] = set()
+    result: ViewActions = {}
+
+    for view_id, view_actions in reversed(actions.items()):
+        if view_actions is None:
+            result[view_id] = None
+            continue
+
+        groups = []
+        for name, *params in view_actions:
+            if name in DEDUPLICATED_ACTIONS:
+                unique_params = []
+                for args in params:
+                    key = f"{name}:{to_json(args)}"
+                    if key not in seen:
+                        seen.add(key)
+                        unique_params.append(args)
+                params = unique_params
+            if params:
+                groups.append([name, *params])
+
+        result[view_id] = groups or None
+
+    return result
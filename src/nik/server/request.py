@@ -6,18 +6,54 @@ from urllib.parse import parse_qsl
 
 from .cookies import Cookies
 from .errors import BadRequestError
+from .protocol import ACTIONS_VERSION_HEADER, get_actions_version
+from .response import EVENT_STREAM_MEDIA_TYPE
 from .types import RawHeaders, Scope
 
 if TYPE_CHECKING:
-    from .types import Headers, Receive
+    from .types import Headers, Message, Receive
 
 NIK_REQUEST_HEADER = "x-nik-request"
 NIK_REQUEST_TYPE_HEADER = "x-nik-request-type"
 NIK_PARTIAL_REQUEST_HEADER = "x-nik-partial-request"
 NIK_PREVIOUS_PATH_HEADER = "x-nik-previous-path"
+NIK_WINDOW_HEADER = "x-nik-window"
+NIK_RESPONSE_FORMAT_HEADER = "x-nik-response-format"
+NIK_FRAGMENT_VERSIONS_HEADER = "x-nik-fragment-versions"
+NIK_REFRESH_PATH_HEADER = "x-nik-refresh-path"
 
-TRequestType = Literal["link", "partial", "form"]
-NIK_REQUEST_TYPES: list[TRequestType] = ["link", "partial", "form"]
+"""Cookie identifying the browser of a client, the rendered fragments it can be patched from are kept by it."""
+NIK_CLIENT_COOKIE = "nik_client"
+
+TRequestType = Literal["link", "partial", "form", "window", "batch"]
+NIK_REQUEST_TYPES: list[TRequestType] = ["link", "partial", "form", "window", "batch"]
+
+"""Headers describing a request itself, which are not inherited by its sub-requests."""
+SUBREQUEST_EXCLUDED_HEADERS = frozenset(
+    {
+        "content-type",
+        "content-length",
+        NIK_REQUEST_HEADER,
+        NIK_REQUEST_TYPE_HEADER,
+        NIK_PREVIOUS_PATH_HEADER,
+        NIK_REFRESH_PATH_HEADER,
+        NIK_WINDOW_HEADER,
+        NIK_RESPONSE_FORMAT_HEADER,
+    }
+)
+
+"""Headers the navigation responses depend on, they are cached by path and these headers."""
+NAVIGATION_VARY_HEADERS = (
+    NIK_REQUEST_HEADER,
+    NIK_REQUEST_TYPE_HEADER,
+    NIK_PREVIOUS_PATH_HEADER,
+    NIK_RESPONSE_FORMAT_HEADER,
+    NIK_FRAGMENT_VERSIONS_HEADER,
+    ACTIONS_VERSION_HEADER,
+)
+
+TResponseFormat = Literal["json", "framed"]
+NIK_RESPONSE_FORMATS: list[TResponseFormat] = ["json", "framed"]
 
 
 def is_nik_request(headers: Headers) -> bool:
@@ -31,11 +67,45 @@ def get_previous_path(headers: Headers) -> str | None:
     return None
 
 
+def get_refresh_path(headers: Headers) -> str | None:
+    """Path of the page the client is showing, sent with form requests to receive the refreshed view inline."""
+    refresh_path = headers.get(NIK_REFRESH_PATH_HEADER, "").strip()
+    if refresh_path.startswith("/"):
+        return refresh_path
+    return None
+
+
 def get_nik_request_type(headers: Headers) -> TRequestType:
     type = headers.get(NIK_REQUEST_TYPE_HEADER, None)
     return type if type in NIK_REQUEST_TYPES else "link"
 
 
+def get_nik_response_format(headers: Headers) -> TResponseFormat:
+    format = headers.get(NIK_RESPONSE_FORMAT_HEADER, None)
+    return format if format in NIK_RESPONSE_FORMATS else "json"
+
+
+def get_fragment_versions(headers: Headers) -> dict[str, str] | None:
+    """
+    Versions of the fragments the client has not modified since they were rendered, eg: `v_abc=1f2e,v_def=3a4b`.
+    None if the client does not support fragment patches.
+    """
+    value = headers.get(NIK_FRAGMENT_VERSIONS_HEADER, None)
+    if value is None:
+        return None
+
+    versions = {}
+    for item in value.split(","):
+        fragment_id, _, version = item.strip().partition("=")
+        if fragment_id and version:
+            versions[fragment_id] = version
+    return versions
+
+
+def get_window_key(headers: Headers) -> str | None:
+    return headers.get(NIK_WINDOW_HEADER, "").strip() or None
+
+
 def parse_query_string(data: bytes) -> dict[str, str | list[str]]:
     result = {}
     for key, value in parse_qsl(data.decode("latin-1"), keep_blank_values=True):
@@ -54,6 +124,15 @@ def parse_headers(headers: RawHeaders) -> dict[str, str]:
     return {k.decode("latin-1"): v.decode("latin-1") for k, v in headers}
 
 
+def receive_body(body: bytes) -> Receive:
+    """Returns an ASGI receive callable for an already read body, eg: the body of a sub-request."""
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return receive
+
+
 class Request:
     def __init__(self, scope: Scope, receive: Receive):
         assert scope["type"] == "http"
@@ -62,6 +141,7 @@ class Request:
 
         self.method = scope["method"].lower()
         self.path = scope["path"]
+        self.query_string = scope["query_string"]
 
         self.headers = parse_headers(scope["headers"])
         self.cookies = Cookies(self.headers.get("cookie", None))
@@ -72,11 +152,16 @@ class Request:
         self.is_nik_request = is_nik_request(self.headers)
         self.nik_request_type = get_nik_request_type(self.headers)
         self.previous_path = get_previous_path(self.headers)
+        self.refresh_path = get_refresh_path(self.headers)
+        self.window_key = get_window_key(self.headers)
+        self.nik_response_format = get_nik_response_format(self.headers)
+        self.fragment_versions = get_fragment_versions(self.headers)
+        self.actions_version = get_actions_version(self.headers.get(ACTIONS_VERSION_HEADER))
 
     @property
     def query(self):
         if self._query is None:
-            self._query = parse_query_string(self._scope["query_string"])
+            self._query = parse_query_string(self.query_string)
         return self._query
 
     @property
@@ -95,6 +180,58 @@ class Request:
 
         return self._body
 
+    async def wait_for_disconnect(self):
+        """Waits until the client disconnects, only once the body was read."""
+        while (await self._receive())["type"] != "http.disconnect":
+            pass
+
+    def subrequest_scope(self, method: str, path: str, headers: Headers | None = None) -> Scope:
+        """
+        Returns the scope of a request made on behalf of this one, eg: a sub-request of a batch request.
+        It keeps the headers of this request that are not specific to it (eg: cookies, actions version).
+        """
+        path, _, query_string = path.partition("?")
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        raw_headers = [
+            (key, value)
+            for key, value in self._scope["headers"]
+            if key.decode("latin-1") not in SUBREQUEST_EXCLUDED_HEADERS and key.decode("latin-1") not in headers
+        ]
+        raw_headers += [(key.encode("latin-1"), value.encode("latin-1")) for key, value in headers.items()]
+
+        scope = self._scope.copy()
+        scope["method"] = method.upper()
+        scope["path"] = path
+        scope["query_string"] = query_string.encode("latin-1")
+        scope["headers"] = raw_headers
+        return scope
+
+    def for_refresh(self, path: str, partial: bool) -> Request:
+        """
+        Returns the nik request refreshing the view at the given path, eg: after a form action.
+        It shares the cookies of this request, so the cookies set by the action are kept.
+        """
+        scope = self.subrequest_scope(
+            "get",
+            path,
+            {
+                NIK_REQUEST_HEADER: "1",
+                NIK_REQUEST_TYPE_HEADER: "partial" if partial else "link",
+                NIK_PREVIOUS_PATH_HEADER: path.partition("?")[0],
+            },
+        )
+        request = Request(scope, self._receive)
+        request.cookies = self.cookies
+        return request
+
+    @property
+    def is_batch_request(self) -> bool:
+        return self.is_nik_request and self.nik_request_type == "batch" and self.method == "post"
+
+    @property
+    def is_stream_request(self) -> bool:
+        return self.method == "get" and EVENT_STREAM_MEDIA_TYPE in self.headers.get("accept", "")
+
     @property
     def is_link_request(self) -> bool:
         return self.is_nik_request and self.nik_request_type == "link"
@@ -107,6 +244,14 @@ class Request:
     def is_form_request(self) -> bool:
         return self.is_nik_request and self.nik_request_type == "form"
 
+    @property
+    def is_window_request(self) -> bool:
+        return self.is_nik_request and self.nik_request_type == "window" and self.window_key is not None
+
+    @property
+    def client_id(self) -> str | None:
+        return self.cookies.get(NIK_CLIENT_COOKIE)
+
     async def _decode_json_body(self) -> Any:
         try:
             return json.loads(await self._read_body())
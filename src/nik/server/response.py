@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import copy
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
 from ..utils.string import to_json
 
 if TYPE_CHECKING:
+    from http.cookies import SimpleCookie
+
     from .cookies import Cookies
     from .types import Headers, Send
 
 
+FRAMED_MEDIA_TYPE = "application/x-nik-framed"
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+
 class Response:
     def __init__(
         self,
@@ -49,6 +58,12 @@ class Response:
 
         return raw_headers
 
+    def with_cookie(self, cookie: SimpleCookie) -> Response:
+        """A copy of the response that also sets the cookie, eg: for one of the requests sharing a response."""
+        response = copy.copy(self)
+        response.raw_headers = [*self.raw_headers, (b"set-cookie", cookie.output(header="").strip().encode("latin-1"))]
+        return response
+
     @staticmethod
     def json(
         data: Any,
@@ -84,6 +99,26 @@ class Response:
             cookies=cookies,
         )
 
+    @staticmethod
+    def framed(
+        header: Any,
+        content: str,
+        status=200,
+        headers: Headers | None = None,
+        cookies: Cookies | None = None,
+    ) -> Response:
+        """
+        A JSON header on the first line followed by the raw HTML content.
+        The content is not encoded into a JSON string, so the client does not have to decode it.
+        """
+        return Response(
+            body=to_json(header, ensure_ascii=False, allow_nan=False, separators=(",", ":")) + "\n" + content,
+            status=status,
+            media_type=FRAMED_MEDIA_TYPE,
+            headers=headers,
+            cookies=cookies,
+        )
+
     async def send(self, send_callable: Send):
         await send_callable(
             {
@@ -93,3 +128,58 @@ class Response:
             }
         )
         await send_callable({"type": "http.response.body", "body": self.body})
+
+
+class DisconnectedResponse(Response):
+    """Stands for the response of a request whose client disconnected, nothing is sent."""
+
+    def __init__(self):
+        # 499 (Client Closed Request) is not sent, it is only seen by the application, eg: in logs.
+        super().__init__(b"", status=499)
+
+    async def send(self, send_callable: Send):
+        pass
+
+
+class StreamingResponse(Response):
+    """
+    Sends the chunks as they are produced, until they are exhausted or the client disconnects.
+    The chunks are not produced any further once `disconnected` returns.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        disconnected: Callable[[], Awaitable[Any]],
+        status: int = 200,
+        media_type: str = EVENT_STREAM_MEDIA_TYPE,
+        headers: Headers | None = None,
+    ):
+        super().__init__(b"", status=status, media_type=media_type, headers=headers)
+        self.chunks = chunks
+        self.disconnected = disconnected
+        self.raw_headers = [(key, value) for key, value in self.raw_headers if key != b"content-length"]
+
+    async def send(self, send_callable: Send):
+        await send_callable(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": self.raw_headers,
+            }
+        )
+
+        stream = asyncio.ensure_future(self._send_chunks(send_callable))
+        disconnected = asyncio.ensure_future(self.disconnected())
+        try:
+            await asyncio.wait({stream, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stream.cancel()
+            disconnected.cancel()
+        if stream.done() and not stream.cancelled():
+            stream.result()
+
+    async def _send_chunks(self, send_callable: Send):
+        async for chunk in self.chunks:
+            await send_callable({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send_callable({"type": "http.response.body", "body": b"", "more_body": False})
@@ -46,7 +46,7 @@ class ComponentParameter:
 
 class ComponentInfo:
     """
-    Represents a single route component (e.g., layout, view, action, partial).
+    Represents a single route component (e.g., layout, view, action, partial, stream).
 
     This class is responsible for introspecting a Python file that defines a route
     component, extracting metadata about the component function (like its parameters
@@ -59,7 +59,7 @@ class ComponentInfo:
             The absolute path to the project's root directory.
         abs_path : str
             The absolute path to the Python file containing the component.
-        component_type : Literal["layout", "view", "action", "partial"]
+        component_type : Literal["layout", "view", "action", "partial", "stream"]
             The type of component.
         dynamic_params_in_scope : dict[str, type]
             A dictionary of dynamic URL parameters available in the component's scope.
@@ -86,7 +86,7 @@ class ComponentInfo:
         self,
         project_root: str,
         abs_path: str,
-        component_type: Literal["layout", "view", "action", "partial"],
+        component_type: Literal["layout", "view", "action", "partial", "stream"],
         dynamic_params_in_scope: dict[str, type],
         is_root_layout: bool,
     ):
@@ -166,6 +166,11 @@ class ComponentInfo:
         except ValueError as e:
             raise RouteGenerationError(f"Could not inspect signature of {self.import_alias} in {self.abs_path}") from e
 
+        if self.component_type == "stream":
+            if not inspect.isasyncgenfunction(func_obj):
+                raise RouteGenerationError(f"Stream {self.import_alias} ({self.abs_path}) must be an async generator.")
+            return func_obj, True, route_comp_parameters
+
         is_async = inspect.iscoroutinefunction(func_obj)
         return func_obj, is_async, route_comp_parameters
 
@@ -175,7 +180,7 @@ class RouteInfo:
     Represents a single route in the application, aggregating its components and metadata.
 
     This class encapsulates information about a route, including its URL path, associated
-    layout, view, action, and partial components, whether it is dynamic (with URL parameters),
+    layout, view, action, partial and stream components, whether it is dynamic (with URL parameters),
     and any permissions. It is used to generate the Python code for a `Route` instance
     in the auto-generated routes file.
 
@@ -193,6 +198,10 @@ class RouteInfo:
             The action component for handling route-specific logic. None if not present.
         partial : ComponentInfo | None
             The partial component for additional rendering. None if not present.
+        stream : ComponentInfo | None
+            The stream component pushing the actions of the view as server-sent events. None if not present.
+        defer_partial : bool
+            Whether the partial is rendered after the view, so an `Island` of the view can load it lazily.
         is_dynamic : bool | None
             True if the route contains dynamic parameters (e.g., _id_ in path).
         permissions : dict[str, Any]
@@ -208,6 +217,8 @@ class RouteInfo:
         partial: ComponentInfo | None = None,
         is_dynamic: bool | None = None,
         permissions: dict[str, Any] | None = None,
+        stream: ComponentInfo | None = None,
+        defer_partial: bool = False,
     ):
         assert view or action, "At least one of view or action must be present"
 
@@ -218,6 +229,8 @@ class RouteInfo:
         self.partial = partial
         self.is_dynamic = is_dynamic
         self.permissions = permissions
+        self.stream = stream
+        self.defer_partial = defer_partial
 
     def to_python(self) -> str:
         view_tree = [lc.variable_name for lc in self.layouts if lc.func]
@@ -229,6 +242,9 @@ class RouteInfo:
         views_tree_arg = f"[{', '.join(view_tree)}]"
         action_kwarg = f", action={self.action.variable_name}" if self.action else ", action=None"
         permissions_kwarg = f", permissions={self.permissions}" if self.permissions else ", permissions=None"
+        # Only emitted when present, so the routes without a stream or a deferred partial are generated as before.
+        stream_kwarg = f", stream={self.stream.variable_name}" if self.stream else ""
+        defer_kwarg = ", defer_partial=True" if self.defer_partial else ""
 
         if self.is_dynamic:
             regex_path = self.path
@@ -244,14 +260,14 @@ class RouteInfo:
                 f'        re.compile(r"{regex_path}"),\n'
                 f"        Route(\n"
                 f'            "{self.path}",\n'
-                f"            {views_tree_arg}{action_kwarg}{permissions_kwarg},\n"
+                f"            {views_tree_arg}{action_kwarg}{permissions_kwarg}{stream_kwarg}{defer_kwarg},\n"
                 f"        ),\n"
                 f"    ),"
             )
         else:
             return (
                 f'    "{self.path}": Route(\n'
-                f'        "{self.path}", {views_tree_arg}{action_kwarg}{permissions_kwarg}\n'
+                f'        "{self.path}", {views_tree_arg}{action_kwarg}{permissions_kwarg}{stream_kwarg}{defer_kwarg}\n'
                 f"    ),"
             )
 
@@ -417,9 +433,15 @@ def _walk_app_directory(
         has_view = hasattr(module, "view")
         has_action = hasattr(module, "action")
         has_partial = hasattr(module, "partial")
+        has_stream = hasattr(module, "stream")
+        defer_partial = getattr(module, "defer_partial", False)
 
         if not has_view and not has_action:
             raise RouteGenerationError(f"Route file {route_file_abs_path} must export a 'view' or 'action' function.")
+        if defer_partial and not (has_view and has_partial):
+            raise RouteGenerationError(
+                f"Route file {route_file_abs_path} sets 'defer_partial' but does not export a 'view' and a 'partial'."
+            )
 
         view_comp = None
         if has_view:
@@ -443,6 +465,13 @@ def _walk_app_directory(
             )
             all_components_map[route_file_abs_path + "_action"] = action_comp
 
+        stream_comp = None
+        if has_stream:
+            stream_comp = ComponentInfo(
+                project_root, route_file_abs_path, "stream", dynamic_params_so_far, is_root_layout=False
+            )
+            all_components_map[route_file_abs_path + "_stream"] = stream_comp
+
         route_path = "/" + "/".join(current_url_path_parts) if current_url_path_parts else "/"
         if current_dir_abs_path == os.path.join(project_root, APP_DIR) and not current_url_path_parts:
             route_path = "/"
@@ -458,6 +487,8 @@ def _walk_app_directory(
                 partial_comp,
                 is_dynamic_route_accurate,
                 current_permissions_for_scope,
+                stream_comp,
+                bool(defer_partial),
             )
         )
 
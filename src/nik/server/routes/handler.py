@@ -1,30 +1,51 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import TYPE_CHECKING
+import secrets
+from collections.abc import Hashable
+from http.cookies import SimpleCookie
+from typing import TYPE_CHECKING, Any
 
+from ...views.context import USER_BOUND_PARAMS
+from ..disconnect import DisconnectWatcher
 from ..errors import (
+    BadRequestError,
     NotFoundError,
     RoutingError,
     error_handler,
 )
-from ..request import Request
-from ..response import Response
-from ..types import Scope
+from ..protocol import SERVICE_WORKER_PATH, WEBSOCKET_PATH
+from ..request import NIK_CLIENT_COOKIE, Request, receive_body
+from ..response import DisconnectedResponse, Response, StreamingResponse
 from .auth import AuthGuard
 from .context import RequestContext
-from .renderer import ActionRenderer, ViewRenderer
+from .renderer import ActionRenderer, StreamRenderer, ViewRenderer
 from .router import Router
 from .static import serve_static_file
 
 if TYPE_CHECKING:
     from ..app import Nik
-    from ..types import Receive
+    from ..authentication.session import Session
+    from ..cookies import Cookies
+    from ..types import Receive, Scope
+    from .router import MatchedRoute
 
 logger = logging.getLogger(__name__)
 
 ACTION_METHODS = ("post", "put", "patch", "delete")
 
+"""Parameters that make a view render specific to a request, so it can not be shared with identical requests."""
+UNSHARED_RENDER_PARAMS = USER_BOUND_PARAMS | {"body"}
+
+"""Headers of a response kept in its 304 (Not Modified) response."""
+NOT_MODIFIED_HEADERS = frozenset({b"etag", b"cache-control", b"vary"})
+
+MAX_BATCH_SIZE = 32
+
+"""Headers of the sub-request responses that only apply to the outer response, cookies are set on it directly."""
+SUBREQUEST_RESPONSE_EXCLUDED_HEADERS = frozenset({b"content-length", b"set-cookie"})
+
 
 class RouteHandler:
     def __init__(
@@ -32,33 +53,81 @@ class RouteHandler:
         app: Nik,
         scope: Scope,
         receive: Receive,
+        session: Session | None = None,
+        cookies: Cookies | None = None,
+        watch_disconnect: bool = True,
     ):
         self.app = app
-        self.request = Request(scope, receive)
+        # Sub-requests are cancelled with their parent request, only the client requests are watched.
+        self.watcher = DisconnectWatcher(receive) if watch_disconnect else None
+        self.request = Request(scope, self.watcher.receive if self.watcher else receive)
+        if cookies is not None:
+            self.request.cookies = cookies
         self.context = RequestContext(self.request)
+        self.context.session = session
+        self.context.page.client_src = self.app.client_src
         self.router = Router(self.app.routes)
         self.auth = AuthGuard(self.app.authentication)
         self.view_renderer = ViewRenderer(
             context=self.context,
             router=self.router,
+            fragments=self.app.fragments,
+            websocket_path=WEBSOCKET_PATH if self.app.websocket else None,
+            service_worker_path=SERVICE_WORKER_PATH if self.app.service_worker else None,
         )
         self.action_renderer = ActionRenderer(
             context=self.context,
             router=self.router,
+            auth=self.auth,
+        )
+        self.stream_renderer = StreamRenderer(
+            context=self.context,
+            router=self.router,
         )
 
     async def run(
         self,
     ) -> Response:
+        """Handles the request, it is cancelled if the client disconnects in the meantime."""
+        if self.watcher is None:
+            return await self._handle()
+
+        response = await self.watcher.run(self._handle())
+        if response is None:
+            logger.debug(f"Client disconnected, {self.request.method.upper()} {self.request.path} was cancelled")
+            return DisconnectedResponse()
+        if not isinstance(response, StreamingResponse):
+            self.watcher.close()
+        return response
+
+    async def _handle(self) -> Response:
         try:
+            if self.request.is_batch_request:
+                return await self._run_batch()
+
+            if self.request.method == "get" and self.request.path == SERVICE_WORKER_PATH and self.app.service_worker:
+                return Response(
+                    self.app.service_worker,
+                    media_type="text/javascript",
+                    # The worker is installed once per version, the browser must check for a new one.
+                    headers={"cache-control": "no-cache", "service-worker-allowed": "/"},
+                )
+
             if self.request.method == "get" and self.request.is_static_path:
-                return await serve_static_file(project_root=self.app.project_root, path=self.request.path)
+                return await serve_static_file(
+                    project_root=self.app.project_root,
+                    path=self.request.path,
+                    accept_encoding=self.request.headers.get("accept-encoding"),
+                )
 
             current_route = self.router.match(self.request.path)
             if current_route is None:
                 raise NotFoundError(self.request)
             self.auth.authorize(current_route.route, self.context)
 
+            if self.request.is_stream_request:
+                return await self.stream_renderer.render(current_route)
+
             # Previous route header must also be a valid route and the requester should be authorized to access it.
             previous_route = None
             if self.request.is_nik_request and self.request.previous_path:
@@ -69,11 +138,143 @@ class RouteHandler:
 
             if self.request.method in ACTION_METHODS:
                 return await self.action_renderer.render(current_route)
+
+            client_cookie = self._assign_client_id()
+            key = self._get_render_key(current_route)
+            if key is None:
+                response = await self.view_renderer.render(current_route, previous_route)
             else:
-                return await self.view_renderer.render(current_route, previous_route)
+                response = await self.app.renders.run(
+                    key, lambda: self.view_renderer.render(current_route, previous_route)
+                )
+            response = self._get_not_modified_response(response)
+            # Set on a copy, the response may be shared with other clients.
+            return response if client_cookie is None else response.with_cookie(client_cookie)
         except RoutingError as e:
             if e.request is None:
                 e.request = self.request
             return error_handler(e)
         except Exception as e:
             return error_handler(e)
+
+    def _assign_client_id(self) -> SimpleCookie | None:
+        """
+        Assigns an id to a client rendering its first view, the fragment cache keeps the fragments of each client.
+        Returns the cookie to set on the response.
+        """
+        if self.request.client_id is not None:
+            return None
+
+        client_id = secrets.token_urlsafe(16)
+        self.request.cookies[NIK_CLIENT_COOKIE] = client_id
+        cookie = SimpleCookie()
+        cookie[NIK_CLIENT_COOKIE] = client_id
+        cookie[NIK_CLIENT_COOKIE]["path"] = "/"
+        cookie[NIK_CLIENT_COOKIE]["httponly"] = True
+        cookie[NIK_CLIENT_COOKIE]["samesite"] = "Lax"
+        return cookie
+
+    def _get_not_modified_response(self, response: Response) -> Response:
+        """
+        Returns an empty 304 response when the client already has the response, according to its ETag.
+        It is done after rendering, since identical renders share the same response.
+        """
+        headers = dict(response.raw_headers)
+        etag = headers.get(b"etag")
+        if (
+            etag is None
+            or response.status != 200
+            or b"set-cookie" in headers
+            or self.request.headers.get("if-none-match") != etag.decode("latin-1")
+        ):
+            return response
+
+        return Response(
+            b"",
+            status=304,
+            headers={
+                key.decode("latin-1"): value.decode("latin-1")
+                for key, value in response.raw_headers
+                if key in NOT_MODIFIED_HEADERS
+            },
+        )
+
+    def _get_render_key(self, route: MatchedRoute) -> Hashable | None:
+        """
+        Key of the render of a public route whose views only depend on the route arguments, the query
+        and the nik headers. Identical concurrent renders share the same response.
+        None if the views take other request bound parameters (eg: cookies).
+        """
+        if self.request.method != "get" or route.route.permissions:
+            return None
+        if any(param.name in UNSHARED_RENDER_PARAMS for view in route.route.views for param in view.args):
+            return None
+
+        nik_headers = tuple(
+            sorted((key, value) for key, value in self.request.headers.items() if key.startswith("x-nik-"))
+        )
+        return (route.route.path, tuple(sorted(route.args.items())), self.request.query_string, nik_headers)
+
+    async def _run_batch(self) -> Response:
+        """
+        Runs the sub-requests of a batch request concurrently and returns their responses in the same order.
+        The sub-requests share the cookies and the session, which is only verified once.
+
+        Body: {"requests": [{"path": "/patients?page=2", "method": "get", "headers": {...}, "body": null}, ...]}
+        Response: {"responses": [{"status": 200, "headers": {"content-type": ...}, "body": "..."}, ...]}
+        """
+        body = await self.request.body
+        requests = body.get("requests") if isinstance(body, dict) else None
+        if not isinstance(requests, list) or not 0 < len(requests) <= MAX_BATCH_SIZE:
+            raise BadRequestError(self.request, "Invalid batch request")
+
+        session = self.auth.get_session(self.context)
+        handlers = [self.subrequest_handler(item, session) for item in requests]
+        responses = await asyncio.gather(*(handler.run() for handler in handlers))
+
+        return Response.json(
+            {"responses": [serialize_response(response) for response in responses]},
+            cookies=self.request.cookies,
+        )
+
+    def subrequest_handler(self, item: Any, session: Session | None) -> RouteHandler:
+        """
+        Returns the handler of a sub-request made on behalf of this request, eg: by a batch request.
+        Item: {"path": "/patients?page=2", "method": "get", "headers": {...}, "body": null}
+        """
+        if not isinstance(item, dict):
+            raise BadRequestError(self.request, "Invalid batch sub-request")
+
+        path, method = item.get("path"), item.get("method", "get")
+        headers, body = item.get("headers") or {}, item.get("body") or ""
+        if (
+            not isinstance(path, str)
+            or not path.startswith("/")
+            or not isinstance(method, str)
+            or not isinstance(headers, dict)
+            or not isinstance(body, str)
+            or not all(isinstance(value, str) for value in headers.values())
+        ):
+            raise BadRequestError(self.request, "Invalid batch sub-request")
+
+        handler = RouteHandler(
+            self.app,
+            self.request.subrequest_scope(method, path, headers),
+            receive_body(body.encode("utf-8")),
+            session=session,
+            cookies=self.request.cookies,
+            watch_disconnect=False,
+        )
+        if handler.request.is_batch_request:
+            raise BadRequestError(self.request, "Batch requests can not be nested")
+        return handler
+
+
+def serialize_response(response: Response) -> dict[str, Any]:
+    """Serializes a sub-request response, eg: to be sent in a batch response."""
+    headers = {
+        key.decode("latin-1"): value.decode("latin-1")
+        for key, value in response.raw_headers
+        if key not in SUBREQUEST_RESPONSE_EXCLUDED_HEADERS
+    }
+    return {"status": response.status, "headers": headers, "body": response.body.decode("utf-8", "replace")}
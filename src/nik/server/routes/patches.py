@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import hashlib
+import html
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Any
+
+from ...utils.string import to_json
+
+"""
+Computes DOM patches between two renders of the same fragment.
+
+The client reports the versions (content hashes) of the fragments it has not modified since they were rendered.
+When the server still has the HTML of that version in the cache of the client, it sends the patches turning it
+into the new render instead of the whole HTML. Patches address nodes by their path of `childNodes` indexes from
+the fragment and carry the expected node name, so the client can detect a DOM that does not match and fall back.
+
+Patches:
+    ["replace", path, node_name, html]
+    ["attrs", path, node_name, {name: value}, [removed names]]
+    ["text", path, "#text", text]
+    ["insert", path, node_name, index, html]  # insert before childNodes[index] of the node at path
+    ["remove", path, node_name]
+"""
+
+"""Fragments kept for each client, and clients whose fragments are kept."""
+FRAGMENT_CACHE_SIZE = 16
+FRAGMENT_CACHE_CLIENTS = 1024
+
+VOID_TAGS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+)
+RAW_TEXT_TAGS = frozenset({"script", "style"})
+
+Patch = list[Any]
+
+
+def fragment_version(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class FragmentCache:
+    """
+    Bounded LRU caches of the rendered HTML of fragments, keyed by the fragment id and version, one per client.
+    The fragments of a client are not evicted by the renders of the other clients, the least recently
+    active clients are dropped instead.
+    """
+
+    def __init__(self, maxsize: int = FRAGMENT_CACHE_SIZE, maxclients: int = FRAGMENT_CACHE_CLIENTS):
+        self.maxsize = maxsize
+        self.maxclients = maxclients
+        self._clients: OrderedDict[str, OrderedDict[tuple[str, str], str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, client_id: str, fragment_id: str, content: str) -> str:
+        version = fragment_version(content)
+        with self._lock:
+            items = self._clients.get(client_id)
+            if items is None:
+                items = self._clients[client_id] = OrderedDict()
+                while len(self._clients) > self.maxclients:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(client_id)
+
+            items[(fragment_id, version)] = content
+            items.move_to_end((fragment_id, version))
+            while len(items) > self.maxsize:
+                items.popitem(last=False)
+        return version
+
+    def get(self, client_id: str, fragment_id: str, version: str) -> str | None:
+        with self._lock:
+            items = self._clients.get(client_id)
+            if items is None:
+                return None
+            self._clients.move_to_end(client_id)
+            content = items.get((fragment_id, version))
+            if content is not None:
+                items.move_to_end((fragment_id, version))
+            return content
+
+
+class Node:
+    def __init__(self, tag: str, attrs: dict[str, str | None] | None = None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: list[Node | str] = []
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Node)
+            and self.tag == other.tag
+            and self.attrs == other.attrs
+            and self.children == other.children
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#root")
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, dict(attrs))
+        self._stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self._stack[-1].children.append(Node(tag, dict(attrs)))
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                return
+
+    def handle_data(self, data):
+        children = self._stack[-1].children
+        if children and isinstance(children[-1], str):
+            children[-1] += data
+        else:
+            children.append(data)
+
+
+def parse_html(content: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(content)
+    builder.close()
+    return builder.root
+
+
+def serialize(node: Node | str, raw_text: bool = False) -> str:
+    if isinstance(node, str):
+        return node if raw_text else html.escape(node, quote=False)
+
+    attrs = "".join(
+        f" {name}" if value is None else f' {name}="{html.escape(value, quote=True)}"'
+        for name, value in node.attrs.items()
+    )
+    if node.tag in VOID_TAGS:
+        return f"<{node.tag}{attrs}>"
+
+    raw = node.tag in RAW_TEXT_TAGS
+    children = "".join(serialize(child, raw) for child in node.children)
+    return f"<{node.tag}{attrs}>{children}</{node.tag}>"
+
+
+def _node_name(node: Node | str) -> str:
+    return "#text" if isinstance(node, str) else node.tag
+
+
+def diff_nodes(old: Node | str, new: Node | str, path: list[int], patches: list[Patch]):
+    if isinstance(old, str) or isinstance(new, str):
+        if isinstance(old, str) and isinstance(new, str):
+            if old != new:
+                patches.append(["text", path, "#text", new])
+        else:
+            patches.append(["replace", path, _node_name(old), serialize(new)])
+        return
+
+    if old.tag != new.tag or old.tag in RAW_TEXT_TAGS:
+        if old != new:
+            patches.append(["replace", path, old.tag, serialize(new)])
+        return
+
+    if old.attrs != new.attrs:
+        changed = {name: value for name, value in new.attrs.items() if old.attrs.get(name, False) != value}
+        removed = [name for name in old.attrs if name not in new.attrs]
+        patches.append(["attrs", path, old.tag, changed, removed])
+
+    _diff_children(old, new, path, patches)
+
+
+def _diff_children(old: Node, new: Node, path: list[int], patches: list[Patch]):
+    old_children, new_children = old.children, new.children
+    if old_children == new_children:
+        return
+
+    # Skip the common head and tail, only the nodes in between are patched.
+    start = 0
+    max_start = min(len(old_children), len(new_children))
+    while start < max_start and old_children[start] == new_children[start]:
+        start += 1
+
+    end = 0
+    max_end = min(len(old_children), len(new_children)) - start
+    while end < max_end and old_children[-1 - end] == new_children[-1 - end]:
+        end += 1
+
+    old_middle = old_children[start : len(old_children) - end]
+    new_middle = new_children[start : len(new_children) - end]
+    paired = min(len(old_middle), len(new_middle))
+
+    for offset in range(paired):
+        diff_nodes(old_middle[offset], new_middle[offset], [*path, start + offset], patches)
+
+    for child in old_middle[paired:]:
+        patches.append(["remove", [*path, start + paired], _node_name(child)])
+
+    for offset, child in enumerate(new_middle[paired:]):
+        patches.append(["insert", path, old.tag, start + paired + offset, serialize(child)])
+
+
+def compute_patches(old_content: str, new_content: str) -> list[Patch] | None:
+    """
+    Returns the patches turning the old fragment HTML into the new one,
+    or None if sending the new HTML is cheaper.
+    """
+    old_root, new_root = parse_html(old_content), parse_html(new_content)
+    if len(old_root.children) != 1 or len(new_root.children) != 1:
+        return None
+
+    old_fragment, new_fragment = old_root.children[0], new_root.children[0]
+    if not isinstance(old_fragment, Node) or not isinstance(new_fragment, Node) or old_fragment.tag != new_fragment.tag:
+        return None
+
+    patches: list[Patch] = []
+    diff_nodes(old_fragment, new_fragment, [], patches)
+
+    if len(to_json(patches)) >= len(new_content):
+        return None
+    return patches
@@ -1,19 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+from collections.abc import AsyncIterator
 from typing import TYPE_CHECKING, Any
 
 from ...utils.asyncio import run_sync_in_thread
 from ...utils.string import to_json
+from ...views.actions import RefreshView, SubscribeStream
 from ...views.context import ViewContext
 from ...views.elements import Fragment, HtmlElement, Script
+from ...views.elements.base import DeferredFragment
 from ..errors import MethodNotAllowedError, RoutingError
-from ..response import Response
+from ..protocol import encode_actions
+from ..request import NAVIGATION_VARY_HEADERS
+from ..response import Response, StreamingResponse
+from ..streams import KEEPALIVE_EVENT, get_stream_events
+from .context import RequestContext
+from .patches import compute_patches
 
 if TYPE_CHECKING:
     from ...views.elements import Children
-    from .context import RequestContext
+    from .auth import AuthGuard
+    from .patches import FragmentCache
     from .router import MatchedRoute, RouteComponent, Router
 
+logger = logging.getLogger(__name__)
+
 
 class BaseRenderer:
     def __init__(
@@ -54,43 +68,226 @@ class BaseRenderer:
         return kwargs
 
 
+"""Actions sent back for window requests, the rest were already run when the list was rendered."""
+WINDOW_ACTIONS = ("updateState", "observeWindow")
+
+
 class ViewRenderer(BaseRenderer):
+    def __init__(
+        self,
+        context: RequestContext,
+        router: Router,
+        fragments: FragmentCache | None = None,
+        websocket_path: str | None = None,
+        service_worker_path: str | None = None,
+    ):
+        super().__init__(context, router)
+        self.fragments = fragments
+        self.websocket_path = websocket_path
+        self.service_worker_path = service_worker_path
+
     async def render(self, current_route: MatchedRoute, previous_route: MatchedRoute | None = None) -> Response:
         """
         Determines the rendering strategy, renders the necessary components,
         and returns a complete Response object.
         """
+        if self.context.request.is_window_request:
+            return await self._render_window(current_route)
+
+        if self.context.request.is_nik_request:
+            update = await self.render_update(current_route, previous_route)
+            update["actions"] = encode_actions(update["actions"], self.context.request.actions_version)
+            if self.context.request.nik_response_format == "framed":
+                view = update.pop("view")
+                response = Response.framed(update, view, cookies=self.context.request.cookies)
+            else:
+                response = Response.json(update, cookies=self.context.request.cookies)
+            return self._add_cache_headers(response)
+
+        views, _ = self._calculate_render_strategy(current_route, previous_route)
+        final_view, actions, _, versions = await self._render_views(current_route, views)
+
+        # The page may be loaded with a cached client, so the initial actions are always sent in the legacy format.
+        initial_actions = encode_actions(actions, version=1)
+        script = f"window.__nik__.run({to_json(initial_actions)});"
+        if versions:
+            script += f"window.__nik__.setFragmentVersions({to_json(versions)});"
+        if self.websocket_path:
+            script += f"window.__nik__.connect({to_json(self.websocket_path)});"
+        if self.service_worker_path:
+            script += f"window.__nik__.registerServiceWorker({to_json(self.service_worker_path)});"
+        final_view.add_child(Script(children=[script]))
+        return Response.html(
+            final_view.render(),
+            cookies=self.context.request.cookies,
+        )
+
+    def _add_cache_headers(self, response: Response) -> Response:
+        """
+        Adds the ETag of a navigation response and how long it is fresh (`page.max_age`),
+        so the client can keep it in its navigation cache and revalidate it once stale.
+        """
+        max_age = self.context.page.max_age
+        cache_control = f"private, max-age={max_age}" if max_age is not None else "no-cache"
+        etag = f'"{hashlib.blake2b(response.body, digest_size=8).hexdigest()}"'
+        response.raw_headers.extend(
+            [
+                (b"etag", etag.encode("latin-1")),
+                (b"cache-control", cache_control.encode("latin-1")),
+                (b"vary", ", ".join(NAVIGATION_VARY_HEADERS).encode("latin-1")),
+            ]
+        )
+        return response
+
+    async def render_update(
+        self, current_route: MatchedRoute, previous_route: MatchedRoute | None = None
+    ) -> dict[str, Any]:
+        """
+        Renders the views a nik request updates: the element it `replaces`, its new `view` and the `actions`.
+        Actions are not encoded yet, so they can be merged with the actions of a form action.
+        """
         views, replaces = self._calculate_render_strategy(current_route, previous_route)
+        assert replaces, "Rendering resulted in no view to replace."
+        final_view, actions, fragments, versions = await self._render_views(current_route, views)
+
+        # Only sent to clients that support patches, which report their fragment versions.
+        fragment_data: dict[str, Any] = {}
+        patches = None
+        if self.context.request.fragment_versions is not None:
+            fragment_data["versions"] = versions
+            if isinstance(final_view, Fragment) and str(final_view.id) == replaces:
+                patches = self._get_patches(replaces, fragments)
+            if patches is not None:
+                fragment_data["patches"] = patches
 
+        return {
+            "replaces": replaces,
+            "view": "" if patches is not None else final_view.render(),
+            "actions": actions,
+            **fragment_data,
+        }
+
+    async def _render_views(
+        self, current_route: MatchedRoute, views: list[RouteComponent]
+    ) -> tuple[HtmlElement, dict[str, Any], dict[str, str], dict[str, str]]:
+        """
+        Renders the views from the innermost one, returning the final view, the actions of each view,
+        the prerendered html of the view fragments and their versions.
+        """
         final_view = None
         actions = {}
+        fragments: dict[str, str] = {}
+        deferred: tuple[RouteComponent, DeferredFragment] | None = None
 
         for rc in reversed(views):
+            if rc.is_partial and final_view is None and len(views) > 1 and current_route.route.defer_partial:
+                # The partial is rendered after its parent view, which may load it later with an `Island`.
+                deferred = (rc, DeferredFragment(id=rc.id))
+                final_view = deferred[1]
+                continue
+
             final_view = await self._execute_view(
                 route_component=rc,
                 actions=actions,
                 children=final_view,
                 route_args=current_route.args,
             )
+            if deferred is not None:
+                actions = await self._render_deferred(current_route, *deferred, fragments) | actions
+                deferred = None
+            if not rc.is_layout and isinstance(final_view, Fragment):
+                fragments[str(rc.id)] = self._prerender_fragment(final_view)
 
         assert final_view, "Rendering resulted in an empty view."
+        self._subscribe_stream(current_route, views, actions)
 
-        if self.context.request.is_nik_request:
-            assert replaces, "Rendering resulted in no view to replace."
-            return Response.json(
-                {
-                    "replaces": replaces,
-                    "view": final_view.render(),
-                    "actions": actions,
-                },
-                cookies=self.context.request.cookies,
-            )
-        else:
-            final_view.add_child(Script(children=[f"window.__nik__.run({to_json(actions)});"]))
-            return Response.html(
-                final_view.render(),
-                cookies=self.context.request.cookies,
-            )
+        versions = {}
+        client_id = self.context.request.client_id
+        if self.fragments is not None and client_id is not None:
+            versions = {
+                fragment_id: self.fragments.add(client_id, fragment_id, html) for fragment_id, html in fragments.items()
+            }
+
+        return final_view, actions, fragments, versions
+
+    async def _render_deferred(
+        self,
+        current_route: MatchedRoute,
+        partial: RouteComponent,
+        fragment: DeferredFragment,
+        fragments: dict[str, str],
+    ) -> dict[str, Any]:
+        """Renders the partial into the fragment given to its parent view, unless an `Island` claimed it."""
+        actions: dict[str, Any] = {}
+        if fragment.claimed:
+            return actions
+
+        rendered = await self._execute_view(route_component=partial, actions=actions, route_args=current_route.args)
+        fragment.children = rendered.children
+        fragments[str(partial.id)] = self._prerender_fragment(fragment)
+        return actions
+
+    def _subscribe_stream(self, current_route: MatchedRoute, views: list[RouteComponent], actions: dict[str, Any]):
+        """
+        Subscribes the view of a route with a stream to its events, when the view is rendered.
+        The subscription is kept as long as the view fragment is in the page.
+        """
+        route_views = [v for v in current_route.route.views if not v.is_layout and not v.is_partial]
+        if current_route.route.stream is None or not route_views or route_views[-1] not in views:
+            return
+
+        view_id = str(route_views[-1].id)
+        request = self.context.request
+        url = request.path + (f"?{request.query_string.decode('latin-1')}" if request.query_string else "")
+        subscribe = SubscribeStream(view_id, url)
+        actions[view_id] = [*(actions.get(view_id) or []), [subscribe.name, subscribe.to_action()]]
+
+    def _prerender_fragment(self, fragment: Fragment) -> str:
+        """
+        Renders the fragment of a view and keeps its content as a string,
+        so the fragment is not rendered again as part of its layouts.
+        """
+        fragment.children = [fragment._render_child(fragment.children)]
+        return fragment.render()
+
+    def _get_patches(self, replaces: str, fragments: dict[str, str]) -> list | None:
+        """
+        Returns the patches turning the client's version of the replaced fragment into its new render.
+        None when the client's version is unknown (eg: evicted from the cache) and the whole view must be sent.
+        """
+        versions = self.context.request.fragment_versions
+        client_id = self.context.request.client_id
+        if self.fragments is None or client_id is None or not versions or replaces not in versions:
+            return None
+        if replaces not in fragments:
+            return None
+
+        old_content = self.fragments.get(client_id, replaces, versions[replaces])
+        if old_content is None:
+            return None
+        if old_content == fragments[replaces]:
+            return []
+        return compute_patches(old_content, fragments[replaces])
+
+    async def _render_window(self, current_route: MatchedRoute) -> Response:
+        """
+        Renders the next window of a `VirtualList` in the last view of the route.
+        Only the actions appending the new items and observing the following window are returned.
+        """
+        views = [v for v in current_route.route.views if not v.is_layout]
+        assert views, "No views found in the current route for window request"
+
+        actions: dict[str, Any] = {}
+        await self._execute_view(route_component=views[-1], actions=actions, route_args=current_route.args)
+
+        for view_id, view_actions in actions.items():
+            if view_actions is not None:
+                actions[view_id] = [action for action in view_actions if action[0] in WINDOW_ACTIONS] or None
+
+        return Response.json(
+            {"actions": encode_actions(actions, self.context.request.actions_version)},
+            cookies=self.context.request.cookies,
+        )
 
     def _calculate_render_strategy(
         self, current_route: MatchedRoute, previous_route: MatchedRoute | None = None
@@ -143,7 +340,8 @@ class ViewRenderer(BaseRenderer):
     ) -> HtmlElement:  # FIXME: Return type is not only HtmlElement
         """Renders a single RouteComponent."""
 
-        with ViewContext(page=self.context.page) as ctx:
+        window = self.context.request.window_key if self.context.request.is_window_request else None
+        with ViewContext(page=self.context.page, window=window, id_scope=str(route_component.id)) as ctx:
             view_func_kwargs = await self._get_route_component_kwargs(
                 route_component,
                 children=children,
@@ -166,6 +364,15 @@ class ViewRenderer(BaseRenderer):
 
 
 class ActionRenderer(BaseRenderer):
+    def __init__(
+        self,
+        context: RequestContext,
+        router: Router,
+        auth: AuthGuard | None = None,
+    ):
+        super().__init__(context, router)
+        self.auth = auth
+
     async def render(self, matched_route: MatchedRoute) -> Response:
         """
         Renders the route modules that has an action function defined.
@@ -177,6 +384,8 @@ class ActionRenderer(BaseRenderer):
         if isinstance(result, Response):
             return result
 
+        result["actions"] = encode_actions(result["actions"], self.context.request.actions_version)
+
         return Response.json(
             result,
             cookies=self.context.request.cookies,
@@ -186,9 +395,8 @@ class ActionRenderer(BaseRenderer):
         self,
         matched_route: MatchedRoute,
     ):
-        with ViewContext(page=self.context.page) as ctx:
-            assert matched_route.route.action, "No action defined for the matched route"
-
+        assert matched_route.route.action, "No action defined for the matched route"
+        with ViewContext(page=self.context.page, id_scope=str(matched_route.route.action.id)) as ctx:
             view_func_kwargs = await self._get_route_component_kwargs(
                 matched_route.route.action,
                 route_args=matched_route.args,
@@ -206,5 +414,94 @@ class ActionRenderer(BaseRenderer):
 
             if isinstance(result, Response):
                 return result
-            else:
-                return {"actions": {str(matched_route.route.action.id): ctx.get_actions()}}
+
+            refresh = await self._render_refresh(ctx)
+            actions = {str(matched_route.route.action.id): ctx.get_actions()}
+            if refresh is None:
+                return {"actions": actions}
+            return {**refresh, "actions": {**actions, **refresh["actions"]}}
+
+    async def _render_refresh(self, ctx: ViewContext) -> dict[str, Any] | None:
+        """
+        Renders the view refreshed by the action in the same request, when the client sent the path it is showing.
+        The refresh action is then dropped, otherwise (eg: the page is not accessible) the client refreshes the view.
+        """
+        refresh_path = self.context.request.refresh_path
+        refreshes = ctx.actions.get(RefreshView.name)
+        if self.auth is None or refresh_path is None or not refreshes:
+            return None
+
+        refresh = next(iter(refreshes))
+        assert isinstance(refresh, RefreshView)
+        request = self.context.request.for_refresh(refresh_path, refresh.partial)
+        route = self.router.match(request.path)
+        if route is None or not self._can_replace_view(route, refresh.partial):
+            return None
+
+        context = RequestContext(request)
+        context.page.client_src = self.context.page.client_src
+        try:
+            self.auth.authorize(route.route, context)
+        except RoutingError as err:
+            logger.debug(f"View {refresh_path} is not refreshed inline: {err!r}")
+            return None
+
+        update = await ViewRenderer(context, self.router).render_update(route, route)
+        del ctx.actions[RefreshView.name]
+        return update
+
+    @staticmethod
+    def _can_replace_view(route: MatchedRoute, partial: bool) -> bool:
+        """
+        Whether the view (or its partial) of the route has a view to replace it in, as the refresh by the client does.
+        """
+        views = [v for v in route.route.views if not v.is_layout]
+        if not views:
+            return False
+        if views[-1].is_partial:
+            return len(views) > 1
+        return not partial
+
+
+"""Seconds without events after which a keepalive comment is sent."""
+STREAM_KEEPALIVE_INTERVAL = 15.0
+
+
+class StreamRenderer(BaseRenderer):
+    async def render(self, matched_route: MatchedRoute) -> Response:
+        """Streams the actions yielded by the `stream` of the route as server-sent events."""
+        stream = matched_route.route.stream
+        if stream is None:
+            raise MethodNotAllowedError(self.context.request)
+
+        kwargs = await self._get_route_component_kwargs(stream, route_args=matched_route.args)
+        return StreamingResponse(
+            self._encode_events(stream.func(**kwargs)),  # type: ignore[arg-type]
+            disconnected=self.context.request.wait_for_disconnect,
+            headers={"cache-control": "no-cache", "x-accel-buffering": "no"},
+        )
+
+    async def _encode_events(self, items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+        """
+        Encodes the items yielded by the stream. Each item is produced in its own context,
+        so the state operations made before it was yielded are sent along.
+        """
+        iterator = aiter(items)
+        while True:
+            with ViewContext(page=self.context.page) as ctx:
+                next_item = asyncio.ensure_future(anext(iterator))
+
+            try:
+                while not next_item.done():
+                    await asyncio.wait({next_item}, timeout=STREAM_KEEPALIVE_INTERVAL)
+                    if not next_item.done():
+                        yield KEEPALIVE_EVENT.data
+                item = next_item.result()
+            except StopAsyncIteration:
+                return
+            finally:
+                # Closes the stream when the client disconnected while waiting for its next item.
+                next_item.cancel()
+
+            for event in get_stream_events(item, ctx):
+                yield event.data
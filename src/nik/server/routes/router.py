@@ -76,11 +76,15 @@ class Route:
         views: list[RouteComponent],
         action: RouteComponent | None = None,
         permissions: Permissions | None = None,
+        stream: RouteComponent | None = None,
+        defer_partial: bool = False,
     ):
         self.path = path
         self.views = views
         self.action = action
         self.permissions = permissions or {}
+        self.stream = stream
+        self.defer_partial = defer_partial
 
 
 class MatchedRoute:
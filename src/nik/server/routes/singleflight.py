@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+"""
+Collapses identical concurrent calls into one.
+
+The first call of a key runs, the calls made with the same key while it is in flight await it
+and share its result (or exception). Nothing is cached once the call completes.
+
+The call runs in its own task, shared by its callers: a cancelled caller (eg: its client disconnected)
+stops waiting without cancelling the call for the others. It is only cancelled once every caller is gone.
+"""
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: asyncio.Future[T]):
+        self.task = task
+        self.callers = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Counters:
+        calls: calls that ran.
+        collapsed: calls that awaited an identical in-flight call instead of running.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call[T]] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.collapsed += 1
+
+        call.callers += 1
+        try:
+            # Shielded, so a cancelled caller does not cancel the call the others are waiting for.
+            return await asyncio.shield(call.task)
+        finally:
+            call.callers -= 1
+            if call.callers == 0 and not call.task.done():
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call[T]):
+        if self._calls.get(key) is call:
+            del self._calls[key]
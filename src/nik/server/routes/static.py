@@ -3,11 +3,16 @@ from __future__ import annotations
 import mimetypes
 import os
 
+from ..assets import HASHED_ASSET_RE, IMMUTABLE_CACHE_CONTROL, PRECOMPRESSED_ENCODINGS, parse_accept_encoding
 from ..errors import NotFoundError
 from ..response import Response
 
 
-async def serve_static_file(project_root: str, path: str):
+async def serve_static_file(project_root: str, path: str, accept_encoding: str | None = None):
+    """
+    Serves a file of the `public` directory. A precompressed copy (eg: `client.<hash>.js.gz`)
+    is served instead when the client accepts its encoding.
+    """
     try:
         assert path.startswith("/public/"), "Invalid static file path"
 
@@ -22,7 +27,17 @@ async def serve_static_file(project_root: str, path: str):
         if not file_path.startswith(base_path):
             raise NotFoundError()
 
-        with open(file_path, "rb") as file:
+        headers: dict[str, str] = {}
+        read_path = file_path
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if os.path.isfile(file_path + suffix):
+                headers["vary"] = "accept-encoding"
+                if encoding in accepted and read_path == file_path:
+                    headers["content-encoding"] = encoding
+                    read_path = file_path + suffix
+
+        with open(read_path, "rb") as file:
             content = file.read()
 
         content_type, _ = mimetypes.guess_type(path)
@@ -30,7 +45,11 @@ async def serve_static_file(project_root: str, path: str):
             content_type = "application/octet-stream"
         elif content_type.startswith("text/"):
             content_type += "; charset=utf-8"
+        headers["content-type"] = content_type
 
-        return Response(content, status=200, headers={"content-type": content_type})
+        if HASHED_ASSET_RE.match(os.path.basename(file_path)):
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+
+        return Response(content, status=200, headers=headers)
     except (FileNotFoundError, IsADirectoryError) as err:
         raise NotFoundError() from err
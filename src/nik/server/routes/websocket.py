@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, cast
+from urllib.parse import urlsplit
+
+from ..errors import RoutingError, error_handler
+from ..protocol import WEBSOCKET_PATH
+from ..request import receive_body
+from .handler import ACTION_METHODS, RouteHandler, serialize_response
+
+if TYPE_CHECKING:
+    from ..app import Nik
+    from ..authentication.session import Session
+    from ..types import Receive, Scope, Send
+
+"""
+WebSocket transport for nik requests.
+
+The client opens one socket per tab on `WEBSOCKET_PATH` and sends its navigations, partial and form requests
+as messages, which are run like the sub-requests of a batch request. The cookies are only sent with the handshake
+and the session is verified once per connection.
+
+Browsers send the cookies with the handshake of any site, so the handshake is only accepted when its `Origin`
+is the app's own (its host is the `Host` of the handshake) or one of `Nik(websocket_origins=...)`.
+
+Message: {"id": 1, "path": "/patients", "method": "get", "headers": {...}, "body": null}
+Reply:   {"id": 1, "status": 200, "headers": {...}, "body": "..."}
+         {"id": 1, "fallback": true} when the request must be sent over HTTP, eg: it may set cookies.
+Cancel:  {"id": 1, "cancel": true} cancels a request the client no longer waits for, it gets no reply.
+"""
+
+
+class WebSocketHandler:
+    def __init__(
+        self,
+        app: Nik,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ):
+        self.app = app
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self._send_lock = asyncio.Lock()
+        self._tasks: dict[Any, asyncio.Task[None]] = {}
+
+    async def run(self):
+        message = await self.receive()
+        if message["type"] != "websocket.connect":
+            return
+        if self.scope["path"] != WEBSOCKET_PATH or not self._is_allowed_origin():
+            await self.send({"type": "websocket.close", "code": 1008})
+            return
+        await self.send({"type": "websocket.accept"})
+
+        # The handshake is the parent request of the messages, which share its cookies and session.
+        scope = cast("Scope", {**self.scope, "type": "http", "method": "GET"})
+        connection = RouteHandler(self.app, scope, receive_body(b""), watch_disconnect=False)
+        session = connection.auth.get_session(connection.context)
+
+        try:
+            while True:
+                message = await self.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message["type"] == "websocket.receive":
+                    self._receive_message(connection, session, message.get("text"))
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+
+    def _is_allowed_origin(self) -> bool:
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in self.scope["headers"]}
+        origin = headers.get("origin", "").rstrip("/").lower()
+        if not origin or origin == "null":
+            return False
+        if origin in self.app.websocket_origins:
+            return True
+        return urlsplit(origin).netloc == headers.get("host", "").lower()
+
+    def _receive_message(self, connection: RouteHandler, session: Session | None, text: str | None):
+        try:
+            item = json.loads(text or "")
+        except json.JSONDecodeError:
+            return
+        if not isinstance(item, dict) or not isinstance(item.get("id"), (int, str)):
+            return
+
+        message_id = item["id"]
+        if item.get("cancel"):
+            task = self._tasks.pop(message_id, None)
+            if task is not None:
+                task.cancel()
+            return
+
+        task = asyncio.create_task(self._handle_message(connection, session, item))
+        self._tasks[message_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(message_id, None))
+
+    async def _handle_message(self, connection: RouteHandler, session: Session | None, item: dict[str, Any]):
+        reply: dict[str, Any]
+        try:
+            handler = connection.subrequest_handler(item, session)
+        except RoutingError as e:
+            reply = serialize_response(error_handler(e))
+        else:
+            if self._needs_http(handler):
+                reply = {"fallback": True}
+            else:
+                reply = serialize_response(await handler.run())
+
+        async with self._send_lock:
+            await self.send({"type": "websocket.send", "text": json.dumps({"id": item["id"], **reply})})
+
+    def _needs_http(self, handler: RouteHandler) -> bool:
+        """Route components taking cookies may set them, which is only possible in an HTTP response."""
+        route = handler.router.match(handler.request.path)
+        if route is None:
+            return False
+
+        if handler.request.method in ACTION_METHODS:
+            components = [route.route.action] if route.route.action else []
+        else:
+            components = route.route.views
+        return any(param.is_cookies for component in components for param in component.args)
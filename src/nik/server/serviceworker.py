@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from typing import TYPE_CHECKING
+
+from ..utils.string import to_json
+from ..views.context import USER_BOUND_PARAMS
+from .assets import HASHED_ASSET_RE, PRECOMPRESSED_ENCODINGS, minify_js
+
+if TYPE_CHECKING:
+    from .app import RoutesType
+    from .routes.router import Route
+
+"""
+Generates the optional service worker of an app (`Nik(service_worker=True)`), served on `SERVICE_WORKER_PATH`.
+
+The worker precaches the hashed assets of `public/`, serves the other `public/` files cache-first and the pages
+of the public routes stale-while-revalidate. Its version is a hash of the routes and of the content of the
+public files, so a deploy changing them installs a new worker that deletes the caches of the previous version.
+"""
+
+WORKER_SOURCE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "views", "worker.js")
+
+
+def build_service_worker(routes: RoutesType, public_dir: str) -> bytes:
+    static_routes, dynamic_routes = routes
+    route_patterns = [f"^{_escape_js_regex(path)}$" for path, route in static_routes.items() if _is_public(route)]
+    route_patterns.extend(
+        pattern.pattern.replace("(?P<", "(?<") for pattern, route in dynamic_routes if _is_public(route)
+    )
+
+    files = _get_public_files(public_dir)
+    precache = [f"/public/{name}" for name in files if HASHED_ASSET_RE.match(os.path.basename(name))]
+
+    with open(WORKER_SOURCE, encoding="utf-8") as file:
+        source = minify_js(file.read())
+
+    version = hashlib.blake2b(to_json([source, route_patterns, files]).encode("utf-8"), digest_size=8).hexdigest()
+    config = {"version": version, "precache": precache, "routes": route_patterns}
+    return f"const NIK_WORKER = {to_json(config)};\n{source}".encode()
+
+
+def _is_public(route: Route) -> bool:
+    if route.permissions:
+        return False
+    return not any(param.name in USER_BOUND_PARAMS for view in route.views for param in view.args)
+
+
+def _escape_js_regex(value: str) -> str:
+    return re.sub(r"[.*+?^${}()|[\]\\/]", r"\\\g<0>", value)
+
+
+def _get_public_files(public_dir: str) -> dict[str, str]:
+    """Hashes of the content of the public files by their path relative to `public_dir`."""
+    suffixes = tuple(suffix for _, suffix in PRECOMPRESSED_ENCODINGS)
+    files: dict[str, str] = {}
+    for root, _, names in os.walk(public_dir):
+        for name in sorted(names):
+            if name.endswith(suffixes):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as file:
+                digest = hashlib.blake2b(file.read(), digest_size=8).hexdigest()
+            files[os.path.relpath(path, public_dir).replace(os.sep, "/")] = digest
+    return dict(sorted(files.items()))
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Iterable
+from typing import TYPE_CHECKING, Any
+
+from ..utils.string import to_json
+from ..views.context import ViewContext
+
+if TYPE_CHECKING:
+    from ..views.actions import Action
+
+"""
+Server-Sent Events streams of actions.
+
+A route can export a `stream` async generator next to its view. Once the view is rendered, the client opens
+an `EventSource` on the route and runs the actions of every event with the actions of its view.
+Only the actions go over the wire (eg: the row appended to a list), the view is never rendered again.
+
+The stream yields the actions to send: an `Action`, a list of them, a `StreamEvent` or None. The state
+operations made since the previous yield (eg: `rows.append(row)`) are sent as well.
+
+    async def stream():
+        async for event in DASHBOARD.subscribe():
+            yield event
+
+`Topic` fans the events out to many streams: an event is encoded once when it is published
+and the same bytes are sent to every subscriber.
+"""
+
+"""Number of events a subscriber can lag behind before it is closed, its client then reconnects."""
+SUBSCRIBER_MAX_LAG = 256
+
+
+class StreamEvent:
+    """A server-sent event, encoded once and sent as is to every stream."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    @classmethod
+    def from_actions(cls, actions: Iterable[Action]) -> StreamEvent | None:
+        context = ViewContext()
+        for action in actions:
+            context.add_action(action)
+        return cls.from_context(context)
+
+    @classmethod
+    def from_context(cls, context: ViewContext) -> StreamEvent | None:
+        groups = context.get_actions()
+        if groups is None:
+            return None
+        return cls(b"data: " + to_json(groups, separators=(",", ":")).encode("utf-8") + b"\n\n")
+
+
+"""A comment line, sent when the stream is idle so proxies do not close the connection."""
+KEEPALIVE_EVENT = StreamEvent(b": keepalive\n\n")
+
+
+def get_stream_events(item: Any, context: ViewContext) -> list[StreamEvent]:
+    """Events of an item yielded by a stream, preceded by the state operations made in its context."""
+    events = [StreamEvent.from_context(context)]
+    if isinstance(item, StreamEvent):
+        events.append(item)
+    elif item is not None:
+        events.append(StreamEvent.from_actions(item if isinstance(item, Iterable) else [item]))
+    return [event for event in events if event is not None]
+
+
+class Topic:
+    """
+    Publishes actions to every stream subscribed to the topic.
+
+    Usage:
+        DASHBOARD = Topic()
+
+        # In an action, or a background task
+        DASHBOARD.publish(UpdateState(State("orders", []), order, "append"))
+
+        # In route.py
+        async def stream():
+            async for event in DASHBOARD.subscribe():
+                yield event
+    """
+
+    def __init__(self, max_lag: int = SUBSCRIBER_MAX_LAG):
+        self.max_lag = max_lag
+        self._subscribers: set[asyncio.Queue[StreamEvent | None]] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, *actions: Action) -> None:
+        """Sends the actions to the subscribers, it can be called from a sync action running in a thread."""
+        event = StreamEvent.from_actions(actions)
+        if event is None or self._loop is None:
+            return
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._dispatch(event)
+        else:
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event: StreamEvent):
+        for queue in list(self._subscribers):
+            if queue.qsize() >= self.max_lag:
+                # The state of a subscriber that does not keep up is lost, it is closed and its client reconnects.
+                self._subscribers.discard(queue)
+                queue.put_nowait(None)
+            else:
+                queue.put_nowait(event)
+
+    async def subscribe(self) -> AsyncGenerator[StreamEvent, None]:
+        """Yields the events published from now on, until the stream is closed."""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[StreamEvent | None] = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+        finally:
+            self._subscribers.discard(queue)
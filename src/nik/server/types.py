@@ -7,7 +7,7 @@ RawHeaders = Iterable[tuple[bytes, bytes]]
 
 
 class Scope(TypedDict):
-    type: Literal["http", "lifespan"]
+    type: Literal["http", "websocket", "lifespan"]
     method: str
     scheme: str
     path: str
@@ -1,15 +1,40 @@
 from __future__ import annotations
 
 import asyncio
+import threading
 from collections.abc import Callable
+from contextvars import ContextVar
 from typing import Any, TypeVar
 
 T = TypeVar("T")
 
+_cancelled: ContextVar[threading.Event | None] = ContextVar("nik_thread_cancelled", default=None)
+
 
 async def run_sync_in_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
     """
     Run a synchronous callable in the default asyncio thread pool.
     ContextVars are automatically propagated by asyncio.to_thread.
+
+    When the caller is cancelled (eg: the client disconnected), a call still waiting for a thread never runs.
+    A running call can not be interrupted, but it can stop early with `raise_if_cancelled`.
+    """
+    cancelled = threading.Event()
+    token = _cancelled.set(cancelled)
+    try:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    except asyncio.CancelledError:
+        cancelled.set()
+        raise
+    finally:
+        _cancelled.reset(token)
+
+
+def raise_if_cancelled():
+    """
+    Raises `asyncio.CancelledError` in a sync view or action whose request was cancelled,
+    eg: between the steps of a long computation.
     """
-    return await asyncio.to_thread(func, *args, **kwargs)
+    cancelled = _cancelled.get()
+    if cancelled is not None and cancelled.is_set():
+        raise asyncio.CancelledError()
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, ClassVar, Literal
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from .callbacks import UpdateState as UpdateStateCallback
 from .context import ViewContext
 
 if TYPE_CHECKING:
-    from .callbacks import Callback
+    from .callbacks import Callback, StateOperation
     from .data import Id, State
 
 
@@ -83,7 +84,7 @@ class SubscribeObservable(Action):
 class UpdateState(Action):
     name: ClassVar[str] = "updateState"
 
-    def __init__(self, state: State, value: Any, operation: Literal["append"] | None = None):
+    def __init__(self, state: State, value: Any, operation: StateOperation | None = None):
         self.callback = UpdateStateCallback(state, value, operation)
 
     def to_action(self) -> list:
@@ -106,12 +107,38 @@ class Redirect(Action):
 class ListenSubmit(Action):
     name: ClassVar[str] = "listenSubmit"
 
-    def __init__(self, form_id: Id, reset_after_success: bool):
+    def __init__(
+        self,
+        form_id: Id,
+        reset_after_success: bool,
+        optimistic: Sequence[UpdateStateCallback] = (),
+    ):
         self.form_id = form_id
         self.reset_after_success = reset_after_success
+        self.optimistic = optimistic
 
     def to_action(self) -> list:
-        return [self.form_id, self.reset_after_success]
+        if not self.optimistic:
+            return [self.form_id, self.reset_after_success]
+        return [self.form_id, self.reset_after_success, _optimistic_updates(self.optimistic)]
+
+
+class Optimistic(Action):
+    """State updates applied by the client as soon as the button submits its form, see `Form(optimistic=...)`."""
+
+    name: ClassVar[str] = "optimistic"
+
+    def __init__(self, id: Id, updates: Sequence[UpdateStateCallback]):
+        self.id = id
+        self.updates = updates
+
+    def to_action(self) -> list:
+        return [self.id, _optimistic_updates(self.updates)]
+
+
+def _optimistic_updates(updates: Sequence[UpdateStateCallback]) -> list[list]:
+    """The arguments of the `updateState` actions, without the action name."""
+    return [update.to_action()[1:] for update in updates]
 
 
 class BindValue(Action):
@@ -133,3 +160,41 @@ class RefreshView(Action):
 
     def to_action(self) -> list:
         return [self.partial]
+
+
+class ObserveWindow(Action):
+    name: ClassVar[str] = "observeWindow"
+
+    def __init__(self, parent_id: Id, state: State, cursor: Any, url: str | None, cursor_param: str):
+        self.parent_id = parent_id
+        self.state = state
+        self.cursor = cursor
+        self.url = url
+        self.cursor_param = cursor_param
+
+    def to_action(self) -> list:
+        return [self.parent_id, self.state.key, self.cursor, self.url, self.cursor_param]
+
+
+class SubscribeStream(Action):
+    name: ClassVar[str] = "subscribeStream"
+
+    def __init__(self, view_id: str, url: str):
+        self.view_id = view_id
+        self.url = url
+
+    def to_action(self) -> list:
+        return [self.view_id, self.url]
+
+
+class LoadIsland(Action):
+    """Loads the partial of the route into the placeholder of an `Island`, see `Island(trigger=...)`."""
+
+    name: ClassVar[str] = "loadIsland"
+
+    def __init__(self, fragment_id: Id, trigger: str):
+        self.fragment_id = fragment_id
+        self.trigger = trigger
+
+    def to_action(self) -> list:
+        return [self.fragment_id, self.trigger]
@@ -3,6 +3,8 @@ from __future__ import annotations
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, ClassVar, Literal
 
+from .templates import get_item_template
+
 """
 Callback classes for handling client-side actions.
 Callbacks are triggered by the actions.
@@ -17,6 +19,12 @@ if TYPE_CHECKING:
     from .data import Id, State, When
     from .elements import Element
 
+"""
+Operations of `UpdateState`, the value is replaced as a whole when no operation is given.
+Except for "append" and "extend", the value of the action is the payload of the operation (eg: index to remove).
+"""
+StateOperation = Literal["append", "extend", "remove", "insert", "patch", "move"]
+
 
 class Callback:
     name: ClassVar[str]
@@ -28,7 +36,7 @@ class Callback:
 class UpdateState(Callback):
     name: ClassVar[str] = "updateState"
 
-    def __init__(self, state: State, value: Any, operation: Literal["append"] | None = None):
+    def __init__(self, state: State, value: Any, operation: StateOperation | None = None):
         self.state = state
         self.value = value
         self.operation = operation
@@ -76,16 +84,6 @@ class PartialFetch(Callback):
         return [self.name, self.data, self.url]
 
 
-class _TemplateRefDict:
-    """No matter what key is given always return the name of the key."""
-
-    def __getitem__(self, key: str) -> str:
-        return "{{value." + key + "}}"
-
-    def __getattr__(self, item: str) -> str:
-        return "{{value." + item + "}}"
-
-
 class InsertElements(Callback):
     name = "insertElements"
 
@@ -94,13 +92,7 @@ class InsertElements(Callback):
         self.parent_id = parent_id
 
     def to_action(self) -> list:
-        pseudo_dict = _TemplateRefDict()
-        if callable(self.element):
-            template = self.element(pseudo_dict).render()
-        else:
-            template = self.element.render()
-
-        return [self.name, template, self.parent_id]
+        return [self.name, get_item_template(self.element).html, self.parent_id]
 
 
 class ReactiveAttribute(Callback):
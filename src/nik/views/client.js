@@ -7,6 +7,9 @@
       this.is_primitive = isPrimitive(value);
       this.is_dict = isDict(value);
       this.is_array = Array.isArray(value);
+      // Incremented on every change, so changes are detected without comparing the values.
+      this.version = 0;
+      this.disposed = false;
     }
 
     get value() {
@@ -22,46 +25,49 @@
     }
 
     update(newValue, path, operation) {
+      if (DELTA_OPERATIONS.includes(operation)) {
+        return this.applyDelta(newValue, path, operation);
+      }
+
       const oldValue = this._value;
 
       // full update
       if (!path) {
-        if (operation === "append") {
+        if (operation === "append" || operation === "extend") {
           if (!this.is_array) {
             return console.error(
-              "Append operation is only supported for arrays",
+              "Append and extend operations are only supported for arrays",
               { currentValue: oldValue, newValue }
             );
           }
 
-          this._value = [...oldValue, newValue];
-          this._global_listeners.forEach((fn) =>
-            fn(oldValue, this._value, path, operation)
-          );
-        } else if (!deepEqual(this._value, newValue)) {
-          const field_listeners = [];
+          this._value =
+            operation === "append"
+              ? [...oldValue, newValue]
+              : [...oldValue, ...newValue];
+          this.version++;
+          this.notify(this._global_listeners, oldValue, this._value, path, {
+            operation,
+          });
+        } else if (!sameValue(oldValue, newValue)) {
+          this._value = newValue;
+          this.version++;
+          this.notify(this._global_listeners, oldValue, newValue, path, {
+            operation,
+          });
           if (this.is_dict) {
             for (const [key, listeners] of Object.entries(this._listeners)) {
-              if (
-                // Key added or its value changed
-                !deepEqual(this._value[key], newValue[key]) ||
-                // Key removed
-                (!newValue[key] && this._value[key] !== undefined)
-              ) {
-                field_listeners.push(
-                  ...listeners.map((fn) => {
-                    return () => fn(oldValue[key], newValue[key], key);
-                  })
+              // Key added, removed or its value changed
+              if (!sameValue(oldValue[key], newValue && newValue[key])) {
+                this.notify(
+                  listeners,
+                  oldValue[key],
+                  newValue && newValue[key],
+                  key
                 );
               }
             }
           }
-
-          this._value = newValue;
-          this._global_listeners.forEach((fn) =>
-            fn(oldValue, newValue, path, operation)
-          );
-          field_listeners.forEach((fn) => fn());
         }
       } else {
         if (this.is_primitive) {
@@ -70,10 +76,11 @@
             { currentValue: this._value, newValue, path }
           );
         } else if (this.is_dict) {
-          if (!deepEqual(this._value[path], newValue)) {
+          const oldItem = this._value[path];
+          if (!sameValue(oldItem, newValue)) {
             this._value[path] = newValue;
-            const listeners = this._listeners[path] || [];
-            listeners.forEach((fn) => fn(newValue));
+            this.version++;
+            this.notify(this._listeners[path], oldItem, newValue, path);
           }
         } else if (this.is_array) {
           console.error("not implemented for arrays", {
@@ -89,6 +96,85 @@
       }
     }
 
+    /**
+     * Applies a delta operation (see DELTA_OPERATIONS) in place.
+     * Only the listeners of the changed value are notified, with the delta as the last argument.
+     *
+     * @param {any} delta Payload of the operation, eg: index of the item to remove
+     * @param {String|null} path Property the operation applies to, the whole value if not given
+     * @param {String} operation
+     * @returns {void}
+     */
+    applyDelta(delta, path, operation) {
+      const target = path ? this._value[path] : this._value;
+      if (target === null || typeof target !== "object") {
+        return console.error(
+          `Operation "${operation}" requires an array or a dictionary`,
+          { currentValue: target, delta, path }
+        );
+      }
+
+      // Key of the dictionary item replaced as a whole by the operation, if any.
+      let changedKey;
+      if (!Array.isArray(target)) {
+        changedKey = operation === "remove" ? delta : delta[0][0];
+      }
+      const oldItem = changedKey === undefined ? undefined : target[changedKey];
+
+      applyDelta(target, operation, delta);
+      this.version++;
+
+      if (path) {
+        this.notify(this._listeners[path], target, target, path, {
+          operation,
+          delta,
+        });
+        return;
+      }
+
+      this.notify(this._global_listeners, this._value, this._value, path, {
+        operation,
+        delta,
+      });
+      if (changedKey !== undefined) {
+        this.notify(
+          this._listeners[changedKey],
+          oldItem,
+          this._value[changedKey],
+          changedKey
+        );
+      }
+    }
+
+    /**
+     * Queues the notification of the listeners, they run in the next animation frame.
+     *
+     * @param {Array<Function>|undefined} listeners
+     * @param {any} oldValue
+     * @param {any} newValue
+     * @param {String|null} path
+     * @param {Object} options
+     * @param {String} options.operation
+     * @param {any} options.delta
+     * @returns {void}
+     */
+    notify(listeners, oldValue, newValue, path, { operation, delta } = {}) {
+      for (const fn of listeners || []) {
+        notifications.push(this, fn, {
+          oldValue,
+          newValue,
+          path,
+          operation,
+          delta,
+        });
+      }
+    }
+
+    /**
+     * Listeners are called with `(oldValue, newValue, path, operation, delta)`.
+     * Global listeners are notified of every change, path listeners
+     * of the changes of a dictionary key.
+     */
     subscribe(fn, path) {
       if (!path) {
         this._global_listeners.push(fn);
@@ -100,6 +186,31 @@
       }
     }
 
+    unsubscribe(fn, path) {
+      const listeners = path ? this._listeners[path] : this._global_listeners;
+      const index = listeners ? listeners.indexOf(fn) : -1;
+      if (index !== -1) {
+        listeners.splice(index, 1);
+      }
+    }
+
+    get listenerCount() {
+      return Object.values(this._listeners).reduce(
+        (count, listeners) => count + listeners.length,
+        this._global_listeners.length
+      );
+    }
+
+    /**
+     * Drops the listeners and their pending notifications,
+     * once the observable is replaced by a new render.
+     */
+    dispose() {
+      this.disposed = true;
+      this._global_listeners = [];
+      this._listeners = {};
+    }
+
     bool() {
       if (this.is_primitive) {
         return Boolean(this._value);
@@ -202,231 +313,1258 @@
     return false;
   }
 
-  function debounce(func, wait) {
-    let timeout;
-    return function (...args) {
-      clearTimeout(timeout);
-      timeout = setTimeout(() => func.apply(this, args), wait);
-    };
-  }
+  const DELTA_OPERATIONS = ["remove", "insert", "patch", "move"];
 
   /**
-   * nik version of fetch that includes additional headers
+   * Compares two values one level deep: arrays and dictionaries are the same if their items are identical.
+   * Nested values received from the server are new objects, so they are reported as changed.
    *
-   * @param {String} url
-   * @param {Object} options
-   * @param {Object} options.type - The type of request (e.g., "link", "partial")
-   * @param {String} options.previousPath - The previous path for the request
-   * @param {Object} fetchOptions.headers - Additional headers to include in the request
-   * @param {String} fetchOptions.method - The HTTP method to use (default: "get")
-   * @param {String} fetchOptions.body - The body of the request (eg: for POST requests)
-   * @returns {Promise<Response>} The fetch response
+   * @param {any} a
+   * @param {any} b
+   * @returns {boolean}
    */
-  function nikFetch(
-    url,
-    { type = "link", previousPath } = {},
-    { method = "get", body, headers = {} } = {}
-  ) {
-    let contentType = "";
-    if (type === "link" || type === "partial") {
-      contentType = "application/json";
-    } else if (type === "form" && !headers["content-type"]) {
-      throw new Error("Content-Type must be set for form requests.");
+  function sameValue(a, b) {
+    if (a === b) {
+      return true;
     }
-
-    return fetch(url, {
-      method,
-      headers: {
-        "x-nik-request": "1",
-        "x-nik-request-type": type,
-        ...(previousPath && { "x-nik-previous-path": previousPath }),
-        "content-type": contentType,
-        ...headers,
-      },
-      ...(body && { body }),
-    });
-  }
-
-  /**
-   * @param {String} callbackName
-   * @returns {Function}
-   * @throws {Error} If the callback does not exist
-   * */
-  function getCallback(callbackName) {
-    const callback = callbacks[callbackName];
-    if (!callback) {
-      throw new Error(`Callback "${callbackName}" does not exist.`);
+    if (Array.isArray(a) && Array.isArray(b)) {
+      return a.length === b.length && a.every((item, i) => item === b[i]);
     }
-    return (...args) => {
-      return callback(...args);
-    };
-  }
-
-  /**
-   * @param {String} id
-   * @returns {HTMLElement}
-   * @throws {Error} If the element with the given ID does not exist
-   */
-  function getElementById(id) {
-    const elm = document.getElementById(id);
-    if (!elm) {
-      throw new Error(`Element with ID "${id}" does not exist.`);
+    if (isDict(a) && isDict(b)) {
+      const keys = Object.keys(a);
+      return (
+        keys.length === Object.keys(b).length &&
+        keys.every((key) => key in b && a[key] === b[key])
+      );
     }
-    return elm;
+    return false;
   }
 
-  const callbacks = {
-    consoleLog: (message) => {
-      console.log("ConsoleLog:", message);
-    },
+  const APPEND_OPERATIONS = ["append", "extend"];
 
-    toggleShow(elementId, { observable } = {}) {
-      const element = getElementById(elementId);
-      if (observable.bool()) {
-        element.style.display = "block";
-      } else {
-        element.style.display = "none";
-      }
-    },
+  // Bound on the flushes run in one frame, when listeners keep updating observables.
+  const MAX_FLUSH_ROUNDS = 100;
+
+  /**
+   * Coalesces the notifications of the observable listeners into one flush per animation frame,
+   * so a burst of updates writes the DOM once.
+   *
+   * A listener notified several times in a frame runs once: appends are merged into one extend,
+   * any other mix of operations becomes a full update from the first old value to the latest value.
+   */
+  class NotificationQueue {
+    pending = new Map();
+    scheduled = false;
 
     /**
-     * Toggles a class on an element based on the value of an observable.
-     * The condition result should be true to add the class, false to remove it.
-     *
-     * @param {String} elementId ID of the element to toggle class on
-     * @param {equal_to|not_equal_to} op operation to perform
-     * @param {Any} op_value value to compare against
-     * @param {String} className class to toggle
+     * @param {Observable} observable
+     * @param {Function} fn
+     * @param {Object} notification
      * @returns {void}
      */
-    toggleClass: (
-      elementId,
-      op,
-      op_value,
-      className,
-      { observable, observableProp } = {}
-    ) => {
-      const element = getElementById(elementId);
-
-      let result = observable[op](op_value, observableProp);
-      if (result) {
-        element.classList.add(className);
+    push(observable, fn, notification) {
+      const queued = this.pending.get(fn);
+      if (!queued) {
+        this.pending.set(fn, { observable, ...notification });
       } else {
-        element.classList.remove(className);
+        const appending =
+          APPEND_OPERATIONS.includes(queued.operation) &&
+          APPEND_OPERATIONS.includes(notification.operation);
+        // In place deltas leave the same value, the listener must still run.
+        queued.forced =
+          queued.forced ||
+          queued.delta !== undefined ||
+          notification.delta !== undefined;
+        queued.newValue = notification.newValue;
+        queued.path = notification.path;
+        queued.operation = appending ? "extend" : undefined;
+        queued.delta = undefined;
       }
-    },
-
-    reactiveAttribute: (elmId, attribute, condition, { observable } = {}) => {
-      const elm = getElementById(elmId);
+      this.schedule();
+    }
 
-      if (BOOLEAN_ATTRIBUTES.includes(attribute)) {
-        const _value =
-          condition === "WhenNot" ? !observable.value : observable.value;
-        if (_value) {
-          elm.setAttribute(attribute, "");
-        } else {
-          elm.removeAttribute(attribute);
-        }
+    schedule() {
+      if (this.scheduled) {
+        return;
+      }
+      this.scheduled = true;
+      if (window.requestAnimationFrame) {
+        window.requestAnimationFrame(this.flush);
       } else {
-        throw new Error("Not implemented for attribute: " + attribute);
+        setTimeout(this.flush, 0);
       }
-    },
-
-    updateFormStateClass: (formId, loadingClass, errorClass, { app } = {}) => {
-      const formState = app.getObservable(formId + "_form_state");
-      const form = getElementById(formId);
+    }
 
-      if (formState.value === "loading") {
-        form.classList.add(loadingClass);
-        form.classList.remove(errorClass);
-      } else if (formState.value === "error") {
-        form.classList.add(errorClass);
-        form.classList.remove(loadingClass);
-      } else if (formState.value === "ready") {
-        form.classList.remove(loadingClass);
-        form.classList.remove(errorClass);
+    flush = () => {
+      this.scheduled = false;
+      for (let round = 0; round < MAX_FLUSH_ROUNDS; round++) {
+        if (!this.pending.size) {
+          return;
+        }
+        const pending = this.pending;
+        this.pending = new Map();
+        for (const [fn, notification] of pending) {
+          this.notify(fn, notification);
+        }
       }
-    },
-
-    /**
-     *
-     * @param {String} template Html template
-     * @param {String} parentId Element id of the parent container
-     * @param {Object} options
-     * @param {Observable} options.observable Observable that contains the data to render
-     * @param {String} options.observableProp Property of the observable to iterate over
-     * @param {String} options.operation Operation to perform (e.g., "append")
-     * @param {any} options.oldValue Old value of the observable
-     * @param {any} options.newValue New value of the observable
-     * @param {NikApp} options.app Instance of the NikApp
-     * @returns {void}
-     */
-    insertElements: (
-      template,
-      parentId,
-      { observable, observableProp, operation, oldValue, newValue, app } = {}
-    ) => {
-      const parent = getElementById(parentId);
-
-      let iterableValue = observable.value;
-      if (operation === "append") {
-        iterableValue = newValue.slice(oldValue.length);
-      } else if (observableProp) {
-        iterableValue = observable.getPropValue(observableProp);
+      if (this.pending.size) {
+        this.schedule();
       }
+    };
 
-      if (!iterableValue) {
-        parent.innerHTML = "";
+    notify(fn, notification) {
+      const { observable, oldValue, newValue, path, operation, delta } =
+        notification;
+      const changed =
+        notification.forced ||
+        operation !== undefined ||
+        delta !== undefined ||
+        !sameValue(oldValue, newValue);
+      if (observable.disposed || !changed) {
         return;
       }
-
-      if (!Array.isArray(iterableValue)) {
-        console.warn("InsertElements callback requires an array observable.", {
-          observable,
-          observableProp,
-          iterableValue,
-        });
-        return;
+      try {
+        fn(oldValue, newValue, path, operation, delta);
+      } catch (error) {
+        console.error("Observable listener failed:", error);
       }
+    }
+  }
 
-      function resolvePath(obj, path) {
-        return path.split(".").reduce((acc, part) => acc && acc[part], obj);
-      }
+  const notifications = new NotificationQueue();
 
-      let html = "";
-      for (const value of iterableValue) {
-        html += template.replace(/{{\s*([^}]+)\s*}}/g, (_, expr) => {
-          if (expr.startsWith("value.")) {
-            return resolvePath({ value }, expr);
-          }
-          return resolvePath(value, expr);
-        });
-      }
+  /**
+   * Actions binding the rendered elements and their state.
+   * They are only run again for the views whose fragment changed when the page is morphed.
+   */
+  const BINDING_ACTIONS = [
+    "registerObservable",
+    "subscribeObservable",
+    "onClick",
+    "listenSubmit",
+    "bindValue",
+    "observeWindow",
+    "subscribeStream",
+    "optimistic",
+    "loadIsland",
+  ];
+
+  // Milliseconds after which an idle island is loaded even if the browser is busy.
+  const ISLAND_IDLE_TIMEOUT = 2000;
 
-      if (operation === "append") {
-        parent.innerHTML += html;
+  /**
+   * Applies a delta operation to an array or a dictionary in place.
+   *
+   * @param {Array|Object} target
+   * @param {String} operation
+   * @param {any} delta
+   * @returns {void}
+   */
+  function applyDelta(target, operation, delta) {
+    if (operation === "remove") {
+      if (Array.isArray(target)) {
+        target.splice(delta, 1);
       } else {
-        parent.innerHTML = html;
+        delete target[delta];
       }
-    },
+    } else if (operation === "insert") {
+      const [index, value] = delta;
+      target.splice(index, 0, value);
+    } else if (operation === "patch") {
+      const [path, value] = delta;
+      let obj = target;
+      for (const part of path.slice(0, -1)) {
+        obj = obj[part];
+      }
+      obj[path[path.length - 1]] = value;
+    } else if (operation === "move") {
+      const [fromIndex, toIndex] = delta;
+      const [item] = target.splice(fromIndex, 1);
+      target.splice(toIndex, 0, item);
+    }
+  }
 
-    /**
-     * Triggers a partial fetch source.
-     *
-     * @param {Object} data Query parameters to send with the request
-     * @param {String} path The base path for the fetch request
-     * @param {Object} options
-     * @param {NikApp} options.app Instance of the NikApp
-     * @returns {void}
-     */
-    partialFetch: (data, path, { app } = {}) => {
-      const basePath = path || "";
+  // Version of the actions wire format requested from the server, see `nik/server/protocol.py`.
+  const ACTIONS_VERSION = "2";
+  // Must match `ACTION_OPCODES` in `nik/server/protocol.py`.
+  const ACTION_OPCODES = [
+    "registerObservable",
+    "subscribeObservable",
+    "onClick",
+    "listenSubmit",
+    "updateState",
+    "bindValue",
+    "redirect",
+    "refreshView",
+    "observeWindow",
+    "subscribeStream",
+    "optimistic",
+    "loadIsland",
+  ];
 
-      const params = new URLSearchParams();
-      for (const key in data) {
-        if (data.hasOwnProperty(key)) {
-          params.append(key, data[key]);
-        }
+  /**
+   * Decodes the compact (v2) actions format into the legacy format
+   * of view ids to lists of [actionName, ...params].
+   *
+   * @param {Object} encoded
+   * @param {Array} encoded.t Table of the strings referred to as "~<index>"
+   * @param {Object} encoded.a Actions of the views with opcodes instead of names
+   * @returns {Object}
+   */
+  function decodeActions({ t: table, a: views }) {
+    const decodeArg = (arg) => {
+      if (typeof arg !== "string" || arg[0] !== "~") {
+        return arg;
+      }
+      return arg[1] === "~" ? arg.slice(1) : table[Number(arg.slice(1))];
+    };
+
+    const actions = {};
+    for (const [viewId, viewActions] of Object.entries(views)) {
+      actions[viewId] =
+        viewActions &&
+        viewActions.map(([opcode, ...params]) => [
+          typeof opcode === "number" ? ACTION_OPCODES[opcode] : opcode,
+          ...params.map((args) => args.map(decodeArg)),
+        ]);
+    }
+    return actions;
+  }
+
+  const HTML_ESCAPES = {
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+  };
+
+  /**
+   * Escapes a template value the same way the server fills ForEach templates.
+   *
+   * @param {any} value
+   * @returns {String}
+   */
+  function escapeHtml(value) {
+    if (value === null || value === undefined) {
+      return "";
+    }
+    return String(value).replace(/[&<>"']/g, (char) => HTML_ESCAPES[char]);
+  }
+
+  function resolvePath(obj, path) {
+    return path.split(".").reduce((acc, part) => acc && acc[part], obj);
+  }
+
+  /**
+   * Renders the ForEach item template for each of the values.
+   *
+   * @param {String} template Html template
+   * @param {Array} values
+   * @returns {String}
+   */
+  function renderTemplate(template, values) {
+    let html = "";
+    for (const value of values) {
+      html += template.replace(/{{\s*([^}]+)\s*}}/g, (_, expr) => {
+        if (expr.startsWith("value.")) {
+          return escapeHtml(resolvePath({ value }, expr));
+        }
+        return escapeHtml(resolvePath(value, expr));
+      });
+    }
+    return html;
+  }
+
+  const PLACEHOLDER_PATTERN = /{{\s*([^}]+?)\s*}}/;
+
+  function fillPlaceholders(parts, value) {
+    let text = parts[0];
+    for (let i = 1; i < parts.length; i += 2) {
+      const expr = parts[i];
+      const resolved = expr.startsWith("value.")
+        ? resolvePath({ value }, expr)
+        : resolvePath(value, expr);
+      text += resolved === null || resolved === undefined ? "" : resolved;
+      text += parts[i + 1];
+    }
+    return text;
+  }
+
+  /**
+   * A ForEach item template parsed once into a `<template>` element.
+   * The text nodes and attributes holding placeholders are addressed by their path
+   * of `childNodes` indexes, so items are rendered by cloning the parsed nodes
+   * and setting the values, without parsing HTML again.
+   */
+  class CompiledTemplate {
+    constructor(element, bindings) {
+      this.element = element;
+      this.bindings = bindings;
+    }
+
+    /**
+     * @param {String} html Html template
+     * @returns {CompiledTemplate|null} Null if a placeholder is not in a text or an attribute value
+     */
+    static compile(html) {
+      const element = document.createElement("template");
+      element.innerHTML = html;
+
+      const bindings = [];
+      const visit = (node, path) => {
+        if (node.nodeType === 3) {
+          const parts = node.data.split(PLACEHOLDER_PATTERN);
+          if (parts.length > 1) {
+            bindings.push({ path, attribute: null, parts });
+          }
+        } else if (node.nodeType === 1) {
+          for (const { name, value } of node.attributes) {
+            const parts = value.split(PLACEHOLDER_PATTERN);
+            if (parts.length > 1) {
+              bindings.push({ path, attribute: name, parts });
+            }
+          }
+        }
+        node.childNodes.forEach((child, i) => visit(child, [...path, i]));
+      };
+      element.content.childNodes.forEach((child, i) => visit(child, [i]));
+
+      const bound = bindings.reduce(
+        (count, { parts }) => count + (parts.length - 1) / 2,
+        0
+      );
+      const placeholders = html.split(PLACEHOLDER_PATTERN).length;
+      return bound === (placeholders - 1) / 2
+        ? new CompiledTemplate(element, bindings)
+        : null;
+    }
+
+    /**
+     * @param {Array} values
+     * @returns {DocumentFragment}
+     */
+    render(values) {
+      const fragment = document.createDocumentFragment();
+      for (const value of values) {
+        const nodes = this.element.content.cloneNode(true);
+        for (const { path, attribute, parts } of this.bindings) {
+          let node = nodes;
+          for (const index of path) {
+            node = node.childNodes[index];
+          }
+          const text = fillPlaceholders(parts, value);
+          if (attribute === null) {
+            node.data = text;
+          } else {
+            node.setAttribute(attribute, text);
+          }
+        }
+        fragment.appendChild(nodes);
+      }
+      return fragment;
+    }
+  }
+
+  // Compiled templates by their html, null for the templates rendered as strings.
+  const compiledTemplates = new Map();
+
+  /**
+   * Renders the ForEach item template for each of the values into a single fragment,
+   * so a batch of items is inserted at once.
+   *
+   * @param {String} template Html template
+   * @param {Array} values
+   * @returns {DocumentFragment}
+   */
+  function renderItems(template, values) {
+    if (!compiledTemplates.has(template)) {
+      compiledTemplates.set(template, CompiledTemplate.compile(template));
+    }
+    const compiled = compiledTemplates.get(template);
+    return compiled
+      ? compiled.render(values)
+      : htmlToNodes(renderTemplate(template, values));
+  }
+
+  /**
+   * Updates the rendered items of a ForEach for a delta operation.
+   * The children of the parent element are expected to be the rendered items.
+   *
+   * @param {HTMLElement} parent
+   * @param {String} template Html template
+   * @param {Array} items Items after the operation was applied
+   * @param {String} operation
+   * @param {any} delta
+   * @returns {void}
+   */
+  function updateElements(parent, template, items, operation, delta) {
+    const children = parent.children;
+
+    if (operation === "remove") {
+      if (children[delta]) {
+        children[delta].remove();
+      }
+    } else if (operation === "insert") {
+      const [index, value] = delta;
+      parent.insertBefore(
+        renderItems(template, [value]),
+        children[index] || null
+      );
+    } else if (operation === "patch") {
+      const index = delta[0][0];
+      if (children[index]) {
+        children[index].replaceWith(renderItems(template, [items[index]]));
+      }
+    } else if (operation === "move") {
+      const [fromIndex, toIndex] = delta;
+      const node = children[fromIndex];
+      if (node) {
+        node.remove();
+        parent.insertBefore(node, children[toIndex] || null);
+      }
+    }
+  }
+
+  /**
+   * Creates the nodes of an HTML string.
+   *
+   * @param {String} html
+   * @returns {DocumentFragment}
+   */
+  function htmlToNodes(html) {
+    const template = document.createElement("template");
+    template.innerHTML = html;
+    return template.content;
+  }
+
+  /**
+   * Resolves a patch path of `childNodes` indexes from the root,
+   * checking that the node is the one the server expects.
+   *
+   * @param {Node} root
+   * @param {Array<Number>} path
+   * @param {String} nodeName
+   * @returns {Node}
+   * @throws {Error} If the DOM does not match the server's version
+   */
+  function resolvePatchNode(root, path, nodeName) {
+    let node = root;
+    for (const index of path) {
+      node = node && node.childNodes[index];
+    }
+    if (!node || node.nodeName.toLowerCase() !== nodeName) {
+      throw new Error(`Patch target ${path.join(".")} is not a ${nodeName}.`);
+    }
+    return node;
+  }
+
+  /**
+   * Applies the patches computed by the server to a fragment.
+   *
+   * @param {HTMLElement} root The fragment element
+   * @param {Array} patches
+   * @returns {void}
+   * @throws {Error} If the DOM does not match the server's version
+   */
+  function applyPatches(root, patches) {
+    const changed = new Set();
+
+    for (const [type, path, nodeName, ...args] of patches) {
+      const node = resolvePatchNode(root, path, nodeName);
+
+      if (type === "replace") {
+        const content = htmlToNodes(args[0]);
+        content.childNodes.forEach((child) => changed.add(child));
+        node.replaceWith(content);
+      } else if (type === "text") {
+        node.data = args[0];
+        changed.add(node);
+      } else if (type === "attrs") {
+        const [attributes, removed] = args;
+        for (const [name, value] of Object.entries(attributes)) {
+          node.setAttribute(name, value === null ? "" : value);
+        }
+        for (const name of removed) {
+          node.removeAttribute(name);
+        }
+        changed.add(node);
+      } else if (type === "insert") {
+        const [index, html] = args;
+        node.insertBefore(htmlToNodes(html), node.childNodes[index] || null);
+        changed.add(node);
+      } else if (type === "remove") {
+        changed.add(node.parentNode);
+        node.remove();
+      } else {
+        throw new Error(`Unknown patch "${type}".`);
+      }
+    }
+
+    return changed;
+  }
+
+  /**
+   * Returns the key matching the elements of two renders, the `data-key` attribute or the id.
+   *
+   * @param {Node} node
+   * @returns {String|null}
+   */
+  function morphKey(node) {
+    if (node.nodeType !== 1) {
+      return null;
+    }
+    return node.getAttribute("data-key") || node.id || null;
+  }
+
+  /**
+   * Updates the attributes of the target to the ones of the source.
+   *
+   * @param {HTMLElement} target
+   * @param {HTMLElement} source
+   * @returns {Boolean} Whether any attribute changed
+   */
+  function morphAttributes(target, source) {
+    let modified = false;
+    for (const { name, value } of Array.from(source.attributes)) {
+      if (target.getAttribute(name) !== value) {
+        target.setAttribute(name, value);
+        modified = true;
+      }
+    }
+    for (const { name } of Array.from(target.attributes)) {
+      if (!source.hasAttribute(name)) {
+        target.removeAttribute(name);
+        modified = true;
+      }
+    }
+    return modified;
+  }
+
+  /**
+   * Morphs a node into the source node of the same name, in place.
+   *
+   * @param {Node} target
+   * @param {Node} source
+   * @param {Set<Node>} changed Collects the nodes that were modified or inserted
+   * @returns {void}
+   */
+  function morphNode(target, source, changed) {
+    // Unchanged subtrees (eg: most rows of a list) are not walked.
+    if (target.isEqualNode(source)) {
+      return;
+    }
+    if (target.nodeType !== 1) {
+      if (target.data !== source.data) {
+        target.data = source.data;
+        changed.add(target);
+      }
+      return;
+    }
+
+    if (morphAttributes(target, source)) {
+      changed.add(target);
+    }
+    morphChildren(target, source, changed);
+  }
+
+  /**
+   * Morphs the children of the target into the children of the source.
+   * Keyed children are matched by key wherever they are, the others by position and node name.
+   * Children that can not be matched are moved over from the source, unmatched old children are removed.
+   *
+   * @param {Node} target
+   * @param {Node} source
+   * @param {Set<Node>} changed
+   * @returns {void}
+   */
+  function morphChildren(target, source, changed) {
+    const keyed = new Map();
+    for (const child of target.childNodes) {
+      const key = morphKey(child);
+      if (key) {
+        keyed.set(key, child);
+      }
+    }
+
+    let cursor = target.firstChild;
+    for (const child of Array.from(source.childNodes)) {
+      const key = morphKey(child);
+      let match = null;
+      if (key) {
+        match = keyed.get(key) || null;
+        if (match && match.nodeName === child.nodeName) {
+          keyed.delete(key);
+        } else {
+          match = null;
+        }
+      } else {
+        // Keyed children are only matched by key, the cursor moves past them.
+        while (cursor && morphKey(cursor)) {
+          cursor = cursor.nextSibling;
+        }
+        if (
+          cursor &&
+          cursor.nodeType === child.nodeType &&
+          cursor.nodeName === child.nodeName
+        ) {
+          match = cursor;
+        }
+      }
+
+      if (match) {
+        if (match === cursor) {
+          cursor = cursor.nextSibling;
+        } else {
+          target.insertBefore(match, cursor);
+          changed.add(target);
+        }
+        morphNode(match, child, changed);
+      } else {
+        target.insertBefore(child, cursor);
+        changed.add(child);
+      }
+    }
+
+    while (cursor) {
+      const next = cursor.nextSibling;
+      cursor.remove();
+      changed.add(target);
+      cursor = next;
+    }
+    // Keyed children the cursor moved past without a match.
+    for (const child of keyed.values()) {
+      if (child.parentNode === target) {
+        child.remove();
+        changed.add(target);
+      }
+    }
+  }
+
+  /**
+   * Morphs an element into the given HTML, touching only the nodes that changed.
+   * Elements with a different name or key are replaced.
+   *
+   * @param {HTMLElement} target
+   * @param {String} html
+   * @returns {Set<Node>} The nodes that were modified or inserted
+   */
+  function morphElement(target, html) {
+    const content = htmlToNodes(html);
+    const source = content.firstChild;
+    const changed = new Set();
+
+    if (
+      content.childNodes.length === 1 &&
+      source.nodeName === target.nodeName &&
+      morphKey(source) === morphKey(target)
+    ) {
+      morphNode(target, source, changed);
+    } else {
+      content.childNodes.forEach((child) => changed.add(child));
+      target.replaceWith(content);
+    }
+    return changed;
+  }
+
+  /**
+   * Returns the ids of the fragments containing the changed nodes.
+   * Fragments nested in a changed fragment are considered changed as well.
+   *
+   * @param {Set<Node>} nodes
+   * @returns {Set<String>}
+   */
+  function changedFragments(nodes) {
+    const fragmentIds = new Set();
+    for (const node of nodes) {
+      const element = node.nodeType === 1 ? node : node.parentElement;
+      const fragment = element && element.closest("fragment");
+      if (!fragment || fragmentIds.has(fragment.id)) {
+        continue;
+      }
+      fragmentIds.add(fragment.id);
+      for (const nested of fragment.querySelectorAll("fragment")) {
+        fragmentIds.add(nested.id);
+      }
+    }
+    return fragmentIds;
+  }
+
+  function debounce(func, wait) {
+    let timeout;
+    return function (...args) {
+      clearTimeout(timeout);
+      timeout = setTimeout(() => func.apply(this, args), wait);
+    };
+  }
+
+  /**
+   * nik version of fetch that includes additional headers
+   *
+   * @param {String} url
+   * @param {Object} options
+   * @param {Object} options.type - The type of request (e.g., "link", "partial", "window")
+   * @param {String} options.previousPath - The previous path for the request
+   * @param {Object} fetchOptions.headers - Additional headers to include in the request
+   * @param {String} fetchOptions.method - The HTTP method to use (default: "get")
+   * @param {String} fetchOptions.body - The body of the request (eg: for POST requests)
+   * @param {AbortSignal} fetchOptions.signal - Aborts the request, and the work on the server
+   * @returns {Promise<Response>} The fetch response
+   */
+  function nikFetch(
+    url,
+    { type = "link", previousPath } = {},
+    { method = "get", body, headers = {}, signal } = {}
+  ) {
+    let contentType = "";
+    if (type === "link" || type === "partial" || type === "window") {
+      contentType = "application/json";
+    } else if (type === "form" && !headers["content-type"]) {
+      throw new Error("Content-Type must be set for form requests.");
+    }
+
+    return socketFetch(url, {
+      method,
+      headers: {
+        "x-nik-request": "1",
+        "x-nik-request-type": type,
+        "x-nik-actions-version": ACTIONS_VERSION,
+        ...(previousPath && { "x-nik-previous-path": previousPath }),
+        "content-type": contentType,
+        ...headers,
+      },
+      ...(body && { body }),
+      ...(signal && { signal }),
+    });
+  }
+
+  /**
+   * Rejects with the abort reason when the signal aborts.
+   *
+   * @param {AbortSignal|undefined} signal
+   * @param {Function} reject
+   * @param {Function} cleanup Called before rejecting, eg: to stop the request
+   * @returns {Boolean} Whether the signal is already aborted
+   */
+  function rejectOnAbort(signal, reject, cleanup = () => {}) {
+    if (!signal) {
+      return false;
+    }
+    if (signal.aborted) {
+      reject(signal.reason);
+      return true;
+    }
+    signal.addEventListener("abort", () => {
+      cleanup();
+      reject(signal.reason);
+    });
+    return false;
+  }
+
+  const BATCH_MAX_SIZE = 32;
+  const NULL_BODY_STATUSES = [101, 204, 205, 304];
+  let batchQueue = [];
+
+  /**
+   * Fetches a same origin url, the requests made in the same task are sent together in one batch request.
+   * A request aborted before the batch is sent is left out, otherwise only its caller stops waiting.
+   *
+   * @param {String} url
+   * @param {Object} options fetch options with string headers and body
+   * @returns {Promise<Response>}
+   */
+  function batchFetch(url, options) {
+    const target = new URL(url, window.location.origin);
+    if (target.origin !== window.location.origin) {
+      return fetch(url, options);
+    }
+
+    return new Promise((resolve, reject) => {
+      if (rejectOnAbort(options.signal, reject)) {
+        return;
+      }
+      if (batchQueue.length === 0) {
+        queueMicrotask(flushBatch);
+      }
+      const path = target.pathname + target.search;
+      batchQueue.push({ url, path, options, resolve, reject });
+    });
+  }
+
+  function flushBatch() {
+    const queue = batchQueue.filter(
+      ({ options }) => !(options.signal && options.signal.aborted)
+    );
+    batchQueue = [];
+
+    for (let i = 0; i < queue.length; i += BATCH_MAX_SIZE) {
+      const batch = queue.slice(i, i + BATCH_MAX_SIZE);
+      if (batch.length === 1) {
+        const [{ url, options, resolve, reject }] = batch;
+        fetch(url, options).then(resolve, reject);
+      } else {
+        sendBatch(batch);
+      }
+    }
+  }
+
+  /**
+   * Sends the requests in one batch request and resolves each of them with its own response.
+   *
+   * @param {Array<Object>} batch
+   * @returns {Promise<void>}
+   */
+  async function sendBatch(batch) {
+    try {
+      const response = await fetch(window.location.pathname, {
+        method: "post",
+        headers: {
+          "x-nik-request": "1",
+          "x-nik-request-type": "batch",
+          "content-type": "application/json",
+        },
+        body: JSON.stringify({
+          requests: batch.map(({ path, options }) => ({
+            path,
+            method: options.method,
+            headers: options.headers,
+            body: options.body || null,
+          })),
+        }),
+      });
+      if (!response.ok) {
+        throw new Error(`Batch request failed: ${response.status}`);
+      }
+
+      const { responses } = await response.json();
+      batch.forEach(({ resolve }, index) => {
+        const { status, headers, body } = responses[index];
+        const content = NULL_BODY_STATUSES.includes(status) ? null : body;
+        resolve(new Response(content, { status, headers }));
+      });
+    } catch (error) {
+      batch.forEach(({ reject }) => reject(error));
+    }
+  }
+
+  const SOCKET_MAX_RETRY_DELAY = 30000;
+  const socketTransport = {
+    path: null,
+    socket: null,
+    nextId: 0,
+    pending: new Map(),
+    retryDelay: 1000,
+  };
+
+  /**
+   * Opens the WebSocket transport, the nik requests are sent over it while it is open.
+   * The connection is reopened with a backoff when it closes.
+   *
+   * @param {String} path
+   */
+  function connectSocket(path) {
+    const transport = socketTransport;
+    if (transport.socket || typeof WebSocket === "undefined") {
+      return;
+    }
+    transport.path = path;
+
+    const url = new URL(path, window.location.href);
+    url.protocol = url.protocol === "https:" ? "wss:" : "ws:";
+    const socket = new WebSocket(url);
+    transport.socket = socket;
+
+    socket.onopen = () => {
+      transport.retryDelay = 1000;
+    };
+    socket.onmessage = (event) => {
+      const { id, fallback, status, headers, body } = JSON.parse(event.data);
+      const request = transport.pending.get(id);
+      if (!request) {
+        return;
+      }
+      transport.pending.delete(id);
+
+      if (fallback) {
+        // The request may set cookies, which the socket can not do.
+        // The next connection is opened with the new cookies.
+        batchFetch(request.url, request.options).then(
+          request.resolve,
+          request.reject
+        );
+        socket.close();
+        return;
+      }
+      const content = NULL_BODY_STATUSES.includes(status) ? null : body;
+      request.resolve(new Response(content, { status, headers }));
+    };
+    socket.onclose = () => {
+      transport.socket = null;
+      for (const request of transport.pending.values()) {
+        // Only the requests without side effects can safely be sent again.
+        if (request.options.method.toLowerCase() === "get") {
+          batchFetch(request.url, request.options).then(
+            request.resolve,
+            request.reject
+          );
+        } else {
+          request.reject(new Error("The connection was closed."));
+        }
+      }
+      transport.pending.clear();
+
+      const delay = transport.retryDelay;
+      transport.retryDelay = Math.min(delay * 2, SOCKET_MAX_RETRY_DELAY);
+      setTimeout(() => connectSocket(path), delay);
+    };
+  }
+
+  /**
+   * Sends a same origin request over the WebSocket transport when it is open, otherwise over HTTP.
+   *
+   * @param {String} url
+   * @param {Object} options fetch options with string headers and body
+   * @returns {Promise<Response>}
+   */
+  function socketFetch(url, options) {
+    const { socket, pending } = socketTransport;
+    const target = new URL(url, window.location.origin);
+    if (
+      !socket ||
+      socket.readyState !== WebSocket.OPEN ||
+      target.origin !== window.location.origin
+    ) {
+      return batchFetch(url, options);
+    }
+
+    const id = ++socketTransport.nextId;
+    return new Promise((resolve, reject) => {
+      const cancel = () => {
+        if (pending.delete(id) && socket.readyState === WebSocket.OPEN) {
+          socket.send(JSON.stringify({ id, cancel: true }));
+        }
+      };
+      if (rejectOnAbort(options.signal, reject, cancel)) {
+        return;
+      }
+      pending.set(id, { url, options, resolve, reject });
+      socket.send(
+        JSON.stringify({
+          id,
+          path: target.pathname + target.search,
+          method: options.method,
+          headers: options.headers,
+          body: options.body || null,
+        })
+      );
+    });
+  }
+
+  const NAVIGATION_CACHE_SIZE = 50;
+  // Lifetime of prefetched navigations the server did not give a max-age.
+  const PREFETCH_MAX_AGE = 10000;
+
+  /**
+   * Reads how long a response is fresh from its cache-control header.
+   *
+   * @param {Response} response
+   * @returns {Number} Milliseconds
+   */
+  function getMaxAge(response) {
+    const cacheControl = response.headers.get("cache-control") || "";
+    const match = /max-age=(\d+)/.exec(cacheControl);
+    return match ? Number(match[1]) * 1000 : 0;
+  }
+
+  /**
+   * Copies a navigation result of the cache, the registered observables
+   * keep references to its values and update them in place.
+   *
+   * @param {Object} result
+   * @returns {Object}
+   */
+  function copyNavigation(result) {
+    return { ...result, json: structuredClone(result.json) };
+  }
+
+  /**
+   * Path (with the query and the hash) of a same origin url.
+   *
+   * @param {String} urlOrPath
+   * @returns {String}
+   */
+  function toRequestPath(urlOrPath) {
+    if (!urlOrPath.startsWith("http")) {
+      return urlOrPath;
+    }
+    const url = new URL(urlOrPath);
+    return url.pathname + url.search + url.hash;
+  }
+
+  /**
+   * Whether clicking the anchor is handled as a nik navigation.
+   *
+   * @param {HTMLAnchorElement} anchor
+   * @returns {Boolean}
+   */
+  function isNavigationLink(anchor) {
+    return Boolean(
+      anchor.href &&
+        anchor.href.startsWith(window.location.origin) &&
+        !anchor.attributes.href.value.startsWith("#") &&
+        anchor.dataset.controlled !== "0"
+    );
+  }
+
+  const FRAMED_MEDIA_TYPE = "application/x-nik-framed";
+
+  /**
+   * Reads a navigation response. Framed responses have a JSON header on the first line,
+   * followed by the raw view HTML, which is returned as the "view" property.
+   * The header is parsed as soon as it arrives, the rest of the stream is only decoded as text.
+   *
+   * @param {Response} response
+   * @returns {Promise<Object>}
+   */
+  async function readNavigationResponse(response) {
+    const contentType = response.headers.get("content-type") || "";
+    if (!contentType.startsWith(FRAMED_MEDIA_TYPE)) {
+      return response.json();
+    }
+
+    if (!response.body) {
+      const text = await response.text();
+      const newline = text.indexOf("\n");
+      return {
+        ...JSON.parse(text.slice(0, newline)),
+        view: text.slice(newline + 1),
+      };
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let header = null;
+    let buffer = "";
+    const chunks = [];
+
+    while (true) {
+      const { done, value } = await reader.read();
+      const text = done
+        ? decoder.decode()
+        : decoder.decode(value, { stream: true });
+
+      if (header) {
+        chunks.push(text);
+      } else {
+        buffer += text;
+        const newline = buffer.indexOf("\n");
+        if (newline !== -1) {
+          header = JSON.parse(buffer.slice(0, newline));
+          chunks.push(buffer.slice(newline + 1));
+          buffer = "";
+        }
+      }
+
+      if (done) {
+        break;
+      }
+    }
+
+    if (!header) {
+      throw new Error("Framed response without a header.");
+    }
+    return { ...header, view: chunks.join("") };
+  }
+
+  /**
+   * @param {String} callbackName
+   * @returns {Function}
+   * @throws {Error} If the callback does not exist
+   * */
+  function getCallback(callbackName) {
+    const callback = callbacks[callbackName];
+    if (!callback) {
+      throw new Error(`Callback "${callbackName}" does not exist.`);
+    }
+    return (...args) => {
+      return callback(...args);
+    };
+  }
+
+  /**
+   * @param {String} id
+   * @returns {HTMLElement}
+   * @throws {Error} If the element with the given ID does not exist
+   */
+  function getElementById(id) {
+    const elm = document.getElementById(id);
+    if (!elm) {
+      throw new Error(`Element with ID "${id}" does not exist.`);
+    }
+    return elm;
+  }
+
+  const callbacks = {
+    consoleLog: (message) => {
+      console.log("ConsoleLog:", message);
+    },
+
+    toggleShow(elementId, { observable } = {}) {
+      const element = getElementById(elementId);
+      if (observable.bool()) {
+        element.style.display = "block";
+      } else {
+        element.style.display = "none";
+      }
+    },
+
+    /**
+     * Toggles a class on an element based on the value of an observable.
+     * The condition result should be true to add the class, false to remove it.
+     *
+     * @param {String} elementId ID of the element to toggle class on
+     * @param {equal_to|not_equal_to} op operation to perform
+     * @param {Any} op_value value to compare against
+     * @param {String} className class to toggle
+     * @returns {void}
+     */
+    toggleClass: (
+      elementId,
+      op,
+      op_value,
+      className,
+      { observable, observableProp } = {}
+    ) => {
+      const element = getElementById(elementId);
+
+      let result = observable[op](op_value, observableProp);
+      if (result) {
+        element.classList.add(className);
+      } else {
+        element.classList.remove(className);
+      }
+    },
+
+    reactiveAttribute: (elmId, attribute, condition, { observable } = {}) => {
+      const elm = getElementById(elmId);
+
+      if (BOOLEAN_ATTRIBUTES.includes(attribute)) {
+        const _value =
+          condition === "WhenNot" ? !observable.value : observable.value;
+        if (_value) {
+          elm.setAttribute(attribute, "");
+        } else {
+          elm.removeAttribute(attribute);
+        }
+      } else {
+        throw new Error("Not implemented for attribute: " + attribute);
+      }
+    },
+
+    updateFormStateClass: (formId, loadingClass, errorClass, { app } = {}) => {
+      const formState = app.getObservable(formId + "_form_state");
+      const form = getElementById(formId);
+
+      if (formState.value === "loading") {
+        form.classList.add(loadingClass);
+        form.classList.remove(errorClass);
+      } else if (formState.value === "error") {
+        form.classList.add(errorClass);
+        form.classList.remove(loadingClass);
+      } else if (formState.value === "ready") {
+        form.classList.remove(loadingClass);
+        form.classList.remove(errorClass);
+      }
+    },
+
+    /**
+     *
+     * @param {String} template Html template
+     * @param {String} parentId Element id of the parent container
+     * @param {Object} options
+     * @param {Observable} options.observable Observable that contains the data to render
+     * @param {String} options.observableProp Property of the observable to iterate over
+     * @param {String} options.operation Operation to perform (e.g., "append", "extend")
+     * @param {any} options.oldValue Old value of the observable
+     * @param {any} options.newValue New value of the observable
+     * @param {any} options.delta Payload of a delta operation (e.g., "remove")
+     * @param {NikApp} options.app Instance of the NikApp
+     * @returns {void}
+     */
+    insertElements: (
+      template,
+      parentId,
+      {
+        observable,
+        observableProp,
+        operation,
+        oldValue,
+        newValue,
+        delta,
+        app,
+      } = {}
+    ) => {
+      const parent = getElementById(parentId);
+
+      const isAppending = operation === "append" || operation === "extend";
+
+      let iterableValue = observable.value;
+      if (isAppending) {
+        iterableValue = newValue.slice(oldValue.length);
+      } else if (observableProp) {
+        iterableValue = observable.getPropValue(observableProp);
+      }
+
+      if (!iterableValue) {
+        parent.innerHTML = "";
+        return;
+      }
+
+      if (!Array.isArray(iterableValue)) {
+        console.warn("InsertElements callback requires an array observable.", {
+          observable,
+          observableProp,
+          iterableValue,
+        });
+        return;
+      }
+
+      if (DELTA_OPERATIONS.includes(operation)) {
+        return updateElements(
+          parent,
+          template,
+          iterableValue,
+          operation,
+          delta
+        );
+      }
+
+      const nodes = renderItems(template, iterableValue);
+
+      if (isAppending) {
+        parent.appendChild(nodes);
+      } else {
+        parent.replaceChildren(nodes);
+      }
+    },
+
+    /**
+     * Triggers a partial fetch source.
+     *
+     * @param {Object} data Query parameters to send with the request
+     * @param {String} path The base path for the fetch request
+     * @param {Object} options
+     * @param {NikApp} options.app Instance of the NikApp
+     * @returns {void}
+     */
+    partialFetch: (data, path, { app } = {}) => {
+      const basePath = path || "";
+
+      const params = new URLSearchParams();
+      for (const key in data) {
+        if (data.hasOwnProperty(key)) {
+          params.append(key, data[key]);
+        }
       }
       const queryString = params.toString();
 
@@ -444,6 +1582,52 @@
     },
   };
 
+  const FORM_VALUE_PATTERN = /^{{\s*form\.([^}]+?)\s*}}$/;
+
+  /**
+   * Replaces the `{{form.<field>}}` strings of an optimistic value by the submitted values.
+   *
+   * @param {any} value
+   * @param {FormData} formData
+   * @returns {any}
+   */
+  function fillFormValues(value, formData) {
+    if (typeof value === "string") {
+      const match = value.match(FORM_VALUE_PATTERN);
+      return match ? formData.get(match[1]) : value;
+    }
+    if (Array.isArray(value)) {
+      return value.map((item) => fillFormValues(item, formData));
+    }
+    if (isDict(value)) {
+      return Object.fromEntries(
+        Object.entries(value).map(([key, item]) => [
+          key,
+          fillFormValues(item, formData),
+        ])
+      );
+    }
+    return value;
+  }
+
+  /**
+   * Keys of the observables updated by `updateState` actions.
+   *
+   * @param {Object} actions Decoded actions by view id
+   * @returns {Set<String>}
+   */
+  function getUpdatedStateKeys(actions) {
+    const keys = new Set();
+    for (const viewActions of Object.values(actions)) {
+      for (const [actionName, ...actionGroups] of viewActions || []) {
+        if (actionName === "updateState") {
+          actionGroups.forEach(([key]) => keys.add(key));
+        }
+      }
+    }
+    return keys;
+  }
+
   const BOOLEAN_ATTRIBUTES = [
     "disabled",
     "hidden",
@@ -458,16 +1642,31 @@
       error: new Observable(false),
       observables: {},
       onClickSubscriptions: {},
+      windowObservers: {},
+      islands: {},
       onChangeSubscriptions: {},
       onSubmitSubscriptions: {},
+      optimisticUpdates: {},
     };
 
     previousPath = null;
     currentPath = window.location.pathname;
 
+    /**
+     * Versions of the server rendered fragments, by fragment id.
+     * A fragment is removed as soon as its DOM is modified, so the server only patches unmodified fragments.
+     */
+    fragmentVersions = {};
+    fragmentObserver = null;
+
     actions = {
       registerObservable: (name, initialValue) => {
+        const previous = this.page.observables[name];
+        if (previous) {
+          previous.dispose();
+        }
         this.page.observables[name] = new Observable(initialValue);
+        this.track("observables", name);
       },
 
       subscribeObservable: (
@@ -479,16 +1678,21 @@
         let observable = this.getObservable(observableKey);
         const callback = getCallback(callbackName);
 
-        observable.subscribe((oldValue, newValue, prop, operation) => {
+        const listener = (oldValue, newValue, prop, operation, delta) => {
           return callback(...callbackArgs, {
             observable,
             observableProp,
             operation,
             oldValue,
             newValue,
+            delta,
             app: this,
           });
-        }, observableProp);
+        };
+        observable.subscribe(listener, observableProp);
+        this.track("listeners", () =>
+          observable.unsubscribe(listener, observableProp)
+        );
       },
 
       onClick: (elmId, callbackName, ...callbackArgs) => {
@@ -500,9 +1704,11 @@
           const callback = getCallback(callbackName);
           callback(...callbackArgs, { app: this });
         });
+        this.track("elements", elmId);
       },
 
-      listenSubmit: (formId, resetAfterSuccess) => {
+      listenSubmit: (formId, resetAfterSuccess, optimistic = []) => {
+        this.track("elements", formId);
         this.page.onSubmitSubscriptions[formId] = async (event) => {
           event.preventDefault();
 
@@ -593,7 +1799,18 @@
           this.page.loading.update(true);
           this.page.error.update(false);
 
+          const submitter = event.submitter && event.submitter.id;
+          const snapshots = this.applyOptimistic(
+            [...optimistic, ...(this.page.optimisticUpdates[submitter] || [])],
+            formData
+          );
+
           try {
+            // The server renders the refreshed view in the same response.
+            fetchOptions.headers = {
+              ...fetchOptions.headers,
+              "x-nik-refresh-path": this.currentPath,
+            };
             const resp = await nikFetch(
               fetchUrl,
               { type: "form" },
@@ -601,7 +1818,11 @@
             );
             const json = await resp.json();
 
+            // The action may have changed what the cached navigations show.
+            this.navigationCache.clear();
+
             if (resp.status >= 300) {
+              this.rollbackOptimistic(snapshots);
               updateFormState("error");
               this.page.error.update(true);
             } else {
@@ -612,12 +1833,23 @@
               }
             }
 
+            let changedFragmentIds = null;
+            if (json && json.replaces) {
+              changedFragmentIds = this.applyView(json);
+            }
             if (json && json.actions) {
-              this.run(json.actions);
+              const actions =
+                json.actions.v === 2
+                  ? decodeActions(json.actions)
+                  : json.actions;
+              // The server updates are relative to its state, not the optimistic one.
+              this.rollbackOptimistic(snapshots, getUpdatedStateKeys(actions));
+              this.run(actions, changedFragmentIds);
             }
             this.page.loading.update(false);
           } catch (error) {
             console.error("Fetch error:", error);
+            this.rollbackOptimistic(snapshots);
             updateFormState("error");
             this.page.loading.update(false);
             this.page.error.update(true);
@@ -630,77 +1862,483 @@
         observable.update(value, observableProp, operation);
       },
 
-      // TODO: support observableProp
-      bindValue: (elmId, observableKey) => {
-        const observable = this.getObservable(observableKey);
-        const elm = getElementById(elmId);
-        let isUpdating = false;
+      /**
+       * Registers the optimistic updates applied when the button submits its form.
+       *
+       * @param {String} elmId Id of the button
+       * @param {Array} updates Arguments of `updateState` actions
+       */
+      optimistic: (elmId, updates) => {
+        this.page.optimisticUpdates[elmId] = updates;
+        this.track("elements", elmId);
+      },
+
+      // TODO: support observableProp
+      bindValue: (elmId, observableKey) => {
+        const observable = this.getObservable(observableKey);
+        const elm = getElementById(elmId);
+        const isCheckable = elm.type === "checkbox" || elm.type === "radio";
+
+        const listener = (oldValue, value) => {
+          // Skip the values coming from the element itself
+          if (isCheckable && elm.checked !== value) {
+            elm.checked = value;
+          } else if (!isCheckable && elm.value !== value) {
+            elm.value = value;
+          }
+        };
+        observable.subscribe(listener);
+        this.track("listeners", () => observable.unsubscribe(listener));
+        this.track("elements", elmId);
+
+        if (!this.page.onChangeSubscriptions[elmId]) {
+          this.page.onChangeSubscriptions[elmId] = [];
+        }
+        this.page.onChangeSubscriptions[elmId].push((value) => {
+          if (observable.value !== value) {
+            observable.update(value);
+          }
+        });
+      },
+
+      redirect: (url, full = true) => {
+        debounce(() => {
+          if (full) {
+            window.location.href = url;
+          } else {
+            this.loadAndReplace(url, true, false);
+          }
+        }, 100)();
+      },
+
+      /**
+       * Fetches the next window of a VirtualList when its last item scrolls into view.
+       *
+       * @param {String} parentId Element id of the list container
+       * @param {String} observableKey Key of the observable holding the list items
+       * @param {any} cursor Cursor of the next window, null if there are no more items
+       * @param {String|null} url Url to fetch the window from, defaults to the current url
+       * @param {String} cursorParam Query parameter the cursor is sent with
+       */
+      observeWindow: (parentId, observableKey, cursor, url, cursorParam) => {
+        const previous = this.page.windowObservers[parentId];
+        if (previous) {
+          previous.disconnect();
+          delete this.page.windowObservers[parentId];
+        }
+
+        this.track("elements", parentId);
+        // The items of the window are inserted by the queued state listeners.
+        notifications.flush();
+        const last = getElementById(parentId).lastElementChild;
+        if (cursor === null || cursor === undefined || !last) {
+          return;
+        }
+
+        const observer = new IntersectionObserver(
+          (entries) => {
+            if (!entries.some((entry) => entry.isIntersecting)) {
+              return;
+            }
+            observer.disconnect();
+
+            const fetchUrl = new URL(
+              url || window.location.href,
+              window.location.origin
+            );
+            fetchUrl.searchParams.set(cursorParam, cursor);
+            nikFetch(
+              fetchUrl.pathname + fetchUrl.search,
+              { type: "window" },
+              { headers: { "x-nik-window": observableKey } }
+            )
+              .then((response) => response.json())
+              .then((json) => {
+                if (json && json.actions) {
+                  this.run(json.actions);
+                }
+              })
+              .catch((error) => {
+                console.error("Fetch error:", error);
+              });
+          },
+          { rootMargin: "200px" }
+        );
+
+        observer.observe(last);
+        this.page.windowObservers[parentId] = observer;
+      },
+
+      refreshView: (partial) => {
+        this.loadAndReplace(this.currentPath, false, partial);
+      },
+
+      subscribeStream: (viewId, url) => {
+        const current = this.streams[viewId];
+        if (current && current.url === url) {
+          return;
+        }
+        this.closeStream(viewId);
+
+        const source = new EventSource(url);
+        source.onmessage = (event) => {
+          this.run({ [viewId]: JSON.parse(event.data) });
+        };
+        this.streams[viewId] = { url, source };
+      },
+
+      /**
+       * Loads the partial of the route into the placeholder of an `Island`.
+       *
+       * @param {String} fragmentId Id of the partial fragment showing the placeholder
+       * @param {"visible"|"idle"} trigger Load once the placeholder scrolls into view
+       *  or once the browser is idle
+       */
+      loadIsland: (fragmentId, trigger) => {
+        this.cancelIsland(fragmentId);
+        this.track("elements", fragmentId);
+
+        const fragment = getElementById(fragmentId);
+        const path = this.currentPath;
+        const load = () => this.fetchIsland(fragmentId, path);
+
+        if (trigger === "idle") {
+          if (typeof requestIdleCallback === "undefined") {
+            const timeout = setTimeout(load, ISLAND_IDLE_TIMEOUT);
+            this.page.islands[fragmentId] = () => clearTimeout(timeout);
+          } else {
+            const handle = requestIdleCallback(load, {
+              timeout: ISLAND_IDLE_TIMEOUT,
+            });
+            this.page.islands[fragmentId] = () => cancelIdleCallback(handle);
+          }
+          return;
+        }
+
+        if (typeof IntersectionObserver === "undefined") {
+          load();
+          return;
+        }
+        const observer = new IntersectionObserver(
+          (entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) {
+              observer.disconnect();
+              load();
+            }
+          },
+          { rootMargin: "200px" }
+        );
+        // The fragment is an inline element, its placeholder has the box.
+        observer.observe(fragment.firstElementChild || fragment);
+        this.page.islands[fragmentId] = () => observer.disconnect();
+      },
+    };
+
+    /**
+     * Server-sent event streams of the views, by view id.
+     * A stream is closed once its view fragment is no longer in the page.
+     */
+    streams = {};
+
+    /**
+     * Subscriptions registered by the actions of each view, by view id:
+     * the observables it registered, the ids of the elements it bound
+     * and the functions removing its observable listeners.
+     * They are released when the view fragment is replaced or removed.
+     */
+    scopes = {};
+    currentScope = null;
+
+    closeStream = (viewId) => {
+      const stream = this.streams[viewId];
+      if (stream) {
+        stream.source.close();
+        delete this.streams[viewId];
+      }
+    };
 
-        observable.subscribe((value) => {
-          if (isUpdating) {
+    /**
+     * Fetches the partial of an island and replaces its placeholder.
+     * The request is aborted if the island leaves the page.
+     *
+     * @param {String} fragmentId
+     * @param {String} path Path of the page the island was rendered in
+     * @returns {Promise<void>}
+     */
+    fetchIsland = (fragmentId, path) => {
+      const controller = new AbortController();
+      const cancel = () => controller.abort();
+      this.page.islands[fragmentId] = cancel;
+
+      return this.fetchNavigation(path, true, false, controller.signal)
+        .then(({ ok, status, statusText, json }) => {
+          if (this.page.islands[fragmentId] === cancel) {
+            delete this.page.islands[fragmentId];
+          }
+          if (controller.signal.aborted || path !== this.currentPath) {
             return;
           }
-          if (elm.type === "checkbox" || elm.type === "radio") {
-            elm.checked = value;
-          } else {
-            elm.value = value;
+          if (!ok) {
+            console.error("Error loading island:", {
+              url: path,
+              status,
+              statusText,
+              body: json,
+            });
+            return;
           }
-        });
 
-        if (!this.page.onChangeSubscriptions[elmId]) {
-          this.page.onChangeSubscriptions[elmId] = [];
-        }
-        this.page.onChangeSubscriptions[elmId].push((value) => {
-          if (observable.value !== value) {
-            isUpdating = true;
-            observable.update(value);
-            isUpdating = false;
+          let changedFragmentIds;
+          try {
+            changedFragmentIds = this.applyView(json);
+          } catch (error) {
+            if (!json.patches) {
+              throw error;
+            }
+            console.warn("Patch error:", error);
+            delete this.fragmentVersions[json.replaces];
+            return this.fetchIsland(fragmentId, path);
+          }
+          if (json.actions) {
+            this.run(json.actions, changedFragmentIds);
+          }
+        })
+        .catch((error) => {
+          if (!controller.signal.aborted) {
+            console.error("Fetch error:", error);
           }
         });
-      },
+    };
 
-      redirect: (url, full = true) => {
-        debounce(() => {
-          if (full) {
-            window.location.href = url;
-          } else {
-            this.loadAndReplace(url, true, false);
-          }
-        }, 100)();
-      },
+    /**
+     * Stops the pending load of an island, see `loadIsland`.
+     *
+     * @param {String} fragmentId
+     * @returns {void}
+     */
+    cancelIsland = (fragmentId) => {
+      const cancel = this.page.islands[fragmentId];
+      if (cancel) {
+        delete this.page.islands[fragmentId];
+        cancel();
+      }
+    };
 
-      refreshView: (partial) => {
-        this.loadAndReplace(this.currentPath, false, partial);
-      },
+    /**
+     * Records a subscription of the view whose actions are running.
+     *
+     * @param {"observables"|"elements"|"listeners"} kind
+     * @param {String|Function} value Observable name, element id or function removing a listener
+     * @returns {void}
+     */
+    track = (kind, value) => {
+      const viewId = this.currentScope;
+      if (viewId === null) {
+        return;
+      }
+      if (!this.scopes[viewId]) {
+        this.scopes[viewId] = {
+          observables: new Set(),
+          elements: new Set(),
+          listeners: [],
+        };
+      }
+      const scope = this.scopes[viewId];
+      if (kind === "listeners") {
+        scope.listeners.push(value);
+      } else {
+        scope[kind].add(value);
+      }
     };
 
-    run(actions) {
-      for (const viewActions of Object.values(actions)) {
-        if (Array.isArray(viewActions)) {
-          for (const [actionName, ...actionGroups] of viewActions) {
-            const method = this.actions[actionName];
-            if (method) {
-              actionGroups.forEach((params) => {
-                try {
-                  method.apply(this, params);
-                } catch (error) {
-                  console.error(
-                    `Error executing action "${actionName}" with params:`,
-                    params,
-                    error
-                  );
-                }
-              });
-            } else {
-              console.warn(
-                `Method "${actionName}" not found in NikApp actions.`
-              );
-            }
-          }
+    /**
+     * Releases the subscriptions registered by a view,
+     * before its binding actions are run again or once it left the page.
+     *
+     * @param {String} viewId
+     * @returns {void}
+     */
+    releaseFragment = (viewId) => {
+      const scope = this.scopes[viewId];
+      if (!scope) {
+        return;
+      }
+      delete this.scopes[viewId];
+
+      scope.listeners.forEach((unsubscribe) => unsubscribe());
+      for (const id of scope.elements) {
+        delete this.page.onClickSubscriptions[id];
+        delete this.page.onChangeSubscriptions[id];
+        delete this.page.onSubmitSubscriptions[id];
+        delete this.page.optimisticUpdates[id];
+
+        const observer = this.page.windowObservers[id];
+        if (observer) {
+          observer.disconnect();
+          delete this.page.windowObservers[id];
+        }
+        this.cancelIsland(id);
+      }
+      for (const name of scope.observables) {
+        const observable = this.page.observables[name];
+        // Skip the observables registered again by another view.
+        const owned = !Object.values(this.scopes).some((other) =>
+          other.observables.has(name)
+        );
+        if (observable && owned) {
+          observable.dispose();
+          delete this.page.observables[name];
+        }
+      }
+    };
+
+    releaseDetachedFragments = () => {
+      const viewIds = new Set([
+        ...Object.keys(this.scopes),
+        ...Object.keys(this.streams),
+      ]);
+      for (const viewId of viewIds) {
+        if (!document.getElementById(viewId)) {
+          this.closeStream(viewId);
+          this.releaseFragment(viewId);
+        }
+      }
+    };
+
+    /**
+     * Applies optimistic state updates before the server responds.
+     *
+     * @param {Array} updates Arguments of `updateState` actions
+     * @param {FormData} formData Values of the `{{form.<field>}}` strings
+     * @returns {Map<String, any>} Copies of the previous values, by observable key
+     */
+    applyOptimistic = (updates, formData) => {
+      const snapshots = new Map();
+      for (const [key, prop, value, operation] of updates) {
+        const observable = this.getObservable(key, null);
+        if (!observable) {
+          console.warn(`Optimistic update of unknown observable "${key}".`);
+          continue;
+        }
+        if (!snapshots.has(key)) {
+          // Delta operations modify the value in place.
+          snapshots.set(key, structuredClone(observable.value));
+        }
+        observable.update(fillFormValues(value, formData), prop, operation);
+      }
+      return snapshots;
+    };
+
+    /**
+     * Restores the values saved by `applyOptimistic`.
+     *
+     * @param {Map<String, any>} snapshots
+     * @param {Set<String>|null} keys Keys of the observables to restore, all if not given
+     * @returns {void}
+     */
+    rollbackOptimistic = (snapshots, keys = null) => {
+      for (const [key, value] of snapshots) {
+        const observable = this.getObservable(key, null);
+        if (observable && (!keys || keys.has(key))) {
+          observable.update(value);
+        }
+      }
+    };
+
+    /**
+     * Live subscription counts, to debug subscriptions leaking in long sessions:
+     * `window.__nik__.subscriptionCounts()`.
+     *
+     * @returns {Object}
+     */
+    subscriptionCounts = () => {
+      const observables = Object.values(this.page.observables);
+      return {
+        fragments: Object.keys(this.scopes).length,
+        observables: observables.length,
+        listeners: observables.reduce(
+          (count, observable) => count + observable.listenerCount,
+          0
+        ),
+        clicks: Object.keys(this.page.onClickSubscriptions).length,
+        changes: Object.keys(this.page.onChangeSubscriptions).length,
+        submits: Object.keys(this.page.onSubmitSubscriptions).length,
+        windowObservers: Object.keys(this.page.windowObservers).length,
+        islands: Object.keys(this.page.islands).length,
+        streams: Object.keys(this.streams).length,
+      };
+    };
+
+    /**
+     * Runs the actions of the rendered views.
+     *
+     * @param {Object} actions Actions by view id
+     * @param {Set<String>|null} changedFragmentIds When given, the binding actions of the views
+     *  whose fragment did not change are skipped, their elements are still bound.
+     * @returns {void}
+     */
+    run(actions, changedFragmentIds = null) {
+      if (actions.v === 2) {
+        actions = decodeActions(actions);
+      }
+
+      for (const [viewId, viewActions] of Object.entries(actions)) {
+        const unchanged =
+          changedFragmentIds &&
+          !changedFragmentIds.has(viewId) &&
+          document.getElementById(viewId);
+        if (changedFragmentIds && !unchanged) {
+          this.releaseFragment(viewId);
+        }
+
+        if (!Array.isArray(viewActions)) {
+          continue;
+        }
+        const previousScope = this.currentScope;
+        this.currentScope = viewId;
+        try {
+          this.runViewActions(viewActions, unchanged);
+        } finally {
+          this.currentScope = previousScope;
+        }
+      }
+    }
+
+    runViewActions(viewActions, unchanged) {
+      for (const [actionName, ...actionGroups] of viewActions) {
+        if (unchanged && BINDING_ACTIONS.includes(actionName)) {
+          continue;
+        }
+        const method = this.actions[actionName];
+        if (!method) {
+          console.warn(`Method "${actionName}" not found in NikApp actions.`);
+          continue;
         }
+        actionGroups.forEach((params) => {
+          try {
+            method.apply(this, params);
+          } catch (error) {
+            console.error(
+              `Error executing action "${actionName}" with params:`,
+              params,
+              error
+            );
+          }
+        });
       }
     }
 
+    /**
+     * Morphs an element into the given HTML.
+     *
+     * @param {HTMLElement} element
+     * @param {String} html
+     * @returns {Set<String>} The ids of the fragments that changed
+     */
+    morph = (element, html) => {
+      return changedFragments(morphElement(element, html));
+    };
+
     /**
      * @param {String} observableKey
      * @param {any} defaultVal Value to return if the observable does not exist. If not given an error will be thrown.
@@ -738,36 +2376,289 @@
       Promise.all(subscriptions.map((callback) => callback(id)));
     };
 
-    loadAndReplace = (urlOrPath, pushState, isPartial) => {
-      let requestedPath = urlOrPath;
-      if (urlOrPath.startsWith("http")) {
-        const urlObj = new URL(urlOrPath);
-        requestedPath = urlObj.pathname + urlObj.search + urlObj.hash;
+    /**
+     * Sends the nik requests over a WebSocket on the given path, see `connectSocket`.
+     *
+     * @param {String} path
+     * @returns {void}
+     */
+    connect = (path) => {
+      connectSocket(path);
+    };
+
+    /**
+     * Registers the service worker generated by the server for the whole site.
+     *
+     * @param {String} path
+     * @returns {void}
+     */
+    registerServiceWorker = (path) => {
+      if (!("serviceWorker" in navigator)) {
+        return;
+      }
+      navigator.serviceWorker.register(path, { scope: "/" }).catch((error) => {
+        console.warn("Service worker registration failed:", error);
+      });
+    };
+
+    /**
+     * Stores the versions of the fragments rendered by the server.
+     * Mutations made until now (eg: the fragments being replaced) are not tracked.
+     *
+     * @param {Object} versions Versions by fragment id
+     * @returns {void}
+     */
+    setFragmentVersions = (versions) => {
+      if (typeof MutationObserver === "undefined") {
+        return;
       }
 
-      return nikFetch(
-        requestedPath,
-        {
-          type: isPartial ? "partial" : "link",
-          previousPath: this.currentPath,
-        },
-        {}
-      )
-        .then(async (response) => {
-          const json = await response.json();
+      if (!this.fragmentObserver) {
+        this.fragmentObserver = new MutationObserver((records) => {
+          for (const record of records) {
+            this.markFragmentsModified(record.target);
+          }
+        });
+        this.fragmentObserver.observe(document.body, {
+          subtree: true,
+          childList: true,
+          attributes: true,
+          characterData: true,
+        });
+      }
+      this.fragmentObserver.takeRecords();
+
+      for (const fragmentId of Object.keys(this.fragmentVersions)) {
+        if (!document.getElementById(fragmentId)) {
+          delete this.fragmentVersions[fragmentId];
+        }
+      }
+      Object.assign(this.fragmentVersions, versions);
+    };
+
+    /**
+     * Forgets the versions of the fragments containing the node.
+     *
+     * @param {Node} node
+     * @returns {void}
+     */
+    markFragmentsModified = (node) => {
+      let element = node.nodeType === 1 ? node : node.parentElement;
+      while (element && (element = element.closest("fragment"))) {
+        delete this.fragmentVersions[element.id];
+        element = element.parentElement;
+      }
+    };
+
+    getFragmentVersionsHeaders = () => {
+      if (!this.fragmentObserver) {
+        return {};
+      }
+      for (const record of this.fragmentObserver.takeRecords()) {
+        this.markFragmentsModified(record.target);
+      }
+
+      const versions = Object.entries(this.fragmentVersions)
+        .map(([fragmentId, version]) => `${fragmentId}=${version}`)
+        .join(",");
+      return { "x-nik-fragment-versions": versions };
+    };
+
+    /**
+     * Replaces an element with the view of a response, by patching or morphing it.
+     *
+     * @param {Object} json Response with the `replaces` element id and the `view` or its `patches`
+     * @returns {Set<String>} The ids of the fragments that changed
+     * @throws {Error} If the patches do not match the DOM
+     */
+    applyView = (json) => {
+      const replaces = getElementById(json.replaces);
+      const changedFragmentIds = json.patches
+        ? changedFragments(applyPatches(replaces, json.patches))
+        : this.morph(replaces, json.view);
+
+      if (json.versions) {
+        this.setFragmentVersions(json.versions);
+      }
+      this.releaseDetachedFragments();
+      this.observePrefetchLinks(replaces);
+      return changedFragmentIds;
+    };
+
+    /**
+     * Navigation responses by previous path and path, as the rendered views depend on both.
+     * Fresh entries are applied without a request, stale ones are revalidated with their ETag.
+     * In flight entries are shared, so a click on a link being prefetched waits for it.
+     */
+    navigationCache = new Map();
+    prefetchObserver = null;
+
+    /**
+     * Fetches the navigation response of a path, from the navigation cache when possible.
+     * The view of the current path (eg: refreshView) and partials are always fetched.
+     *
+     * @param {String} path
+     * @param {Boolean} isPartial
+     * @param {Boolean} prefetch
+     * @param {AbortSignal} signal
+     * @returns {Promise<Object>} The response status and its json
+     */
+    fetchNavigation = (path, isPartial = false, prefetch = false, signal) => {
+      const previousPath = this.currentPath;
+      const cacheable = !isPartial && path !== previousPath;
+      const key = `${previousPath} ${path}`;
+      const cached = cacheable ? this.navigationCache.get(key) : null;
+      if (cached && cached.expires > Date.now()) {
+        return cached.result.then(copyNavigation);
+      }
+
+      const headers = { "x-nik-response-format": "framed" };
+      if (cached && cached.etag) {
+        headers["if-none-match"] = cached.etag;
+      } else if (!prefetch) {
+        // A patched view can not be cached, prefetched views are rendered whole.
+        Object.assign(headers, this.getFragmentVersionsHeaders());
+      }
+
+      const entry = { result: null, etag: null, expires: Infinity };
+      const forget = () => {
+        if (this.navigationCache.get(key) === entry) {
+          this.navigationCache.delete(key);
+        }
+      };
+
+      entry.result = nikFetch(
+        path,
+        { type: isPartial ? "partial" : "link", previousPath },
+        { headers, signal }
+      ).then(async (response) => {
+        const maxAge = Math.max(
+          getMaxAge(response),
+          prefetch ? PREFETCH_MAX_AGE : 0
+        );
+        if (response.status === 304 && cached) {
+          entry.etag = cached.etag;
+          entry.expires = Date.now() + maxAge;
+          return cached.result;
+        }
+
+        const json = await readNavigationResponse(response);
+        entry.etag = response.headers.get("etag");
+        entry.expires = Date.now() + maxAge;
+        if (!response.ok || json.patches || (!entry.etag && !maxAge)) {
+          forget();
+        }
+        const { ok, status, statusText } = response;
+        return { ok, status, statusText, json };
+      });
+      entry.result.catch(forget);
+
+      if (cacheable) {
+        this.navigationCache.delete(key);
+        this.navigationCache.set(key, entry);
+        if (this.navigationCache.size > NAVIGATION_CACHE_SIZE) {
+          this.navigationCache.delete(this.navigationCache.keys().next().value);
+        }
+      }
+      return entry.result.then(copyNavigation);
+    };
+
+    /**
+     * Fetches the navigation to a link ahead of the click, see `A(prefetch=...)`.
+     *
+     * @param {String} url
+     * @returns {void}
+     */
+    prefetch = (url) => {
+      if (!url.startsWith(window.location.origin)) {
+        return;
+      }
+      this.fetchNavigation(toRequestPath(url), false, true).catch((error) => {
+        console.warn("Prefetch error:", error);
+      });
+    };
+
+    handlePrefetch = (event) => {
+      const anchor =
+        event.target.closest && event.target.closest("a[data-prefetch]");
+      if (
+        anchor &&
+        anchor.dataset.prefetch !== "viewport" &&
+        isNavigationLink(anchor)
+      ) {
+        this.prefetch(anchor.href);
+      }
+    };
+
+    /**
+     * Prefetches the links with `data-prefetch="viewport"` once they are visible.
+     *
+     * @param {Element} root
+     * @returns {void}
+     */
+    observePrefetchLinks = (root) => {
+      if (typeof IntersectionObserver === "undefined" || !root) {
+        return;
+      }
+      if (!this.prefetchObserver) {
+        this.prefetchObserver = new IntersectionObserver((entries) => {
+          for (const { isIntersecting, target } of entries) {
+            if (isIntersecting) {
+              this.prefetchObserver.unobserve(target);
+              if (isNavigationLink(target)) {
+                this.prefetch(target.href);
+              }
+            }
+          }
+        });
+      }
+      const links = root.querySelectorAll('a[data-prefetch="viewport"]');
+      links.forEach((link) => this.prefetchObserver.observe(link));
+    };
+
+    /**
+     * Controller of the navigation in progress, a new navigation (or partial) supersedes it.
+     */
+    navigationController = null;
+
+    loadAndReplace = (urlOrPath, pushState, isPartial) => {
+      const requestedPath = toRequestPath(urlOrPath);
 
-          if (!response.ok) {
+      if (this.navigationController) {
+        this.navigationController.abort();
+      }
+      const controller = new AbortController();
+      this.navigationController = controller;
+      const { signal } = controller;
+
+      return this.fetchNavigation(requestedPath, isPartial, false, signal)
+        .then(({ ok, status, statusText, json }) => {
+          // Superseded while waiting for a shared (eg: prefetched) response.
+          if (signal.aborted) {
+            return;
+          }
+          if (!ok) {
             console.error("Error fetching url:", {
               url: requestedPath,
-              status: response.status,
-              statusText: response.statusText,
+              status,
+              statusText,
               body: json,
             });
             return;
           }
 
-          const replaces = getElementById(json.replaces);
-          replaces.outerHTML = json.view;
+          let changedFragmentIds;
+          try {
+            changedFragmentIds = this.applyView(json);
+          } catch (error) {
+            if (!json.patches) {
+              throw error;
+            }
+            // The DOM does not match the server's version, fetch the whole view.
+            console.warn("Patch error:", error);
+            delete this.fragmentVersions[json.replaces];
+            return this.loadAndReplace(urlOrPath, pushState, isPartial);
+          }
 
           this.previousPath = this.currentPath;
           if (!isPartial) {
@@ -784,7 +2675,7 @@
           }
 
           if (json.actions) {
-            this.run(json.actions);
+            this.run(json.actions, changedFragmentIds);
           }
 
           if (pushState) {
@@ -792,19 +2683,15 @@
           }
         })
         .catch((error) => {
-          console.error("Fetch error:", error);
+          if (!signal.aborted) {
+            console.error("Fetch error:", error);
+          }
         });
     };
 
     handleClick = (e) => {
       const anchor = e.target.closest("a");
-      if (
-        anchor &&
-        anchor.href &&
-        anchor.href.startsWith(window.location.origin) &&
-        !anchor.attributes.href.value.startsWith("#") &&
-        anchor.dataset.controlled !== "0"
-      ) {
+      if (anchor && isNavigationLink(anchor)) {
         e.preventDefault();
         this.loadAndReplace(anchor.href, true, false);
       } else {
@@ -865,6 +2752,11 @@
     window.addEventListener("popstate", app.handlePopState);
     document.addEventListener("input", debounce(app.handleOnChange, 0));
     document.addEventListener("submit", app.handleOnSubmit);
+    document.addEventListener("mouseover", app.handlePrefetch);
+    document.addEventListener("touchstart", app.handlePrefetch, {
+      passive: true,
+    });
+    app.observePrefetchLinks(document.body);
   });
   window.__nik__ = app;
 })();
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import re
+from collections.abc import Callable
+from typing import Any, Literal
+
+from .context import USER_BOUND_PARAMS, ViewContext
+from .elements import HtmlElement
+from .templates import DataDependentError, NonEmptySymbol, Symbol
+
+"""
+Compiles view functions into string templates.
+
+A compiled view is traced once with symbolic arguments. The rendered HTML is split into static segments
+and holes, so later calls only evaluate the holes and join the strings instead of building the element tree.
+
+Views whose structure depends on the values of their arguments can not be represented as a template.
+These are detected while tracing and they silently fall back to the regular rendering.
+"""
+
+logger = logging.getLogger(__name__)
+
+"""Parameters that are injected per request and can not be traced."""
+UNTRACEABLE_PARAMS = USER_BOUND_PARAMS | {"body", "query"}
+
+HoleKind = Literal["arg", "page", "children"]
+Hole = tuple[HoleKind, str]
+
+
+class _SymbolicPage:
+    _tracer: _Tracer
+
+    def __init__(self, tracer: _Tracer):
+        object.__setattr__(self, "_tracer", tracer)
+
+    def __getattr__(self, name: str) -> Symbol:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._tracer.symbol(("page", name))
+
+    def __setattr__(self, name: str, value: Any):
+        raise DataDependentError("Views that modify the page can not be compiled")
+
+
+class _ChildrenHole(HtmlElement):
+    def __init__(self, sentinel: str):
+        self.sentinel = sentinel
+        super().__init__(tag="children-hole")
+
+    def render(self):
+        return self.sentinel
+
+
+class _Tracer:
+    def __init__(self, marker: str):
+        self.marker = marker
+        self.holes: list[Hole] = []
+        self.arguments: list[Hole] = []
+        self.page = _SymbolicPage(self)
+        self.result: Any = None
+        self.context: ViewContext | None = None
+
+    def sentinel(self, hole: Hole) -> str:
+        self.holes.append(hole)
+        return f"\x00{self.marker}{len(self.holes) - 1}\x00"
+
+    def symbol(self, hole: Hole, cls: type[Symbol] = Symbol) -> Symbol:
+        return cls(self.sentinel(hole))
+
+    def symbolic_kwargs(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        symbolic: dict[str, Any] = {}
+        for name, value in kwargs.items():
+            if name == "children":
+                symbolic[name] = None if value is None else _ChildrenHole(self.sentinel(("children", name)))
+            elif name == "page":
+                symbolic[name] = self.page
+            else:
+                symbolic[name] = self.symbol(("arg", name), NonEmptySymbol)
+        self.arguments = list(self.holes)
+        return symbolic
+
+    def parse(self, html: str) -> tuple[list[str], list[Hole]]:
+        segments: list[str] = []
+        holes: list[Hole] = []
+        position = 0
+        for match in re.finditer(f"\x00{self.marker}(\\d+)\x00", html):
+            segments.append(html[position : match.start()])
+            holes.append(self.holes[int(match.group(1))])
+            position = match.end()
+        segments.append(html[position:])
+
+        if any("\x00" in segment for segment in segments):
+            raise DataDependentError("Symbolic values were transformed while rendering")
+
+        return segments, holes
+
+
+class Template:
+    def __init__(self, segments: list[str], holes: list[Hole], tag: str | None):
+        self.segments = segments
+        self.holes = holes
+        self.tag = tag or "compiled"
+
+        # Keep the closing tag apart so children can still be appended (eg: scripts added to the root layout).
+        self.closing = None
+        if tag and segments[-1].endswith(f"</{tag}>"):
+            self.closing = f"</{tag}>"
+            segments[-1] = segments[-1][: -len(self.closing)]
+
+    def fill(self, kwargs: dict[str, Any]) -> list[str | HtmlElement]:
+        values: list[str | HtmlElement] = []
+        for kind, name in self.holes:
+            if kind == "children":
+                values.append(kwargs[name])
+            elif kind == "page":
+                values.append(str(getattr(kwargs.get("page") or ViewContext.get_current().page, name)))
+            else:
+                values.append(str(kwargs[name]))
+        return values
+
+
+class CompiledElement(HtmlElement):
+    """The result of a compiled view, rendered by joining the template segments and the filled holes."""
+
+    def __init__(self, template: Template, values: list[str | HtmlElement], tag: str):
+        self.template = template
+        self.values = values
+        super().__init__(tag=tag)
+
+    def render(self):
+        segments = self.template.segments
+        parts = [segments[0]]
+        for value, segment in zip(self.values, segments[1:], strict=True):
+            parts.append(value.render() if isinstance(value, HtmlElement) else value)
+            parts.append(segment)
+
+        if self.children:
+            parts.extend(self._render_child(child) for child in self.children)
+        if self.template.closing:
+            parts.append(self.template.closing)
+
+        return "".join(parts)
+
+
+_NOT_COMPILABLE = object()
+
+
+def compiled_view(func: Callable[..., Any]) -> Any:
+    """
+    Compiles a view (or layout) function into a string template on its first call.
+
+    The function must be a pure function of its dynamic route arguments, `children` and `page`.
+    Views taking request bound parameters (eg: `query`, `session`) or registering actions are not compiled.
+
+    Usage:
+        @compiled_view
+        def view(patient_id: str):
+            return Div(f"Patient {patient_id}")
+    """
+    templates: dict[tuple[Any, ...], Any] = {}
+
+    def lookup(kwargs: dict[str, Any]) -> tuple[tuple[Any, ...], Any]:
+        key = (tuple(sorted(kwargs)), kwargs.get("children") is None)
+        if key not in templates and UNTRACEABLE_PARAMS.intersection(kwargs):
+            templates[key] = _NOT_COMPILABLE
+        return key, templates.get(key)
+
+    def compiled(template: Template, kwargs: dict[str, Any]) -> CompiledElement:
+        return CompiledElement(template, template.fill(kwargs), template.tag)
+
+    def not_compiled(err: Exception):
+        logger.debug(f"View {func.__module__}.{func.__name__} is not compiled: {err}")
+        return _NOT_COMPILABLE
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(**kwargs: Any) -> Any:
+            key, template = lookup(kwargs)
+            if template is None:
+                try:
+                    tracers = (_Tracer("h"), _Tracer("HoLe"))
+                    for tracer in tracers:
+                        with ViewContext(page=tracer.page, id_scope="trace") as tracer.context:  # type: ignore[arg-type]
+                            tracer.result = await func(**tracer.symbolic_kwargs(kwargs))
+                    template = _build_template(*tracers)
+                except Exception as err:
+                    template = not_compiled(err)
+                templates[key] = template
+
+            if isinstance(template, Template):
+                return compiled(template, kwargs)
+            return await func(**kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(**kwargs: Any) -> Any:
+        key, template = lookup(kwargs)
+        if template is None:
+            try:
+                tracers = (_Tracer("h"), _Tracer("HoLe"))
+                for tracer in tracers:
+                    with ViewContext(page=tracer.page, id_scope="trace") as tracer.context:  # type: ignore[arg-type]
+                        tracer.result = func(**tracer.symbolic_kwargs(kwargs))
+                template = _build_template(*tracers)
+            except Exception as err:
+                template = not_compiled(err)
+            templates[key] = template
+
+        if isinstance(template, Template):
+            return compiled(template, kwargs)
+        return func(**kwargs)
+
+    return wrapper
+
+
+def _build_template(first: _Tracer, second: _Tracer) -> Template:
+    """
+    Builds the template out of two traces with differently shaped placeholders.
+    Both traces must agree on every static segment, otherwise the output depends on the argument values.
+    """
+    parsed = []
+    for tracer in (first, second):
+        if not isinstance(tracer.result, HtmlElement):
+            raise DataDependentError("Views must return an HtmlElement")
+        if tracer.context is None or tracer.context.actions:
+            raise DataDependentError("Views registering actions can not be compiled")
+        parsed.append(tracer.parse(tracer.result.render()))
+
+    (segments, holes), (other_segments, other_holes) = parsed
+    if segments != other_segments or holes != other_holes:
+        raise DataDependentError("View structure depends on the values of its arguments")
+    # An argument only used in a condition (eg: `"a" if value else "b"`) would be compiled as a constant.
+    if not all(argument in holes for argument in first.arguments):
+        raise DataDependentError("Arguments must be rendered to be compiled")
+
+    return Template(segments, holes, getattr(first.result, "tag", None))
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import itertools
 from contextvars import ContextVar
 from typing import Any, ClassVar, Protocol
 
+"""Parameters bound to the user of the request, a view taking them renders differently for every user."""
+USER_BOUND_PARAMS = frozenset({"cookies", "session", "headers"})
+
 
 class Actionable(Protocol):
     name: ClassVar[str]
@@ -19,20 +23,48 @@ class Page:
         self.loading = loading
         self.error = error
 
+        # Seconds the client may reuse the navigation response of the page without revalidating it.
+        self.max_age: int | None = None
+
+        # URL of the versioned client script, to load from the root layout: `Script(src=page.client_src)`.
+        self.client_src = "/public/client.js"
+
     def to_json(self):
         return {"loading": self.loading, "error": self.error}
 
 
-Actions = dict[str, set[Actionable]]
+class IdAllocator:
+    """
+    Allocates element ids from a counter scoped by the rendered view (eg: its `RouteComponent.id`),
+    so rendering the same view twice gives the same ids.
+    """
+
+    def __init__(self, scope: str):
+        self.scope = scope
+        self._counter = itertools.count()
+
+    def next(self, prefix: str | None = None) -> str:
+        value = f"{self.scope}_{next(self._counter)}"
+        return f"{prefix}_{value}" if prefix else value
+
+
+"""Actions grouped by name. Dicts are used as ordered sets, since eg: state operations must run in the given order."""
+Actions = dict[str, dict[Actionable, None]]
 
 
 class ViewContext:
     _current_context: ClassVar[ContextVar[ViewContext | None]] = ContextVar("nik_view_context", default=None)
 
-    def __init__(self, page: Page | None = None):
+    def __init__(self, page: Page | None = None, window: str | None = None, id_scope: str | None = None):
         self.page = page
         self.actions: Actions = {}
 
+        # Key of the State whose next window is requested (see `VirtualList`), if any.
+        self.window = window
+
+        # Contexts without a scope share the ids of the enclosing context, see `__enter__`.
+        self.ids = IdAllocator(id_scope) if id_scope else None
+
     @classmethod
     def get_current(cls) -> ViewContext:
         ctx = cls._current_context.get()
@@ -42,8 +74,8 @@ class ViewContext:
 
     def add_action(self, action: Actionable):
         if action.name not in self.actions:
-            self.actions[action.name] = set()
-        self.actions[action.name].add(action)
+            self.actions[action.name] = {}
+        self.actions[action.name][action] = None
 
     def get_actions(self) -> list[Any] | None:
         if not self.actions:
@@ -63,6 +95,10 @@ class ViewContext:
         return prioritized_actions + other_actions
 
     def __enter__(self):
+        parent = ViewContext._current_context.get()
+        if self.ids is None and parent is not None:
+            self.ids = parent.ids
+
         self._token = ViewContext._current_context.set(self)
         return self
 
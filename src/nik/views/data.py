@@ -2,15 +2,21 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import threading
 import uuid
-from collections.abc import Iterable
-from copy import deepcopy
-from typing import Any, Generic, TypedDict, TypeVar
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Generic, TypedDict, TypeVar, overload
 
 from .actions import UpdateState
 from .context import ViewContext
 
+if TYPE_CHECKING:
+    from .callbacks import StateOperation
+
 T = TypeVar("T")
+K = TypeVar("K")
+V = TypeVar("V")
 
 _sentinel = object()
 
@@ -18,6 +24,13 @@ ID_RANDOM_PART_LEN = 6
 
 
 class State(Generic[T]):
+    """
+    A value of a view shared with the client.
+
+    List and dict updates (`append`, `extend`, `insert`, `remove`, `move`, `patch`, `state[key] = value`) do not copy
+    the value: the updated State holds a read-only `FrozenList` or `FrozenDict` instead of a `list` or a `dict`.
+    """
+
     def __init__(self, name: str, value: T, parent: Any = None, key: str | None = None):
         self.name = name
         self.value: T = value
@@ -36,12 +49,74 @@ class State(Generic[T]):
         """
         Append a value to the State's value if it is a list.
         """
-        assert isinstance(self.value, list), "State value must be a list to append items"
+        assert isinstance(self.value, (list, FrozenList)), "State value must be a list to append items"
+
+        return self._apply(FrozenList.of(self.value).with_appended(value), value, "append")
+
+    def extend(self, values: Iterable[Any]) -> State[T]:
+        """
+        Extend the State's value with the given values if it is a list.
+        """
+        assert isinstance(self.value, (list, FrozenList)), "State value must be a list to extend items"
+
+        values = list(values)
+        return self._apply(FrozenList.of(self.value).with_extended(values), values, "extend")
+
+    def remove(self, index: int | str) -> State[T]:
+        """
+        Remove the item at the index if the State's value is a list, or the key if it is a dict.
+        Only the removed index (or key) is sent to the client.
+        """
+        if isinstance(self.value, Mapping):
+            new_value: Any = FrozenDict.of(self.value).delete(index)
+        else:
+            assert isinstance(self.value, (list, FrozenList)), "State value must be a list or a dict to remove items"
+            assert isinstance(index, int), "List items must be removed by their index"
+            index = range(len(self.value))[index]
+            new_value = FrozenList.of(self.value).delete(index)
+
+        return self._apply(new_value, index, "remove")
+
+    def insert(self, index: int, value: Any) -> State[T]:
+        """
+        Insert a value before the index if the State's value is a list.
+        """
+        assert isinstance(self.value, (list, FrozenList)), "State value must be a list to insert items"
+
+        # Same bounds as `list.insert`, so the client receives the actual position.
+        index = max(len(self.value) + index, 0) if index < 0 else min(index, len(self.value))
+        new_value = FrozenList.of(self.value).with_inserted(index, value)
+        return self._apply(new_value, [index, value], "insert")
+
+    def patch(self, path: int | str | Sequence[int | str], value: Any) -> State[T]:
+        """
+        Set a (nested) item of the State's value, eg: `rows.patch([3, "name"], "Nik")`.
+        Only the path and the new value are sent to the client.
+        """
+        path = [path] if isinstance(path, (int, str)) else list(path)
+        assert path, "Path to patch must not be empty"
 
-        new_value = deepcopy(self.value)
-        new_value.append(value)
+        new_value = _patch(self.value, path, value)
+        return self._apply(new_value, [path, value], "patch")
+
+    def move(self, from_index: int, to_index: int) -> State[T]:
+        """
+        Move the item at `from_index` to `to_index` if the State's value is a list.
+        """
+        assert isinstance(self.value, (list, FrozenList)), "State value must be a list to move items"
+
+        indexes = range(len(self.value))
+        from_index, to_index = indexes[from_index], indexes[to_index]
+        new_value = FrozenList.of(self.value).move(from_index, to_index)
+        return self._apply(new_value, [from_index, to_index], "move")
+
+    def _apply(self, new_value: Any, payload: Any, operation: StateOperation) -> State[T]:
         new_obj = State(self.name, new_value, parent=self.parent, key=self.key)
-        ViewContext.get_current().add_action(UpdateState(new_obj, value, operation="append"))
+        context = ViewContext.get_current()
+        action = UpdateState(new_obj, payload, operation=operation)
+        if operation in ("append", "extend"):
+            action = _merge_appends(context, action)
+        context.add_action(action)
         return new_obj
 
     def render(self):
@@ -67,7 +142,7 @@ class State(Generic[T]):
         raise TypeError(f"State value of type {type(self.value).__name__} is not iterable")
 
     def __getitem__(self, item: str) -> State:
-        if isinstance(self.value, dict):
+        if isinstance(self.value, Mapping):
             return State(
                 name=item,
                 value=self.value.get(item),
@@ -77,16 +152,16 @@ class State(Generic[T]):
         raise TypeError(f"State value of type {type(self.value).__name__} is not subscriptable")
 
     def __setitem__(self, key: str, value: Any):
-        assert isinstance(self.value, dict), "State value must be a dict to set items"
+        assert isinstance(self.value, Mapping), "State value must be a dict to set items"
 
-        obj = State(self.name, deepcopy(self.value), parent=self.parent, key=self.key)
+        obj = State(self.name, FrozenDict.of(self.value), parent=self.parent, key=self.key)
         prop_state = State(
             name=key,
             value=value,
             parent=obj,
             key=f"{self.key}.{key}",
         )
-        obj.value[key] = prop_state
+        obj.value = obj.value.set(key, prop_state)
         ViewContext.get_current().add_action(UpdateState(prop_state, value))
 
     def _make_key(self) -> str:
@@ -106,6 +181,269 @@ class State(Generic[T]):
         return f"State(name={self.name}, value={self.value}, key={self.key})"
 
 
+def _merge_appends(context: ViewContext, action: UpdateState) -> UpdateState:
+    """
+    Merges the action into the previous state update when both append to the same State,
+    so a loop of appends is sent as one extend and the client inserts the items at once.
+    """
+    updates = context.actions.get(UpdateState.name)
+    if not updates:
+        return action
+
+    previous = next(reversed(updates))
+    if not isinstance(previous, UpdateState) or previous.callback.operation not in ("append", "extend"):
+        return action
+
+    state, other = action.callback.state, previous.callback.state
+    if (state.key, state.name, state.parent) != (other.key, other.name, other.parent):
+        return action
+
+    def items(update: UpdateState) -> list[Any]:
+        callback = update.callback
+        return [callback.value] if callback.operation == "append" else list(callback.value)
+
+    del updates[previous]
+    return UpdateState(state, [*items(previous), *items(action)], operation="extend")
+
+
+def _patch(container: Any, path: list[int | str], value: Any) -> Any:
+    """Returns a copy of the container with the item at the path replaced, sharing everything else."""
+    key, rest = path[0], path[1:]
+    if isinstance(container, Mapping):
+        return FrozenDict.of(container).set(key, _patch(container.get(key), rest, value) if rest else value)
+    if isinstance(container, (list, FrozenList)) and isinstance(key, int):
+        key = range(len(container))[key]
+        return FrozenList.of(container).set(key, _patch(container[key], rest, value) if rest else value)
+
+    raise TypeError(f"Can not patch {key!r} of a value of type {type(container).__name__}")
+
+
+_cow_lock = threading.Lock()
+_deleted = object()
+
+
+class FrozenList(Sequence[T]):
+    """
+    An immutable list used as the value of `State`s updated with `append`, `extend`, `insert`, `remove` or `move`.
+
+    It is a read-only `Sequence`, not a `list`: it is printed, concatenated (`+`) and serialized with `to_json`
+    like a list, `list(state.value)` returns a mutable copy (eg: for `json.dumps`).
+    It has no `append`, `extend` or `insert`: `with_appended`, `with_extended` and `with_inserted` return new lists.
+
+    Lists derived from each other share the same storage: only the items up to `len(self)` belong to a list.
+    Appending to the most recent list grows the shared storage in place, so a chain of appends is linear.
+    Appending to an older list copies its items first, which leaves the lists derived from it untouched.
+    The items themselves are shared and not copied.
+    """
+
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._items = list(items)
+        self._length = len(self._items)
+
+    @classmethod
+    def of(cls, items: Iterable[T]) -> FrozenList[T]:
+        return items if isinstance(items, FrozenList) else cls(items)
+
+    @classmethod
+    def _share(cls, items: list[T], length: int) -> FrozenList[T]:
+        obj = cls.__new__(cls)
+        obj._items = items
+        obj._length = length
+        return obj
+
+    def with_appended(self, value: T) -> FrozenList[T]:
+        """Returns a new list with the value appended."""
+        return self.with_extended((value,))
+
+    def with_extended(self, values: Iterable[T]) -> FrozenList[T]:
+        """Returns a new list extended with the given values."""
+        values = list(values)
+        with _cow_lock:
+            if len(self._items) == self._length:
+                self._items.extend(values)
+                return self._share(self._items, self._length + len(values))
+
+        return self._share(self._items[: self._length] + values, self._length + len(values))
+
+    def set(self, index: int, value: T) -> FrozenList[T]:
+        """Returns a new list with the item at the index replaced."""
+        items = self._items[: self._length]
+        items[index] = value
+        return FrozenList._share(items, self._length)
+
+    def with_inserted(self, index: int, value: T) -> FrozenList[T]:
+        """Returns a new list with the value inserted before the index."""
+        items = self._items[: self._length]
+        items.insert(index, value)
+        return FrozenList._share(items, self._length + 1)
+
+    def delete(self, index: int) -> FrozenList[T]:
+        """Returns a new list without the item at the index."""
+        items = self._items[: self._length]
+        del items[index]
+        return FrozenList._share(items, self._length - 1)
+
+    def move(self, from_index: int, to_index: int) -> FrozenList[T]:
+        """Returns a new list with the item at `from_index` moved to `to_index`."""
+        items = self._items[: self._length]
+        items.insert(to_index, items.pop(from_index))
+        return FrozenList._share(items, self._length)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return self._items[: self._length][index]
+        return self._items[range(self._length)[index]]
+
+    def __iter__(self) -> Iterator[T]:
+        return islice(self._items, self._length)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (list, tuple, FrozenList)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=False))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __add__(self, other: Iterable[T]) -> list[T]:
+        if not isinstance(other, (list, tuple, FrozenList)):
+            return NotImplemented
+        return [*self, *other]
+
+    def __radd__(self, other: Iterable[T]) -> list[T]:
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return [*other, *self]
+
+    def to_json(self):
+        return list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+FROZEN_DICT_MAX_DEPTH = 32
+
+
+class FrozenDict(Mapping[K, V]):
+    """
+    An immutable dict used as the value of `State`s updated with `state[key] = value` or `remove(key)`.
+
+    It is a read-only `Mapping`, not a `dict`: it is printed, merged (`|`) and serialized with `to_json`
+    like a dict, `dict(state.value)` returns a mutable copy (eg: for `json.dumps`).
+
+    Setting a key returns a new dict layered on top of the current one instead of copying it.
+    Layers are merged into a new dict once there are more than `FROZEN_DICT_MAX_DEPTH` of them.
+    The wrapped dict is shared and never modified.
+    """
+
+    __slots__ = ("_parent", "_key", "_value", "_depth", "_flat")
+
+    def __init__(self, items: Mapping[K, V] | None = None):
+        self._parent: Mapping[K, V] = items if items is not None else {}
+        self._key: Any = _sentinel
+        self._value: Any = None
+        self._depth = 0
+        self._flat: dict[K, V] | None = None
+
+    @classmethod
+    def of(cls, items: Mapping[K, V]) -> FrozenDict[K, V]:
+        return items if isinstance(items, FrozenDict) else cls(items)
+
+    def set(self, key: K, value: V) -> FrozenDict[K, V]:
+        """Returns a new dict with the key set to the value."""
+        return self._layer(key, value)
+
+    def delete(self, key: K) -> FrozenDict[K, V]:
+        """Returns a new dict without the key."""
+        if key not in self:
+            raise KeyError(key)
+        return self._layer(key, _deleted)
+
+    def _layer(self, key: K, value: Any) -> FrozenDict[K, V]:
+        obj = FrozenDict(self._to_dict() if self._depth >= FROZEN_DICT_MAX_DEPTH else self)
+        obj._key = key
+        obj._value = value
+        obj._depth = 1 if self._depth >= FROZEN_DICT_MAX_DEPTH else self._depth + 1
+        return obj
+
+    def _to_dict(self) -> dict[K, V]:
+        if self._flat is None:
+            if self._key is _sentinel:
+                flat = dict(self._parent)
+            else:
+                parent = self._parent._to_dict() if isinstance(self._parent, FrozenDict) else self._parent
+                flat = {**parent, self._key: self._value}
+                if self._value is _deleted:
+                    del flat[self._key]
+            self._flat = flat
+        return self._flat
+
+    def __getitem__(self, key: K) -> V:
+        node: Mapping[K, V] = self
+        while isinstance(node, FrozenDict):
+            if node._flat is not None:
+                return node._flat[key]
+            if node._key is not _sentinel and node._key == key:
+                if node._value is _deleted:
+                    raise KeyError(key)
+                return node._value
+            node = node._parent
+        return node[key]
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]  # type: ignore[index]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._to_dict())
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self._to_dict() == dict(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __or__(self, other: Mapping[K, V]) -> dict[K, V]:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return {**self._to_dict(), **other}
+
+    def __ror__(self, other: Mapping[K, V]) -> dict[K, V]:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return {**other, **self._to_dict()}
+
+    def to_json(self):
+        return self._to_dict()
+
+    def __repr__(self):
+        return repr(self._to_dict())
+
+
 class When:
     def __init__(self, condition: State, equal_to: Any = _sentinel, not_equal_to: Any = _sentinel, do: Any = None):
         self.condition = condition
@@ -143,7 +481,17 @@ class Id:
 
     @staticmethod
     def generate(prefix: str | None = None) -> Id:
-        """Generates a random ID."""
+        """
+        Generates the next ID of the view being rendered.
+        A random ID is generated when there is no active `ViewContext` with an id scope.
+        """
+        try:
+            ids = ViewContext.get_current().ids
+        except RuntimeError:
+            ids = None
+        if ids is not None:
+            return Id(ids.next(prefix))
+
         random_part = uuid.uuid4().hex[:ID_RANDOM_PART_LEN]
         if prefix:
             return Id(f"{prefix}_{random_part}")
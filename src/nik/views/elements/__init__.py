@@ -1,4 +1,16 @@
-from .base import Children, Classes, Element, ForEach, Fragment, HtmlElement, IdArg
+from .base import (
+    Children,
+    Classes,
+    Element,
+    ForEach,
+    Fragment,
+    HtmlElement,
+    IdArg,
+    Island,
+    Static,
+    VirtualList,
+    static_component,
+)
 from .embedded import Img, Svg
 from .form import (
     Button,
@@ -63,6 +75,10 @@ __all__ = [
     "Fragment",
     "HtmlElement",
     "IdArg",
+    "Island",
+    "Static",
+    "static_component",
+    "VirtualList",
     # Root
     "Html",
     # Metadata
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Iterable
+import functools
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
 from copy import deepcopy
-from typing import Any, TypeVar, Union
+from typing import Any, Literal, TypeVar, Union
 
-from ..actions import OnClick, RegisterObservable, SubscribeObservable
+from ..actions import LoadIsland, ObserveWindow, OnClick, RegisterObservable, SubscribeObservable, UpdateState
 from ..callbacks import (
     Callback,
     InsertElements,
@@ -18,6 +21,7 @@ from ..data import (
     State,
     When,
 )
+from ..templates import Symbol, get_item_template
 
 IdArg = Id | str | None
 Child = Union["HtmlElement", "PseudoElement", str]
@@ -25,6 +29,7 @@ Children = Child | list[Union[Child, "Children"]]
 Classes = str | list[str]
 ItemsType = TypeVar("ItemsType", bound=Iterable[Any])
 AttributeValueType = str | When | Id | State | bool | None
+IslandTrigger = Literal["visible", "idle"]
 
 
 def get_id(id: IdArg, generate: bool = False):
@@ -93,7 +98,10 @@ class HtmlElement:
             yield self._render_attribute(key, value)
 
     def _render_attribute(self, key: str, value: AttributeValueType):
-        if isinstance(value, (bool, State, When)):
+        if isinstance(value, Symbol):
+            # Traced item templates bind the attribute to a value, it is filled even when empty.
+            return f'{key}="{value}"'
+        elif isinstance(value, (bool, State, When)):
             return f"{key}" if value else ""
         elif isinstance(value, (str, Id)):
             return f'{key}="{value}"' if value else ""
@@ -229,6 +237,13 @@ class Element(HtmlElement):
 
         return style
 
+    @property
+    def is_reactive(self) -> bool:
+        """True if the element registers client side actions, eg: it binds to a `State` or a `When` condition."""
+        if self.on_click is not None or self.toggle_class is not None or isinstance(self.show, When):
+            return True
+        return any(isinstance(value, (State, When)) for value in self.attributes.values())
+
     def _on_click(self):
         if self.on_click is None:
             return
@@ -265,10 +280,15 @@ class ForEach(PseudoElement):
         children = []
 
         if items:
-            if callable(element):
-                children.extend(element(item) for item in items)
+            try:
+                template = get_item_template(element)
+            except Exception:
+                # The factory can not be probed with placeholders, it is called for every item.
+                template = None
+            if template is not None and template.is_compiled:
+                children.append(template.render(items, element if callable(element) else None))
             else:
-                children.extend(deepcopy(element) for _ in items)
+                children.extend(element(item) for item in items)  # type: ignore[operator]
 
         super().__init__(tag="for-each", children=children)
 
@@ -277,3 +297,219 @@ class ForEach(PseudoElement):
             ViewContext.get_current().add_action(
                 SubscribeObservable(self.items, InsertElements(self.element, parent_id=parent))
             )
+
+
+class VirtualList(ForEach):
+    """
+    A `ForEach` that renders one window of a long list and fetches the following windows as the user scrolls.
+
+    The view renders `items` for the window starting at the cursor it receives through `query[cursor_param]`
+    and passes the cursor of the next window as `next_cursor` (`None` when there are no more items).
+    When the last rendered item scrolls into view, the client requests the same view with the next cursor.
+    The view is executed again, but only the new items are sent back and appended to the list.
+
+    Usage:
+        def view(query: dict):
+            cursor = int(query.get("cursor", 0))
+            rows = State("rows", get_rows(offset=cursor, limit=100))
+            return Ul(
+                VirtualList(rows, lambda row: Li(row["name"]), parent=Id("rows"), next_cursor=cursor + 100),
+                id="rows",
+            )
+    """
+
+    def __init__(
+        self,
+        items: State[ItemsType],
+        element: Element | Callable[[Any], Element],
+        parent: Id,
+        next_cursor: Any = None,
+        url: str | None = None,
+        cursor_param: str = "cursor",
+    ):
+        context = ViewContext.get_current()
+
+        if context.window == items.key:
+            # Only the new items are needed, the client already has the list and its subscriptions.
+            self.items = items
+            self.element = element
+            self.parent = parent
+            PseudoElement.__init__(self, tag="for-each")
+            if items:
+                context.add_action(UpdateState(items, list(items), operation="extend"))
+        else:
+            super().__init__(items, element, parent=parent)
+
+        self.next_cursor = next_cursor
+        context.add_action(ObserveWindow(parent, items, next_cursor, url, cursor_param))
+
+
+class Static(PseudoElement):
+    """
+    Wraps a subtree that has no reactive parts (no `State`, `When`, generated ids or actions).
+    The subtree is rendered once and the resulting HTML is emitted as is afterwards,
+    which makes it suitable for module level navbars, footers and `Head` metadata.
+    """
+
+    def __init__(self, element: HtmlElement):
+        if _is_reactive(element):
+            raise ValueError("Static subtrees cannot contain reactive elements.")
+
+        self._html: str | None = None
+        super().__init__(tag="static", children=element)
+
+    def render(self):
+        if self._html is None:
+            self._html = super().render()
+            self.children = []
+        return self._html
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class DeferredFragment(Fragment):
+    """
+    Fragment of a route partial given to its parent view as `children` before the partial is rendered.
+    The partial is rendered into it after the parent view, unless an `Island` claimed it.
+    """
+
+    def __init__(self, id: IdArg):
+        super().__init__(id=id)
+        self.claimed = False
+
+
+class Island(PseudoElement):
+    """
+    Renders a placeholder instead of the partial of the route, the client loads the partial
+    when the placeholder scrolls into view (`trigger="visible"`) or when the browser is idle (`trigger="idle"`).
+    The partial is not executed with the page, it is fetched and rendered by a partial request.
+
+    The route opts in with `defer_partial = True`, its partial is then rendered after the view
+    (unless an island claimed it), otherwise the partial is rendered before the view and the island shows it as is.
+
+    Usage:
+        defer_partial = True
+
+        def view(children: Children):
+            return Main(H1("Product"), Island(children, placeholder=P("Loading reviews...")))
+
+        def partial():
+            return Section(...)
+    """
+
+    def __init__(
+        self,
+        children: Children | None,
+        placeholder: Children | None = None,
+        trigger: IslandTrigger = "visible",
+    ):
+        if trigger not in ("visible", "idle"):
+            raise ValueError(f"Unknown island trigger '{trigger}', expected 'visible' or 'idle'.")
+
+        self.trigger = trigger
+        if isinstance(children, DeferredFragment):
+            assert children.id, "Deferred fragment given without an id"
+            children.claimed = True
+            if placeholder is not None:
+                children.add_child(placeholder)
+            ViewContext.get_current().add_action(LoadIsland(children.id, trigger))
+
+        # Otherwise the partial is already rendered (eg: outside of a page render), it is shown as is.
+        super().__init__(tag="island", children=children)
+
+
+def _is_reactive(element: HtmlElement | str) -> bool:
+    if isinstance(element, (str, Static)):
+        return False
+    if isinstance(element, (ForEach, Island)):
+        return True
+    if isinstance(element, Element):
+        if element.is_reactive:
+            return True
+    elif any(isinstance(value, (State, When)) for value in element.attributes.values()):
+        return True
+
+    return any(_is_reactive(child) for child in getattr(element, "children", ()))  # type: ignore[arg-type]
+
+
+_DYNAMIC = object()
+
+
+def static_component(func: Callable[..., HtmlElement] | None = None, *, maxsize: int = 256) -> Any:
+    """
+    Caches the rendered HTML of a component function, keyed by the function and its arguments.
+
+    The first call of every argument combination runs the function in an isolated `ViewContext`.
+    If the resulting subtree registers any actions it is treated as dynamic: the actions are handed over
+    to the current context and the function is always called directly for these arguments.
+
+    Usage:
+        @static_component
+        def footer(year: int):
+            return Footer(P(f"© {year}"))
+    """
+
+    def decorator(func: Callable[..., HtmlElement]) -> Callable[..., HtmlElement]:
+        cache: OrderedDict[Hashable, Any] = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> HtmlElement:
+            key = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+
+            with lock:
+                cached = cache.get(key)
+                if cached is not None:
+                    cache.move_to_end(key)
+
+            if cached is _DYNAMIC:
+                return func(*args, **kwargs)
+            elif cached is not None:
+                return cached
+
+            element, is_dynamic = _probe_component(func, args, kwargs)
+            result = element if is_dynamic else Static(element)
+
+            with lock:
+                cache[key] = _DYNAMIC if is_dynamic else result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+
+            return result
+
+        wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def _probe_component(
+    func: Callable[..., HtmlElement], args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> tuple[HtmlElement, bool]:
+    """Runs the component in a child context and reports if it registered any actions."""
+    try:
+        parent = ViewContext.get_current()
+    except RuntimeError:
+        parent = None
+
+    with ViewContext(page=parent.page if parent else None) as probe:
+        element = func(*args, **kwargs)
+
+    if not probe.actions and not _is_reactive(element):
+        return element, False
+
+    if parent is None:
+        raise RuntimeError("Reactive static_component called without an active ViewContext")
+
+    for actions in probe.actions.values():
+        for action in actions:
+            parent.add_action(action)
+
+    return element, True
@@ -46,5 +46,9 @@ class Svg(Element):
         with open(abspath(self.path)) as file:
             return file.read()
 
+    @property
+    def is_reactive(self) -> bool:
+        return False
+
     def render(self):
         return self.content
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from typing import Any
 
-from ..actions import BindValue, ListenSubmit, RegisterObservable, SubscribeObservable
-from ..callbacks import Callback, UpdateFormStateClass
+from ..actions import BindValue, ListenSubmit, Optimistic, RegisterObservable, SubscribeObservable
+from ..callbacks import Callback, UpdateFormStateClass, UpdateState
 from ..context import ViewContext
 from ..data import (
     Id,
@@ -14,6 +15,22 @@ from .base import Children, Classes, Element, IdArg, get_id
 
 
 class Form(Element):
+    """
+    A form submitted by the client, the server action response replaces the view.
+
+    `optimistic` updates are applied by the client as soon as the form is submitted, so the page does not wait
+    for the server. String values `"{{form.<field>}}"` are replaced by the submitted value of the field.
+    The states also updated by the server response are rolled back before its actions run, the others keep
+    their optimistic value. They are all rolled back if the submission fails and the form state is set to "error".
+
+    Usage:
+        Form(
+            Input(name="title"),
+            Button("Add"),
+            optimistic=UpdateState(todos, {"title": "{{form.title}}", "done": False}, "append"),
+        )
+    """
+
     def __init__(
         self,
         *args: Children,
@@ -22,6 +39,7 @@ class Form(Element):
         reset_after_success: bool = False,
         loading_class: str | None = None,
         error_class: str | None = None,
+        optimistic: UpdateState | Sequence[UpdateState] | None = None,
         id: IdArg = None,
         toggle_class: When | None = None,
         show: When | bool | None = None,
@@ -35,10 +53,11 @@ class Form(Element):
         self.error_class = error_class
         self.errors = errors
         self.reset_after_success = reset_after_success
+        self.optimistic = _to_updates(optimistic)
 
         kwargs["method"] = method
 
-        should_generate_id = isinstance(errors, State)
+        should_generate_id = isinstance(errors, State) or bool(self.optimistic)
         id = get_id(id, should_generate_id)
 
         super().__init__(
@@ -54,18 +73,26 @@ class Form(Element):
         )
 
         if self.id:
-            ViewContext.get_current().add_action(ListenSubmit(self.id, self.reset_after_success))
+            ViewContext.get_current().add_action(ListenSubmit(self.id, self.reset_after_success, self.optimistic))
+            _register_updated_states(self.optimistic)
 
-            if self.loading_class or self.error_class:
+            if self.loading_class or self.error_class or self.optimistic:
                 form_state = State(f"{self.id}_form_state", "ready", key=f"{self.id}_form_state")
                 ViewContext.get_current().add_action(RegisterObservable(form_state))
-                ViewContext.get_current().add_action(
-                    SubscribeObservable(form_state, UpdateFormStateClass(self.id, self.loading_class, self.error_class))
-                )
+                if self.loading_class or self.error_class:
+                    ViewContext.get_current().add_action(
+                        SubscribeObservable(
+                            form_state, UpdateFormStateClass(self.id, self.loading_class, self.error_class)
+                        )
+                    )
 
             if self.errors is not None:
                 ViewContext.get_current().add_action(RegisterObservable(self.errors))
 
+    @property
+    def is_reactive(self) -> bool:
+        return super().is_reactive or self.id is not None
+
 
 class Input(Element):
     def __init__(
@@ -108,6 +135,10 @@ class Input(Element):
 
         self._bind_value()
 
+    @property
+    def is_reactive(self) -> bool:
+        return super().is_reactive or isinstance(self.value, State)
+
     def _bind_value(self):
         if self.value is None or not isinstance(self.value, State):
             return
@@ -156,6 +187,11 @@ class Checkbox(Input):
 
 
 class Button(Element):
+    """
+    `optimistic` updates are applied by the client when the button submits its form,
+    in addition to the ones of the form, see `Form`.
+    """
+
     def __init__(
         self,
         *args: Children,
@@ -166,11 +202,15 @@ class Button(Element):
         toggle_class: When | None = None,
         show: When | bool | None = None,
         on_click: Callback | None = None,
+        optimistic: UpdateState | Sequence[UpdateState] | None = None,
         **kwargs,
     ):
         if type is not None:
             kwargs["type"] = type
 
+        self.optimistic = _to_updates(optimistic)
+        id = get_id(id, bool(self.optimistic))
+
         super().__init__(
             *args,
             tag="button",
@@ -183,6 +223,26 @@ class Button(Element):
             **kwargs,
         )
 
+        if self.optimistic:
+            assert self.id, "optimistic parameter given without an id"
+            ViewContext.get_current().add_action(Optimistic(self.id, self.optimistic))
+            _register_updated_states(self.optimistic)
+
+    @property
+    def is_reactive(self) -> bool:
+        return super().is_reactive or bool(self.optimistic)
+
+
+def _to_updates(optimistic: UpdateState | Sequence[UpdateState] | None) -> list[UpdateState]:
+    if optimistic is None:
+        return []
+    return [optimistic] if isinstance(optimistic, UpdateState) else list(optimistic)
+
+
+def _register_updated_states(updates: list[UpdateState]):
+    for update in updates:
+        ViewContext.get_current().add_action(RegisterObservable(update.state))
+
 
 class Label(Element):
     def __init__(
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
 from ..actions import RegisterObservable, SubscribeObservable
 from ..context import ViewContext
@@ -248,6 +248,7 @@ class A(Element):
         href: str | None = None,
         active_class: str | None = None,
         controlled: bool = True,
+        prefetch: Literal["hover", "viewport"] | None = None,
         id: IdArg = None,
         classes: Classes | None = None,
         children: Children | None = None,
@@ -269,6 +270,9 @@ class A(Element):
 
         if not self.controlled:
             kwargs["data-controlled"] = "0"
+        if prefetch:
+            # The client fetches the navigation on hover or touch (or once the link is visible) and caches it.
+            kwargs["data-prefetch"] = prefetch
 
         super().__init__(
             *args,
@@ -291,6 +295,10 @@ class A(Element):
                 SubscribeObservable(nav_state, ToggleClass(self.id, When(nav_state, equal_to=href, do=active_class)))
             )
 
+    @property
+    def is_reactive(self) -> bool:
+        return super().is_reactive or bool(self.active_class)
+
 
 class Strong(Element):
     def __init__(
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import html
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+from .context import ViewContext
+
+if TYPE_CHECKING:
+    from .elements import Element, HtmlElement
+
+"""
+Helpers to render elements as string templates.
+
+Templates use the `{{value.<path>}}` placeholders understood by the client's `insertElements` callback,
+so the same template can be sent to the client and filled on the server.
+"""
+
+TEMPLATE_CACHE_SIZE = 512
+
+_placeholder_re = re.compile(r"{{\s*value\.([^}]+?)\s*}}")
+
+
+class DataDependentError(Exception):
+    """Raised when a traced element makes a decision based on the value of a symbolic argument."""
+
+
+def _data_dependent(self: Any, *args: Any, **kwargs: Any) -> Any:
+    raise DataDependentError("Output depends on the value of a symbolic argument")
+
+
+class Symbol(str):
+    """
+    A placeholder string used while tracing.
+
+    It can be rendered, formatted without a format spec and concatenated, anything else
+    (comparisons, hashing, length, slicing, string methods...) raises `DataDependentError`.
+    """
+
+    __slots__ = ()
+
+    def __format__(self, format_spec: str) -> str:
+        if format_spec:
+            raise DataDependentError("Format specs are not supported on symbolic values")
+        return str.__str__(self)
+
+
+_SYMBOL_BLOCKED_DUNDERS = (
+    "__eq__",
+    "__ne__",
+    "__lt__",
+    "__le__",
+    "__gt__",
+    "__ge__",
+    "__hash__",
+    "__len__",
+    "__contains__",
+    "__getitem__",
+    "__iter__",
+    "__mod__",
+    "__rmod__",
+    "__mul__",
+    "__rmul__",
+)
+for _name in dir(str):
+    if _name in _SYMBOL_BLOCKED_DUNDERS or not _name.startswith("_"):
+        setattr(Symbol, _name, _data_dependent)
+
+
+class NonEmptySymbol(Symbol):
+    """A symbol for values that are known to be truthy, eg: dynamic route segments."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return True
+
+
+class _TemplateRefDict:
+    """No matter what key is given always return the name of the key."""
+
+    def __getitem__(self, key: Any) -> str:
+        return "{{value." + str(key) + "}}"
+
+    def __getattr__(self, item: str) -> str:
+        return "{{value." + item + "}}"
+
+
+class _TracingRefDict(Symbol):
+    """
+    Same as `_TemplateRefDict` but values can not be inspected.
+    The item itself renders as `{{value}}`, so factories using it as a value (eg: scalar items) are not compiled.
+    """
+
+    _nik_accessed: list[Symbol]
+
+    def __new__(cls) -> _TracingRefDict:
+        item = super().__new__(cls, "{{value}}")
+        item._nik_accessed = []
+        return item
+
+    def __getitem__(self, key: Any) -> Symbol:  # type: ignore[override]
+        return self._access(str(key))
+
+    def __getattr__(self, item: str) -> Symbol:
+        return self._access(item)
+
+    def _access(self, path: str) -> Symbol:
+        placeholder = Symbol("{{value." + path + "}}")
+        self._nik_accessed.append(placeholder)
+        return placeholder
+
+
+class ItemTemplate:
+    """
+    The template of a single `ForEach` item.
+
+    `html` is the template sent to the client. When the element factory is a pure template of the item
+    (it does not branch on, or transform the item values and registers no actions) the template is
+    also compiled into segments, so the server can render items without building element trees.
+    """
+
+    def __init__(self, html: str, is_compiled: bool):
+        self.html = html
+        self.is_compiled = is_compiled
+
+        self.segments: list[str] = []
+        self.paths: list[list[str]] = []
+        if is_compiled:
+            position = 0
+            for match in _placeholder_re.finditer(html):
+                self.segments.append(html[position : match.start()])
+                self.paths.append(match.group(1).split("."))
+                position = match.end()
+            self.segments.append(html[position:])
+
+    @classmethod
+    def repeated(cls, html: str) -> ItemTemplate:
+        """A template rendered as is for every item, eg: for prototype elements that are not factories."""
+        template = cls(html, is_compiled=False)
+        template.is_compiled = True
+        template.segments = [html]
+        return template
+
+    def fill(self, item: Any) -> str | None:
+        """
+        The html of an item, its values are converted and escaped like the client fills the template.
+        None when one of its values is not a scalar (eg: a list), only the factory can render it.
+        """
+        segments = self.segments
+        parts = [segments[0]]
+        for path, segment in zip(self.paths, segments[1:], strict=True):
+            text = _to_text(_resolve_path(item, path))
+            if text is None:
+                return None
+            parts.append(html.escape(text))
+            parts.append(segment)
+        return "".join(parts)
+
+    def render(self, items: Iterable[Any], element: Callable[[Any], HtmlElement] | None = None) -> str:
+        """Renders the items, the ones that can not be filled are rendered by the `element` factory."""
+        if not self.paths:
+            return "".join(self.html for _ in items)
+
+        parts = []
+        for item in items:
+            item_html = self.fill(item)
+            if item_html is None:
+                if element is None:
+                    raise ValueError(f"Item {item!r} can not be rendered by the template")
+                item_html = element(item).render()
+            parts.append(item_html)
+        return "".join(parts)
+
+
+_cache: OrderedDict[Hashable, ItemTemplate] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_item_template(element: Element | Callable[[Any], Element]) -> ItemTemplate:
+    """Returns the (cached) template of the given `ForEach` element or element factory."""
+    key = _cache_key(element)
+    if key is not None:
+        with _cache_lock:
+            template = _cache.get(key)
+            if template is not None:
+                _cache.move_to_end(key)
+                return template
+
+    template, is_cacheable = _build_item_template(element)
+
+    if key is not None and is_cacheable:
+        with _cache_lock:
+            _cache[key] = template
+            if len(_cache) > TEMPLATE_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    return template
+
+
+def _build_item_template(element: Element | Callable[[Any], Element]) -> tuple[ItemTemplate, bool]:
+    """Templates registering actions may depend on the current page (eg: active links), they are not cached."""
+    try:
+        parent = ViewContext.get_current()
+    except RuntimeError:
+        parent = None
+    page = parent.page if parent else None
+
+    if not callable(element):
+        return ItemTemplate.repeated(element.render()), False
+
+    # Probes allocate their own ids, the template is only built when it is not cached yet.
+    with ViewContext(page=page, id_scope="item") as client_probe:
+        client_html = element(_TemplateRefDict()).render()
+    if client_probe.actions:
+        return ItemTemplate(client_html, is_compiled=False), False
+
+    try:
+        with ViewContext(page=page, id_scope="item"):
+            item = _TracingRefDict()
+            traced_html = element(item).render()
+    except Exception:
+        is_compiled = False
+    else:
+        # Values only accessed (eg: compared with `is`) and not rendered would be the same for every item.
+        is_compiled = traced_html == client_html and all(path in traced_html for path in item._nik_accessed)
+
+    return ItemTemplate(client_html, is_compiled), True
+
+
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def _cache_key(element: Any) -> Hashable | None:
+    """
+    Element factories are usually lambdas re-created on every request, so they are keyed by their code
+    and the values they close over. Factories closing over anything but plain immutable values are not cached.
+    """
+    code = getattr(element, "__code__", None)
+    if code is None:
+        return None
+
+    captured = [cell.cell_contents for cell in element.__closure__ or ()]
+    captured.append(element.__defaults__)
+    captured.append(tuple(sorted((element.__kwdefaults__ or {}).items())))
+    if not all(_is_immutable(value) for value in captured):
+        return None
+
+    return code, tuple(captured)
+
+
+def _is_immutable(value: Any) -> bool:
+    if isinstance(value, tuple):
+        return all(_is_immutable(v) for v in value)
+    return isinstance(value, _IMMUTABLE_TYPES)
+
+
+def _to_text(value: Any) -> str | None:
+    """The text of a value as rendered by the client (`String(value)`), None if it is not a scalar."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None
+
+
+def _resolve_path(item: Any, path: list[str]) -> Any:
+    value = item
+    for part in path:
+        if value is None:
+            return None
+        if isinstance(value, Mapping):
+            value = value.get(part)
+        elif isinstance(value, Sequence) and not isinstance(value, str) and part.isdigit():
+            index = int(part)
+            value = value[index] if index < len(value) else None
+        else:
+            value = getattr(value, part, None)
+    return value
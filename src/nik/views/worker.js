@@ -0,0 +1,109 @@
+/**
+ * Service worker of a Nik app, see `nik/server/serviceworker.py`.
+ * The generator prepends `NIK_WORKER`:
+ *  version: hash of the routes and the public files, the caches of other versions are deleted
+ *  precache: URLs of the hashed assets, cached when the worker is installed
+ *  routes: regular expressions of the public routes, their pages are cached
+ */
+
+const CACHE_PREFIX = "nik-";
+const STATIC_CACHE = `${CACHE_PREFIX}static-${NIK_WORKER.version}`;
+const SHELL_CACHE = `${CACHE_PREFIX}shell-${NIK_WORKER.version}`;
+const ROUTE_PATTERNS = NIK_WORKER.routes.map((source) => new RegExp(source));
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches
+      .open(STATIC_CACHE)
+      .then((cache) => cache.addAll(NIK_WORKER.precache))
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  const current = [STATIC_CACHE, SHELL_CACHE];
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(
+          names
+            .filter(
+              (name) =>
+                name.startsWith(CACHE_PREFIX) && !current.includes(name)
+            )
+            .map((name) => caches.delete(name))
+        )
+      )
+      .then(() => self.clients.claim())
+  );
+});
+
+/**
+ * Stores a copy of a complete same origin response.
+ *
+ * @param {String} cacheName
+ * @param {Request} request
+ * @param {Response} response
+ * @returns {Promise<void>}
+ */
+function store(cacheName, request, response) {
+  if (response.status !== 200 || response.type !== "basic") {
+    return Promise.resolve();
+  }
+  const copy = response.clone();
+  return caches.open(cacheName).then((cache) => cache.put(request, copy));
+}
+
+/**
+ * Public files: the cached copy, or the network response once cached.
+ * A deploy changing the files changes the version, so they are fetched again.
+ */
+function cacheFirst(event) {
+  return caches.match(event.request).then((cached) => {
+    if (cached) {
+      return cached;
+    }
+    return fetch(event.request).then((response) => {
+      event.waitUntil(store(STATIC_CACHE, event.request, response));
+      return response;
+    });
+  });
+}
+
+/**
+ * Pages: the cached copy at once, refreshed from the network for the next visit.
+ */
+function staleWhileRevalidate(event) {
+  const network = fetch(event.request).then((response) => {
+    event.waitUntil(store(SHELL_CACHE, event.request, response));
+    return response;
+  });
+  return caches.open(SHELL_CACHE).then((cache) =>
+    cache.match(event.request).then((cached) => {
+      if (cached) {
+        // The refresh must not fail the event once the cached page is served.
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+      }
+      return network;
+    })
+  );
+}
+
+self.addEventListener("fetch", (event) => {
+  const { request } = event;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin) {
+    return;
+  }
+
+  if (url.pathname.startsWith("/public/")) {
+    event.respondWith(cacheFirst(event));
+  } else if (
+    request.mode === "navigate" &&
+    ROUTE_PATTERNS.some((pattern) => pattern.test(url.pathname))
+  ) {
+    event.respondWith(staleWhileRevalidate(event));
+  }
+});
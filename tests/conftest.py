@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import importlib
+
 import httpx
 import pytest
 import pytest_asyncio
@@ -12,6 +14,12 @@ def manage_sys_path(monkeypatch):
     monkeypatch.syspath_prepend(FIXTURES_DIR)
 
 
+@pytest.fixture(autouse=True)
+def reset_counter(manage_sys_path):
+    """The counter of the fixture app is a module global, it is reset so every test starts from zero."""
+    importlib.import_module("app.routes.counter.route").COUNTER["value"] = 0
+
+
 @pytest_asyncio.fixture
 async def client(app):
     transport = httpx.ASGITransport(app=app)
@@ -5,18 +5,28 @@
 
 from app.routes.blocking.route import action as app_routes_blocking_route_action
 from app.routes.blocking.route import view as app_routes_blocking_route_view
+from app.routes.cached.route import view as app_routes_cached_route_view
+from app.routes.counter.route import action as app_routes_counter_route_action
+from app.routes.counter.route import view as app_routes_counter_route_view
 from app.routes.doctors.login.route import action as app_routes_doctors_login_route_action
 from app.routes.doctors.login.route import view as app_routes_doctors_login_route_view
 from app.routes.doctors.patients._patient_id_.appointments._appointment_id_.route import action as app_routes_doctors_patients__patient_id__appointments__appointment_id__route_action
 from app.routes.doctors.patients._patient_id_.appointments._appointment_id_.route import view as app_routes_doctors_patients__patient_id__appointments__appointment_id__route_view
 from app.routes.doctors.patients._patient_id_.route import view as app_routes_doctors_patients__patient_id__route_view
+from app.routes.feed.route import stream as app_routes_feed_route_stream
+from app.routes.feed.route import view as app_routes_feed_route_view
 from app.routes.layout import layout as app_routes_layout_layout
 from app.routes.patients.appointments.route import view as app_routes_patients_appointments_route_view
 from app.routes.patients.dashboard.route import view as app_routes_patients_dashboard_route_view
 from app.routes.patients.layout import layout as app_routes_patients_layout_layout
 from app.routes.patients.route import view as app_routes_patients_route_view
+from app.routes.reviews.route import partial as app_routes_reviews_route_partial
+from app.routes.reviews.route import view as app_routes_reviews_route_view
 from app.routes.route import action as app_routes_route_action
 from app.routes.route import view as app_routes_route_view
+from app.routes.rows.route import view as app_routes_rows_route_view
+from app.routes.titled.route import partial as app_routes_titled_route_partial
+from app.routes.titled.route import view as app_routes_titled_route_view
 from nik.server.authentication.session import Session
 from nik.server.cookies import Cookies
 from nik.server.routes.router import Route, RouteComponent, RouteComponentParam
@@ -46,6 +56,18 @@ _rc_app_routes_blocking_route_action = RouteComponent(
     app_routes_blocking_route_action,
     [], is_async=False,
 )
+_rc_app_routes_cached_route_view = RouteComponent(
+    app_routes_cached_route_view,
+    [RouteComponentParam("page", Page)], is_async=False,
+)
+_rc_app_routes_counter_route_view = RouteComponent(
+    app_routes_counter_route_view,
+    [], is_async=False,
+)
+_rc_app_routes_counter_route_action = RouteComponent(
+    app_routes_counter_route_action,
+    [], is_async=False,
+)
 _rc_app_routes_doctors_login_route_view = RouteComponent(
     app_routes_doctors_login_route_view,
     [], is_async=False,
@@ -66,6 +88,14 @@ _rc_app_routes_doctors_patients__patient_id__appointments__appointment_id__route
     app_routes_doctors_patients__patient_id__appointments__appointment_id__route_action,
     [], is_async=False,
 )
+_rc_app_routes_feed_route_view = RouteComponent(
+    app_routes_feed_route_view,
+    [], is_async=False,
+)
+_rc_app_routes_feed_route_stream = RouteComponent(
+    app_routes_feed_route_stream,
+    [RouteComponentParam("query", dict)], is_async=True,
+)
 _rc_app_routes_patients_layout_layout = RouteComponent(
     app_routes_patients_layout_layout,
     [RouteComponentParam("children", Children)], is_async=False,
@@ -82,6 +112,26 @@ _rc_app_routes_patients_dashboard_route_view = RouteComponent(
     app_routes_patients_dashboard_route_view,
     [], is_async=False,
 )
+_rc_app_routes_reviews_route_view = RouteComponent(
+    app_routes_reviews_route_view,
+    [RouteComponentParam("children", Children), RouteComponentParam("query", dict)], is_async=False,
+)
+_rc_app_routes_reviews_route_partial = RouteComponent(
+    app_routes_reviews_route_partial,
+    [], is_async=False,
+)
+_rc_app_routes_rows_route_view = RouteComponent(
+    app_routes_rows_route_view,
+    [RouteComponentParam("query", dict)], is_async=False,
+)
+_rc_app_routes_titled_route_view = RouteComponent(
+    app_routes_titled_route_view,
+    [RouteComponentParam("children", Children), RouteComponentParam("page", Page)], is_async=False,
+)
+_rc_app_routes_titled_route_partial = RouteComponent(
+    app_routes_titled_route_partial,
+    [RouteComponentParam("page", Page)], is_async=False,
+)
 
 
 _NONE_DYNAMIC_ROUTES = {
@@ -91,9 +141,18 @@ _NONE_DYNAMIC_ROUTES = {
     "/blocking": Route(
         "/blocking", [_rc_app_routes_layout_layout, _rc_app_routes_blocking_route_view], action=_rc_app_routes_blocking_route_action, permissions=None
     ),
+    "/cached": Route(
+        "/cached", [_rc_app_routes_layout_layout, _rc_app_routes_cached_route_view], action=None, permissions=None
+    ),
+    "/counter": Route(
+        "/counter", [_rc_app_routes_layout_layout, _rc_app_routes_counter_route_view], action=_rc_app_routes_counter_route_action, permissions=None
+    ),
     "/doctors/login": Route(
         "/doctors/login", [_rc_app_routes_layout_layout, _rc_app_routes_doctors_login_route_view], action=_rc_app_routes_doctors_login_route_action, permissions=None
     ),
+    "/feed": Route(
+        "/feed", [_rc_app_routes_layout_layout, _rc_app_routes_feed_route_view], action=None, permissions=None, stream=_rc_app_routes_feed_route_stream
+    ),
     "/patients": Route(
         "/patients", [_rc_app_routes_layout_layout, _rc_app_routes_patients_layout_layout, _rc_app_routes_patients_route_view], action=None, permissions={'role': 'patient'}
     ),
@@ -103,6 +162,15 @@ _NONE_DYNAMIC_ROUTES = {
     "/patients/dashboard": Route(
         "/patients/dashboard", [_rc_app_routes_layout_layout, _rc_app_routes_patients_layout_layout, _rc_app_routes_patients_dashboard_route_view], action=None, permissions={'role': 'patient'}
     ),
+    "/reviews": Route(
+        "/reviews", [_rc_app_routes_layout_layout, _rc_app_routes_reviews_route_view, _rc_app_routes_reviews_route_partial], action=None, permissions=None, defer_partial=True
+    ),
+    "/rows": Route(
+        "/rows", [_rc_app_routes_layout_layout, _rc_app_routes_rows_route_view], action=None, permissions=None
+    ),
+    "/titled": Route(
+        "/titled", [_rc_app_routes_layout_layout, _rc_app_routes_titled_route_view, _rc_app_routes_titled_route_partial], action=None, permissions=None
+    ),
 }
 
 
@@ -0,0 +1,7 @@
+from nik.views.context import Page
+from nik.views.elements import A, Div
+
+
+def view(page: Page):
+    page.max_age = 60
+    return Div("Cached page", A("Rows", href="/rows", prefetch="hover"))
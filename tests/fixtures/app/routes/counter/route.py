@@ -0,0 +1,13 @@
+from nik.views.actions import Action
+from nik.views.elements import Div
+
+COUNTER = {"value": 0}
+
+
+def action():
+    COUNTER["value"] += 1
+    Action.refresh_view()
+
+
+def view():
+    return Div(f"Count={COUNTER['value']}")
@@ -0,0 +1,19 @@
+from nik.server.streams import Topic
+from nik.views.data import Id, State
+from nik.views.elements import ForEach, Li, Ul
+
+FEED = Topic()
+
+
+def view():
+    messages = State("messages", [])
+    return Ul(ForEach(messages, lambda message: Li(message), parent=Id("feed")), id="feed")
+
+
+async def stream(query: dict):
+    messages = State("messages", [])
+    messages.append(f"Hello {query.get('name', '')}".strip())
+    yield
+
+    async for event in FEED.subscribe():
+        yield event
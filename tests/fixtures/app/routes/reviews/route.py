@@ -0,0 +1,13 @@
+from nik.views.elements import H1, Children, Island, Li, Main, P, Ul
+
+defer_partial = True
+
+
+def view(children: Children, query: dict):
+    if query.get("island") == "off":
+        return Main(H1("Product"), children)
+    return Main(H1("Product"), Island(children, placeholder=P("Loading reviews..."), trigger="idle"))
+
+
+def partial():
+    return Ul(Li("Great"), Li("Fine"))
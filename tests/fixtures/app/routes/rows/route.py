@@ -0,0 +1,17 @@
+from nik.views.data import Id, State
+from nik.views.elements import Li, P, Ul, VirtualList
+
+ROWS = [{"name": f"Row {i}"} for i in range(5)]
+WINDOW_SIZE = 2
+
+
+def view(query: dict):
+    cursor = int(query.get("cursor", 0))
+    next_cursor = cursor + WINDOW_SIZE if cursor + WINDOW_SIZE < len(ROWS) else None
+    rows = State("rows", ROWS[cursor : cursor + WINDOW_SIZE])
+
+    return Ul(
+        P("Rows"),
+        VirtualList(rows, lambda row: Li(row["name"]), parent=Id("rows"), next_cursor=next_cursor),
+        id="rows",
+    )
@@ -0,0 +1,12 @@
+from nik.views.context import Page
+from nik.views.elements import Children, Div, P
+
+
+def view(children: Children, page: Page):
+    page.title = "View"
+    return Div(children)
+
+
+def partial(page: Page):
+    page.title = "Partial"
+    return P("Partial")
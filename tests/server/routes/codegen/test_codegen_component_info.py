@@ -88,6 +88,24 @@ def test_missing_view_function_raises_error(mock_importer):
         ComponentInfo(PROJECT_ROOT, ABS_PATH, "view", {}, False)
 
 
+def test_stream_must_be_an_async_generator(mock_importer):
+    _, mock_module_from_spec = mock_importer
+
+    async def stream():
+        yield None  # pragma: no cover
+
+    mock_module_from_spec.return_value = _create_mock_module("stream", stream)
+    info = ComponentInfo(PROJECT_ROOT, ABS_PATH, "stream", {}, False)
+    assert info.is_async
+
+    async def not_a_stream():
+        pass  # pragma: no cover
+
+    mock_module_from_spec.return_value = _create_mock_module("stream", not_a_stream)
+    with pytest.raises(RouteGenerationError, match="must be an async generator"):
+        ComponentInfo(PROJECT_ROOT, ABS_PATH, "stream", {}, False)
+
+
 def test_missing_layout_function_is_allowed(mock_importer):
     _, mock_module_from_spec = mock_importer
     mock_module_from_spec.return_value = _create_mock_module(None, None)
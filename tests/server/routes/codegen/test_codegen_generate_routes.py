@@ -92,3 +92,18 @@ def test_generate_routes_duplicate_dynamic_param_raises_error(tmp_path: Path):
     )
     with pytest.raises(RouteGenerationError, match="Duplicate dynamic parameter 'user_id'"):
         generate_routes(str(tmp_path))
+
+
+def test_generate_routes_defer_partial_without_partial_raises_error(tmp_path: Path):
+    create_test_project_structure(
+        tmp_path,
+        {
+            "app": {
+                "routes": {
+                    "route.py": "defer_partial = True\n\n\ndef view():\n    return None\n",
+                }
+            }
+        },
+    )
+    with pytest.raises(RouteGenerationError, match="sets 'defer_partial' but does not export"):
+        generate_routes(str(tmp_path))
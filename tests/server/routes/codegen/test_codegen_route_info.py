@@ -89,3 +89,27 @@ def test_to_python_action_only(mock_component_info):
 
     expected_python = '    "/submit": Route(\n        "/submit", [], action=action_comp, permissions=None\n    ),'
     assert info.to_python() == expected_python
+
+
+def test_to_python_with_stream(mock_component_info):
+    view = mock_component_info("view_comp")
+    stream = mock_component_info("stream_comp")
+    info = RouteInfo(path="/feed", view=view, is_dynamic=False, stream=stream)
+
+    expected_python = (
+        '    "/feed": Route(\n        "/feed", [view_comp], action=None, permissions=None, stream=stream_comp\n    ),'
+    )
+    assert info.to_python() == expected_python
+
+
+def test_to_python_with_deferred_partial(mock_component_info):
+    view = mock_component_info("view_comp")
+    partial = mock_component_info("partial_comp")
+    info = RouteInfo(path="/product", view=view, partial=partial, is_dynamic=False, defer_partial=True)
+
+    expected_python = (
+        '    "/product": Route(\n'
+        '        "/product", [view_comp, partial_comp], action=None, permissions=None, defer_partial=True\n'
+        "    ),"
+    )
+    assert info.to_python() == expected_python
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from nik.server.routes.patches import FragmentCache, compute_patches, parse_html, serialize
+
+OLD = '<fragment id="v_1"><ul><li>a</li><li class="x">b</li><li>c</li></ul><p>Total: 3</p></fragment>'
+
+
+def test_serialize_round_trips_the_rendered_html():
+    content = '<div id="a" hidden><input type="text" value="&quot;x&quot;"><script>1 < 2</script>a &amp; b</div>'
+    assert serialize(parse_html(content).children[0]) == content
+
+
+def test_identical_content_has_no_patches():
+    assert compute_patches(OLD, OLD) == []
+
+
+def test_text_and_attribute_changes():
+    new = OLD.replace("Total: 3", "Total: 4").replace('class="x"', 'class="y" hidden')
+    assert compute_patches(OLD, new) == [
+        ["attrs", [0, 1], "li", {"class": "y", "hidden": None}, []],
+        ["text", [1, 0], "#text", "Total: 4"],
+    ]
+
+
+def test_inserted_and_removed_children():
+    inserted = OLD.replace("<li>c</li>", "<li>c</li><li>d</li>")
+    assert compute_patches(OLD, inserted) == [["insert", [0], "ul", 3, "<li>d</li>"]]
+
+    removed = OLD.replace('<li class="x">b</li>', "")
+    assert compute_patches(OLD, removed) == [["remove", [0, 1], "li"]]
+
+
+def test_changed_tags_are_replaced():
+    new = OLD.replace("<p>Total: 3</p>", "<span>Total: 3</span>")
+    assert compute_patches(OLD, new) == [["replace", [1], "p", "<span>Total: 3</span>"]]
+
+
+def test_patches_larger_than_the_content_are_not_sent():
+    old = '<fragment id="v_1"><i>a</i><i>b</i></fragment>'
+    assert compute_patches(old, old.replace("i>", "b>")) is None
+    assert compute_patches('<fragment id="v_1"></fragment>', '<fragment id="v_2"></fragment><p></p>') is None
+
+
+def test_fragment_cache_is_bounded():
+    cache = FragmentCache(maxsize=2)
+    first = cache.add("c_1", "v_1", "<fragment>1</fragment>")
+    second = cache.add("c_1", "v_1", "<fragment>2</fragment>")
+    assert first != second
+
+    cache.get("c_1", "v_1", first)
+    cache.add("c_1", "v_2", "<fragment>3</fragment>")
+
+    assert cache.get("c_1", "v_1", first) == "<fragment>1</fragment>"
+    assert cache.get("c_1", "v_1", second) is None
+
+
+def test_fragment_cache_keeps_the_fragments_of_interleaved_clients():
+    cache = FragmentCache(maxsize=2, maxclients=3)
+    versions = {}
+    for render in range(10):
+        for client in ("c_1", "c_2", "c_3"):
+            versions[client] = cache.add(client, "v_1", f"<fragment>{client} {render}</fragment>")
+
+    # Many more renders than a single cache of the same size holds, the latest render of every client is kept.
+    for client, version in versions.items():
+        assert cache.get(client, "v_1", version) == f"<fragment>{client} 9</fragment>"
+    assert cache.get("c_2", "v_1", versions["c_1"]) is None
+
+    cache.add("c_4", "v_1", "<fragment>4</fragment>")
+    assert cache.get("c_1", "v_1", versions["c_1"]) is None
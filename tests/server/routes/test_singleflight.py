@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from nik.server.routes.singleflight import SingleFlight
+
+
+async def test_concurrent_calls_with_the_same_key_share_the_result():
+    flight: SingleFlight[int] = SingleFlight()
+    started = 0
+
+    async def render():
+        nonlocal started
+        started += 1
+        number = started
+        await asyncio.sleep(0.01)
+        return number
+
+    results = await asyncio.gather(flight.run("a", render), flight.run("a", render), flight.run("b", render))
+
+    assert results == [1, 1, 2]
+    assert (flight.calls, flight.collapsed, flight.in_flight) == (2, 1, 0)
+
+    assert await flight.run("a", render) == 3
+
+
+async def test_exceptions_are_raised_to_every_caller():
+    flight: SingleFlight[int] = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    results = await asyncio.gather(flight.run("a", fail), flight.run("a", fail), return_exceptions=True)
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert flight.in_flight == 0
+
+
+async def test_cancelled_follower_does_not_cancel_the_call():
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def render():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    leader = asyncio.create_task(flight.run("a", render))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.run("a", render))
+    await asyncio.sleep(0)
+    follower.cancel()
+
+    assert await leader == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+
+
+async def test_cancelled_leader_does_not_cancel_the_followers():
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def render():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    leader = asyncio.create_task(flight.run("a", render))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.run("a", render))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert (flight.calls, flight.collapsed, flight.in_flight) == (1, 1, 0)
+
+
+async def test_call_is_cancelled_once_every_caller_is_gone():
+    flight: SingleFlight[str] = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def render():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "done"
+
+    callers = [asyncio.create_task(flight.run("a", render)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.in_flight == 0
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, cast
+
+from nik.server.protocol import WEBSOCKET_PATH
+from nik.server.types import Scope
+from tests.utils import create_app
+
+
+async def run_socket(
+    path: str,
+    messages: list[dict[str, Any]],
+    replies_count: int | None = None,
+    origin: str = "http://nik.io",
+    allowed_origins: frozenset[str] = frozenset(),
+) -> list[dict[str, Any]]:
+    app = create_app("test")
+    app.websocket = True
+    app.websocket_origins = allowed_origins
+
+    received: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+    sent: list[dict[str, Any]] = []
+    replies = asyncio.Event()
+
+    for message in [{"type": "websocket.connect"}, *messages]:
+        received.put_nowait(message)
+
+    async def receive():
+        if received.empty():
+            # Disconnect once every message has a reply.
+            await replies.wait()
+            return {"type": "websocket.disconnect", "code": 1000}
+        return await received.get()
+
+    async def send(message: dict[str, Any]):
+        sent.append(message)
+        if sum(m["type"] == "websocket.send" for m in sent) == (replies_count or len(messages)):
+            replies.set()
+
+    headers = [(b"host", b"nik.io"), (b"origin", origin.encode())]
+    scope = {"type": "websocket", "path": path, "headers": headers, "query_string": b""}
+    await asyncio.wait_for(app(cast(Scope, scope), receive, send), timeout=5)  # type: ignore[arg-type]
+    return sent
+
+
+def text_message(item: dict[str, Any]) -> dict[str, Any]:
+    return {"type": "websocket.receive", "text": json.dumps(item)}
+
+
+async def test_websocket_runs_the_requests():
+    sent = await run_socket(
+        WEBSOCKET_PATH,
+        [
+            text_message({"id": 1, "path": "/rows?cursor=2"}),
+            text_message({"id": 2, "path": "/counter", "method": "post", "headers": {"x-nik-request": "1"}}),
+            text_message({"id": 3, "path": "/not-a-page"}),
+        ],
+    )
+
+    assert sent[0] == {"type": "websocket.accept"}
+    replies = {reply["id"]: reply for reply in (json.loads(m["text"]) for m in sent[1:])}
+    assert [replies[i]["status"] for i in (1, 2, 3)] == [200, 200, 404]
+    assert "<li>Row 2</li>" in replies[1]["body"]
+    assert "refreshView" in replies[2]["body"]
+
+
+async def test_websocket_falls_back_for_requests_setting_cookies():
+    sent = await run_socket(
+        WEBSOCKET_PATH,
+        [text_message({"id": 1, "path": "/doctors/login", "method": "post", "body": "{}"})],
+    )
+
+    assert json.loads(sent[1]["text"]) == {"id": 1, "fallback": True}
+
+
+async def test_websocket_other_path_is_closed():
+    sent = await run_socket("/other", [])
+
+    assert sent == [{"type": "websocket.close", "code": 1008}]
+
+
+async def test_websocket_from_another_origin_is_closed():
+    message = text_message({"id": 1, "path": "/rows"})
+
+    assert await run_socket(WEBSOCKET_PATH, [message], origin="https://evil.example") == [
+        {"type": "websocket.close", "code": 1008}
+    ]
+    assert await run_socket(WEBSOCKET_PATH, [message], origin="") == [{"type": "websocket.close", "code": 1008}]
+
+    sent = await run_socket(
+        WEBSOCKET_PATH, [message], origin="https://admin.nik.io", allowed_origins=frozenset({"https://admin.nik.io"})
+    )
+    assert sent[0] == {"type": "websocket.accept"}
+    assert json.loads(sent[1]["text"])["status"] == 200
+
+
+async def test_websocket_cancelled_request_gets_no_reply():
+    sent = await run_socket(
+        WEBSOCKET_PATH,
+        [
+            text_message({"id": 1, "path": "/blocking"}),
+            text_message({"id": 1, "cancel": True}),
+            text_message({"id": 2, "path": "/rows"}),
+        ],
+        replies_count=1,
+    )
+
+    assert [json.loads(m["text"])["id"] for m in sent[1:]] == [2]
@@ -91,5 +91,8 @@ def test_copy_js_client(monkeypatch, tmp_path: Path):
     cli_path = tmp_path / "public" / "client.js"
 
     assert not cli_path.is_file()
-    create_app("test", project_root=tmp_path)
+    app = create_app("test", project_root=tmp_path)
     assert cli_path.is_file()
+    assert app.client_src.startswith("/public/client.")
+    assert (tmp_path / app.client_src.lstrip("/")).is_file()
+    assert (tmp_path / (app.client_src.lstrip("/") + ".gz")).is_file()
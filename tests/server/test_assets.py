@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+from nik.server.assets import build_client, minify_js, parse_accept_encoding
+
+
+def test_minify_js_removes_comments_and_indentation():
+    source = """
+    /**
+     * Docs
+     */
+    function f(a, b) {
+      // comment
+      return a / b; /* inline */
+    }
+    """
+    assert minify_js(source) == "function f(a, b) {\nreturn a / b;\n}\n"
+
+
+def test_minify_js_keeps_literals():
+    source = """
+    const url = "http://localhost"; // comment
+    const quote = /["'\\/]+/g.test('/* not a comment */');
+    const text = `line
+      ${url} // kept`;
+    if (!/^a/.test(url)) {}
+    """
+    assert minify_js(source) == (
+        'const url = "http://localhost";\n'
+        "const quote = /[\"'\\/]+/g.test('/* not a comment */');\n"
+        "const text = `line\n      ${url} // kept`;\n"
+        "if (!/^a/.test(url)) {}\n"
+    )
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, deflate;q=0.5, zstd;q=0, br") == {"gzip", "deflate", "br"}
+    assert parse_accept_encoding(None) == set()
+
+
+def test_build_client_replaces_previous_builds(tmp_path: Path):
+    (tmp_path / "client.0123456789abcdef.js").write_text("old")
+    (tmp_path / "client.0123456789abcdef.js.gz").write_text("old")
+    (tmp_path / "other.js").write_text("kept")
+
+    src = build_client(str(tmp_path))
+
+    path = tmp_path / src.removeprefix("/public/")
+    assert not (tmp_path / "client.0123456789abcdef.js").exists()
+    assert not (tmp_path / "client.0123456789abcdef.js.gz").exists()
+    assert (tmp_path / "other.js").is_file()
+    assert gzip.decompress((tmp_path / f"{path.name}.gz").read_bytes()) == path.read_bytes()
+    assert build_client(str(tmp_path)) == src
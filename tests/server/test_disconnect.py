@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, cast
+
+from nik.server.disconnect import DisconnectWatcher
+from nik.server.types import Scope
+from nik.utils.asyncio import raise_if_cancelled, run_sync_in_thread
+from tests.utils import create_app
+
+
+def client_messages(*messages: dict[str, Any], disconnect_after: float | None = None):
+    queue = list(messages)
+
+    async def receive():
+        if queue:
+            return queue.pop(0)
+        await asyncio.sleep(disconnect_after if disconnect_after is not None else 10)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def test_watcher_returns_the_result_and_passes_the_messages():
+    watcher = DisconnectWatcher(client_messages({"type": "http.request", "body": b"{}", "more_body": False}))
+
+    async def handler():
+        return await watcher.receive()
+
+    assert await watcher.run(handler()) == {"type": "http.request", "body": b"{}", "more_body": False}
+    watcher.close()
+
+
+async def test_watcher_cancels_the_handler_on_disconnect():
+    watcher = DisconnectWatcher(client_messages(disconnect_after=0.01))
+    cancelled = asyncio.Event()
+
+    async def handler():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    assert await watcher.run(handler()) is None
+    assert cancelled.is_set()
+    assert await watcher.receive() == {"type": "http.disconnect"}
+
+
+async def test_cancelled_sync_call_can_stop_early():
+    started, steps = threading.Event(), []
+
+    def work():
+        started.set()
+        for step in range(50):
+            raise_if_cancelled()
+            steps.append(step)
+            time.sleep(0.01)
+
+    task = asyncio.ensure_future(run_sync_in_thread(work))
+    await asyncio.to_thread(started.wait)
+    task.cancel()
+    await asyncio.sleep(0.1)
+
+    assert 0 < len(steps) < 50
+
+
+async def test_request_is_cancelled_when_the_client_disconnects():
+    app = create_app("test")
+    sent: list[dict[str, Any]] = []
+
+    async def send(message: dict[str, Any]):
+        sent.append(message)  # pragma: no cover
+
+    scope = {"type": "http", "method": "GET", "path": "/blocking", "query_string": b"", "headers": []}
+    receive = client_messages({"type": "http.request", "body": b"", "more_body": False}, disconnect_after=0.05)
+
+    start = time.perf_counter()
+    await app(cast(Scope, scope), receive, send)  # type: ignore[arg-type]
+
+    # The blocking view takes 0.25s, the response is abandoned as soon as the client is gone.
+    assert time.perf_counter() - start < 0.2
+    assert sent == []
+
+
+async def test_disconnect_does_not_cancel_a_render_shared_with_another_request():
+    app = create_app("test")
+    sent: dict[str, list[dict[str, Any]]] = {"gone": [], "waiting": []}
+
+    def sender(name: str):
+        async def send(message: dict[str, Any]):
+            sent[name].append(message)
+
+        return send
+
+    scope = {"type": "http", "method": "GET", "path": "/blocking", "query_string": b"", "headers": []}
+    request = {"type": "http.request", "body": b"", "more_body": False}
+
+    await asyncio.gather(
+        app(cast(Scope, scope), client_messages(request, disconnect_after=0.05), sender("gone")),  # type: ignore[arg-type]
+        app(cast(Scope, scope), client_messages(request), sender("waiting")),  # type: ignore[arg-type]
+    )
+
+    assert sent["gone"] == []
+    assert sent["waiting"][0]["status"] == 200
+    assert (app.renders.calls, app.renders.collapsed) == (1, 1)
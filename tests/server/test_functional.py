@@ -2,8 +2,14 @@ from __future__ import annotations
 
 import asyncio
 import re
+import time
+from unittest.mock import ANY
 
+import httpx
 import pytest
+from nik.server.routes.patches import FragmentCache
+from nik.server.routes.renderer import ActionRenderer
+from nik.server.routes.router import Router
 from tests.utils import create_app, get_secure_cookie_obj
 
 
@@ -176,6 +182,25 @@ async def test_valid_nik_request_returning_partial_json_response(client):
     assert re.search(r'{"replaces":"v_.*?","view":".*?","actions":{"v_.*?":null}}', response.text)
 
 
+@pytest.mark.parametrize("app", ["doctor"], indirect=True)
+async def test_valid_nik_request_returning_framed_response(client):
+    add_cookies_to_client(client, "doctor")
+    response = await client.get(
+        "/doctors/patients/1/appointments/2",
+        headers={
+            "x-nik-request": "1",
+            "x-nik-previous-path": "/doctors/patients/1",
+            "x-nik-response-format": "framed",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-nik-framed"
+    header, view = response.text.split("\n", 1)
+    assert re.fullmatch(r'{"replaces":"v_.*?","actions":{"v_.*?":null}}', header)
+    assert re.fullmatch(r'<fragment id="v_.*?">.*</fragment>', view)
+
+
 async def test_static_file_in_public_folder(client):
     response = await client.get(
         "/public/llm.txt",
@@ -245,3 +270,259 @@ async def test_sync_action_runs_in_thread_and_collects_actions(client):
     )
     assert resp.status_code == 200
     assert "refreshView" in resp.text
+
+
+async def test_virtual_list_renders_the_first_window(client):
+    response = await client.get("/rows")
+
+    assert response.status_code == 200
+    assert '<ul id="rows"><p>Rows</p><li>Row 0</li><li>Row 1</li></ul>' in response.text
+    assert '["observeWindow", ["rows", "sv_rows_' in response.text
+
+
+async def test_virtual_list_window_request_returns_the_next_items(client):
+    response = await client.get("/rows")
+    key = re.search(r'"observeWindow", \["rows", "(sv_rows_.*?)"', response.text).group(1)  # type: ignore[union-attr]
+
+    response = await client.get(
+        "/rows?cursor=2",
+        headers={"x-nik-request": "1", "x-nik-request-type": "window", "x-nik-window": key},
+    )
+    assert response.status_code == 200
+    actions = list(response.json()["actions"].values())
+    assert actions == [
+        [
+            ["updateState", [key, None, [{"name": "Row 2"}, {"name": "Row 3"}], "extend"]],
+            ["observeWindow", ["rows", key, 4, None, "cursor"]],
+        ]
+    ]
+
+    response = await client.get(
+        "/rows?cursor=4",
+        headers={"x-nik-request": "1", "x-nik-request-type": "window", "x-nik-window": key},
+    )
+    actions = list(response.json()["actions"].values())
+    assert actions[0][-1] == ["observeWindow", ["rows", key, None, None, "cursor"]]
+
+
+async def test_rendering_is_byte_stable(client):
+    first = await client.get("/rows")
+    second = await client.get("/rows")
+
+    assert first.content == second.content
+
+
+@pytest.mark.parametrize("app", ["doctor"], indirect=True)
+async def test_refresh_with_a_known_fragment_version_returns_patches(app, client):
+    add_cookies_to_client(client, "doctor")
+    headers = {
+        "x-nik-request": "1",
+        "x-nik-previous-path": "/doctors/patients/1",
+        "x-nik-fragment-versions": "",
+    }
+    response = await client.get("/doctors/patients/1", headers=headers)
+    data = response.json()
+    assert data["view"] and data["versions"] == {data["replaces"]: ANY}
+
+    fragment_id = data["replaces"]
+    client_id = client.cookies["nik_client"]
+    stale = app.fragments.add(
+        client_id, fragment_id, f'<fragment id="{fragment_id}"><div>Patient ID=2</div></fragment>'
+    )
+    headers["x-nik-fragment-versions"] = f"{fragment_id}={stale}"
+    response = await client.get("/doctors/patients/1", headers=headers)
+    data = response.json()
+
+    assert data["view"] == ""
+    assert data["patches"] == [["text", [0, 0], "#text", "Patient ID=1"]]
+
+    headers["x-nik-fragment-versions"] = f"{fragment_id}=unknown"
+    response = await client.get("/doctors/patients/1", headers=headers)
+    assert "patches" not in response.json()
+
+
+@pytest.mark.parametrize("app", ["doctor"], indirect=True)
+async def test_fragments_of_interleaved_clients_are_cached_per_client(app):
+    app.fragments = FragmentCache(maxsize=1)
+    transport = httpx.ASGITransport(app=app)
+    clients = {}
+    for patient_id in ("1", "2", "3"):
+        clients[patient_id] = httpx.AsyncClient(transport=transport, base_url="http://nik.io")
+        add_cookies_to_client(clients[patient_id], "doctor")
+
+    def headers(path: str, versions: str) -> dict[str, str]:
+        return {"x-nik-request": "1", "x-nik-previous-path": path, "x-nik-fragment-versions": versions}
+
+    versions = {}
+    for patient_id, client in clients.items():
+        path = f"/doctors/patients/{patient_id}"
+        data = (await client.get(path, headers=headers(path, ""))).json()
+        versions[patient_id] = f"{data['replaces']}={data['versions'][data['replaces']]}"
+
+    # Each client renders its own patient, the other clients' renders do not evict its fragment.
+    for patient_id, client in clients.items():
+        path = f"/doctors/patients/{patient_id}"
+        data = (await client.get(path, headers=headers(path, versions[patient_id]))).json()
+        assert data["view"] == ""
+        assert data["patches"] == []
+
+    assert len({client.cookies["nik_client"] for client in clients.values()}) == 3
+    for client in clients.values():
+        await client.aclose()
+
+
+async def test_action_returns_the_refreshed_view_inline(client):
+    response = await client.post(
+        "/counter",
+        headers={"x-nik-request": "1", "x-nik-request-type": "form", "x-nik-refresh-path": "/counter"},
+    )
+    data = response.json()
+
+    assert re.fullmatch(r'<fragment id="v_.*?"><div>Count=1</div></fragment>', data["view"])
+    assert data["replaces"] in data["actions"]
+    assert "refreshView" not in response.text
+
+
+async def test_partial_refresh_of_a_route_without_a_partial_falls_back_to_the_client(client):
+    # The action of /blocking refreshes the partial of its route, the last view of which is not a partial.
+    response = await client.post(
+        "/blocking",
+        headers={"x-nik-request": "1", "x-nik-request-type": "form", "x-nik-refresh-path": "/blocking"},
+    )
+
+    assert "view" not in response.json()
+    assert "replaces" not in response.json()
+    assert '["refreshView",[true]]' in response.text
+
+
+@pytest.mark.parametrize(
+    "path, partial, replaceable",
+    [
+        ("/counter", False, True),
+        ("/counter", True, False),
+        ("/reviews", False, True),
+        ("/reviews", True, True),
+    ],
+)
+def test_refresh_is_inlined_only_when_the_client_has_a_view_to_replace(app, path, partial, replaceable):
+    route = Router(app.routes).match(path)
+
+    assert route is not None
+    assert ActionRenderer._can_replace_view(route, partial) is replaceable
+
+
+async def test_batch_request_runs_the_sub_requests_concurrently(client):
+    start = time.perf_counter()
+    response = await client.post(
+        "/",
+        headers={"x-nik-request": "1", "x-nik-request-type": "batch", "content-type": "application/json"},
+        json={
+            "requests": [
+                {"path": "/blocking"},
+                {"path": "/blocking"},
+                {"path": "/rows?cursor=2"},
+                {"path": "/counter", "method": "post", "headers": {"x-nik-request": "1"}},
+                {"path": "/not-a-page"},
+            ]
+        },
+    )
+
+    # Both blocking views take 0.25s, they run at the same time.
+    assert time.perf_counter() - start < 0.45
+    assert response.status_code == 200
+    responses = response.json()["responses"]
+    assert [r["status"] for r in responses] == [200, 200, 200, 200, 404]
+    assert "Blocking sync view" in responses[0]["body"]
+    assert responses[0]["headers"]["content-type"] == "text/html; charset=utf-8"
+    assert "<li>Row 2</li>" in responses[2]["body"]
+    assert "refreshView" in responses[3]["body"]
+
+
+async def test_batch_request_can_not_be_nested(client):
+    headers = {"x-nik-request": "1", "x-nik-request-type": "batch", "content-type": "application/json"}
+    response = await client.post(
+        "/", headers=headers, json={"requests": [{"path": "/", "method": "post", "headers": headers}]}
+    )
+
+    assert response.status_code == 400
+
+
+async def test_identical_concurrent_public_renders_are_collapsed(app, client):
+    first, second = await asyncio.gather(client.get("/blocking"), client.get("/blocking"))
+
+    assert first.content == second.content
+    assert (app.renders.calls, app.renders.collapsed) == (1, 1)
+
+    await client.get("/blocking?page=2")
+    assert (app.renders.calls, app.renders.collapsed) == (2, 1)
+
+
+async def test_view_with_a_stream_subscribes_to_it(client):
+    response = await client.get("/feed?name=alice")
+
+    assert response.status_code == 200
+    assert re.search(r'\["subscribeStream", \["v_[^"]+", "/feed\?name=alice"\]\]', response.text)
+
+    response = await client.get("/feed", headers={"x-nik-request": "1", "x-nik-previous-path": "/"})
+    assert '"subscribeStream"' in response.text
+
+
+async def test_navigation_response_cache_headers(client):
+    headers = {"x-nik-request": "1", "x-nik-previous-path": "/"}
+    response = await client.get("/cached", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, max-age=60"
+    assert "x-nik-previous-path" in response.headers["vary"]
+    assert 'data-prefetch=\\"hover\\"' in response.text
+    etag = response.headers["etag"]
+
+    response = await client.get("/cached", headers={**headers, "if-none-match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = await client.get("/rows", headers={**headers, "if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+
+    # Full page loads are not cached.
+    response = await client.get("/cached")
+    assert "etag" not in response.headers
+
+
+async def test_island_renders_a_placeholder_and_loads_the_partial_on_request(client):
+    response = await client.get("/reviews")
+
+    assert response.status_code == 200
+    assert "Loading reviews..." in response.text
+    assert "Great" not in response.text
+    match = re.search(r'<fragment id="(v_[^"]+)"><p>Loading reviews...</p></fragment>', response.text)
+    assert match
+    fragment_id = match.group(1)
+    assert f'["loadIsland", ["{fragment_id}", "idle"]]' in response.text
+
+    response = await client.get(
+        "/reviews",
+        headers={"x-nik-request": "1", "x-nik-request-type": "partial", "x-nik-previous-path": "/reviews"},
+    )
+    assert response.status_code == 200
+    json = response.json()
+    assert json["replaces"] == fragment_id
+    assert json["view"] == f'<fragment id="{fragment_id}"><ul><li>Great</li><li>Fine</li></ul></fragment>'
+
+
+async def test_partial_without_island_is_rendered_with_the_page(client):
+    response = await client.get("/reviews?island=off")
+
+    assert response.status_code == 200
+    assert "<ul><li>Great</li><li>Fine</li></ul></fragment>" in response.text
+    assert "loadIsland" not in response.text
+
+
+async def test_partial_of_a_route_without_defer_partial_is_rendered_before_the_view(client):
+    response = await client.get("/titled")
+
+    assert response.status_code == 200
+    assert "<title>View</title>" in response.text
+    assert "<p>Partial</p></fragment>" in response.text
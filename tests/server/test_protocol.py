@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+from nik.server.protocol import encode_actions, get_actions_version
+from tests.utils import create_app
+
+
+@pytest.fixture
+def app():
+    return create_app("test")
+
+
+ACTIONS = {
+    "v_view": [
+        ["registerObservable", ["sv_count", 0]],
+        ["subscribeObservable", ["sv_count", None, "toggleShow", "el_1"]],
+        ["customAction", ["~tilde", "sv_count"]],
+    ],
+    "v_layout": [
+        ["registerObservable", ["sv_count", 0], ["sv_other", 1]],
+        ["updateState", ["sv_count", None, 1, None], ["sv_count", None, 1, None]],
+    ],
+    "v_root": None,
+}
+
+
+def test_encode_actions_legacy_format_is_unchanged():
+    encoded = encode_actions(ACTIONS, version=1)
+
+    assert list(encoded) == list(ACTIONS)
+    assert encoded == ACTIONS
+
+
+def test_encode_actions_compact_format():
+    encoded = encode_actions(ACTIONS, version=2)
+
+    # The outermost view keeps the shared registration and its actions run first.
+    assert list(encoded["a"]) == ["v_root", "v_layout", "v_view"]
+    assert encoded == {
+        "v": 2,
+        "t": ["sv_count"],
+        "a": {
+            "v_view": [
+                [1, ["~0", None, "toggleShow", "el_1"]],
+                ["customAction", ["~~tilde", "~0"]],
+            ],
+            "v_layout": [
+                [0, ["~0", 0], ["sv_other", 1]],
+                [4, ["~0", None, 1, None], ["~0", None, 1, None]],
+            ],
+            "v_root": None,
+        },
+    }
+
+
+@pytest.mark.parametrize(("value", "expected"), [(None, 1), ("2", 2), ("1", 1), ("3", 1), ("x", 1)])
+def test_get_actions_version(value, expected):
+    assert get_actions_version(value) == expected
+
+
+async def test_actions_version_is_negotiated(client):
+    headers = {"x-nik-request": "1", "x-nik-request-type": "window", "x-nik-window": "sv_missing"}
+
+    response = await client.get("/rows", headers=headers)
+    assert "observeWindow" in response.text
+
+    response = await client.get("/rows", headers={**headers, "x-nik-actions-version": "2"})
+    assert response.json()["actions"]["v"] == 2
+    assert "observeWindow" not in response.text
@@ -36,6 +36,12 @@ def test_json_response():
     assert response.media_type == "application/json"
 
 
+def test_framed_response():
+    response = Response.framed({"replaces": "v_1", "actions": None}, '<div class="a">\n</div>')
+    assert response.body == b'{"replaces":"v_1","actions":null}\n<div class="a">\n</div>'
+    assert response.media_type == "application/x-nik-framed"
+
+
 def test_json_none_response():
     response = Response.json(None)
     assert json.loads(response.body) is None
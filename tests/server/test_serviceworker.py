@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from nik.server.protocol import SERVICE_WORKER_PATH
+from nik.server.routes.handler import RouteHandler
+from nik.server.serviceworker import build_service_worker
+from nik.server.types import Scope
+from tests.utils import FIXTURES_DIR, create_app, get_header_list
+
+
+@pytest.fixture(autouse=True)
+def manage_sys_path(monkeypatch):
+    monkeypatch.syspath_prepend(FIXTURES_DIR)
+
+
+def get_config(worker: bytes) -> dict[str, Any]:
+    first_line = worker.decode().split("\n", 1)[0]
+    return json.loads(first_line.removeprefix("const NIK_WORKER = ").removesuffix(";"))
+
+
+def test_service_worker_caches_the_public_routes_and_hashed_assets(tmp_path: Path):
+    app = create_app("test")
+    (tmp_path / "client.0123456789abcdef.js").write_text("client")
+    (tmp_path / "client.0123456789abcdef.js.gz").write_text("gzipped")
+    (tmp_path / "logo.svg").write_text("<svg></svg>")
+
+    config = get_config(build_service_worker(app.routes, str(tmp_path)))
+
+    assert config["precache"] == ["/public/client.0123456789abcdef.js"]
+    assert "^\\/rows$" in config["routes"]
+    # Routes with permissions are not cached.
+    assert not any("patients" in route for route in config["routes"])
+
+
+def test_service_worker_version_changes_with_the_public_files(tmp_path: Path):
+    app = create_app("test")
+    (tmp_path / "logo.svg").write_text("<svg></svg>")
+    version = get_config(build_service_worker(app.routes, str(tmp_path)))["version"]
+
+    assert get_config(build_service_worker(app.routes, str(tmp_path)))["version"] == version
+    (tmp_path / "logo.svg").write_text("<svg><g></g></svg>")
+    assert get_config(build_service_worker(app.routes, str(tmp_path)))["version"] != version
+
+
+async def test_service_worker_is_served_and_registered():
+    app = create_app("test")
+    app.service_worker = b"const NIK_WORKER = {};"
+
+    async def receive() -> dict[str, Any]:
+        await asyncio.sleep(10)
+        return {"type": "http.disconnect"}  # pragma: no cover
+
+    def scope(path: str) -> Scope:
+        return cast(Scope, {"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""})
+
+    response = await RouteHandler(app, scope(SERVICE_WORKER_PATH), receive).run()
+    assert response.body == b"const NIK_WORKER = {};"
+    assert get_header_list(response.raw_headers, "service-worker-allowed") == [b"/"]
+    assert get_header_list(response.raw_headers, "cache-control") == [b"no-cache"]
+
+    response = await RouteHandler(app, scope("/rows"), receive).run()
+    assert f'window.__nik__.registerServiceWorker("{SERVICE_WORKER_PATH}")' in response.body.decode()
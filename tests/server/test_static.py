@@ -52,3 +52,29 @@ async def test_serve_static_file_unknown_mimetype(project_with_public_dir: str):
     assert response.status == 200
     assert response.body == b"some data"
     assert get_header_list(response.raw_headers, "content-type") == [b"application/octet-stream"]
+
+
+async def test_serve_static_file_precompressed(project_with_public_dir: str):
+    public_dir = Path(project_with_public_dir) / "public"
+    (public_dir / "client.0123456789abcdef.js").write_text("let a = 1;")
+    (public_dir / "client.0123456789abcdef.js.gz").write_bytes(b"gzipped")
+
+    response = await serve_static_file(
+        project_with_public_dir, "/public/client.0123456789abcdef.js", accept_encoding="gzip, deflate, br"
+    )
+    assert response.body == b"gzipped"
+    assert get_header_list(response.raw_headers, "content-encoding") == [b"gzip"]
+    assert get_header_list(response.raw_headers, "vary") == [b"accept-encoding"]
+    assert get_header_list(response.raw_headers, "cache-control") == [b"public, max-age=31536000, immutable"]
+
+    response = await serve_static_file(
+        project_with_public_dir, "/public/client.0123456789abcdef.js", accept_encoding="gzip;q=0"
+    )
+    assert response.body == b"let a = 1;"
+    assert get_header_list(response.raw_headers, "content-encoding") == []
+
+
+async def test_serve_static_file_unversioned_is_not_immutable(project_with_public_dir: str):
+    response = await serve_static_file(project_with_public_dir, "/public/test.txt", accept_encoding="gzip")
+    assert get_header_list(response.raw_headers, "cache-control") == []
+    assert get_header_list(response.raw_headers, "content-encoding") == []
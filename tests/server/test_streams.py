@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+from typing import Any, cast
+
+from nik.server.streams import StreamEvent, Topic
+from nik.server.types import Scope
+from nik.views.actions import UpdateState
+from nik.views.data import State
+from tests.utils import create_app
+
+
+def event_actions(data: bytes) -> Any:
+    assert data.startswith(b"data: ") and data.endswith(b"\n\n")
+    return json.loads(data[len(b"data: ") :])
+
+
+async def test_topic_sends_the_same_encoded_event_to_every_subscriber():
+    topic = Topic()
+    first, second = topic.subscribe(), topic.subscribe()
+    pending = [asyncio.ensure_future(anext(first)), asyncio.ensure_future(anext(second))]
+    await asyncio.sleep(0)
+    assert topic.subscribers == 2
+
+    topic.publish(UpdateState(State("messages", []), "hello", "append"))
+    events = await asyncio.gather(*pending)
+
+    assert events[0] is events[1]
+    assert event_actions(events[0].data) == [["updateState", [State("messages", []).key, None, "hello", "append"]]]
+
+    await first.aclose()
+    await second.aclose()
+    assert topic.subscribers == 0
+
+
+async def test_topic_closes_lagging_subscribers():
+    topic = Topic(max_lag=2)
+    subscriber = topic.subscribe()
+    pending = asyncio.ensure_future(anext(subscriber))
+    await asyncio.sleep(0)
+
+    for value in range(4):
+        topic.publish(UpdateState(State("count", 0), value))
+
+    assert topic.subscribers == 0
+    received = [await pending, await anext(subscriber)]
+    assert all(isinstance(event, StreamEvent) for event in received)
+    assert await anext(subscriber, None) is None
+
+
+async def test_stream_route_sends_server_sent_events():
+    app = create_app("test")
+    feed = importlib.import_module("app.routes.feed.route").FEED
+
+    disconnected = asyncio.Event()
+    chunks: list[bytes] = []
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]):
+        if message["type"] == "http.response.start":
+            assert (b"content-type", b"text/event-stream; charset=utf-8") in message["headers"]
+        elif message["body"]:
+            chunks.append(message["body"])
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/feed",
+        "query_string": b"name=alice",
+        "headers": [(b"accept", b"text/event-stream")],
+    }
+    task = asyncio.ensure_future(app(cast(Scope, scope), receive, send))  # type: ignore[arg-type]
+    while feed.subscribers == 0:
+        await asyncio.sleep(0.01)
+
+    feed.publish(UpdateState(State("messages", []), "hello", "append"))
+    while len(chunks) < 2:
+        await asyncio.sleep(0.01)
+    disconnected.set()
+    await asyncio.wait_for(task, timeout=1)
+
+    key = State("messages", []).key
+    assert event_actions(chunks[0]) == [["updateState", [key, None, "Hello alice", "append"]]]
+    assert event_actions(chunks[1]) == [["updateState", [key, None, "hello", "append"]]]
+    assert feed.subscribers == 0
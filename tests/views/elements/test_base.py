@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+from nik.utils.string import to_json
+from nik.views.callbacks import ConsoleLog
+from nik.views.context import ViewContext
+from nik.views.data import Id, State, When
+from nik.views.elements import (
+    A,
+    Div,
+    Footer,
+    ForEach,
+    HtmlElement,
+    Island,
+    Li,
+    Nav,
+    P,
+    Static,
+    Ul,
+    static_component,
+)
+from nik.views.elements.base import DeferredFragment
+
+
+def test_static_renders_once():
+    static = Static(Footer(P("Nik")))
+
+    with patch.object(HtmlElement, "render", autospec=True, side_effect=HtmlElement.render) as render:
+        assert static.render() == "<footer><p>Nik</p></footer>"
+        calls = render.call_count
+        assert static.render() == "<footer><p>Nik</p></footer>"
+        assert render.call_count == calls
+
+
+def test_static_as_child():
+    footer = Static(Footer("Nik"))
+    assert Div(footer).render() == "<div><footer>Nik</footer></div>"
+    assert Div(footer).render() == "<div><footer>Nik</footer></div>"
+
+
+def test_static_rejects_reactive_subtree():
+    with ViewContext():
+        element = Nav(Div("Menu", show=When(State("menu_open", False))))
+
+    with pytest.raises(ValueError):
+        Static(element)
+
+
+def test_static_component_is_cached_by_arguments():
+    calls = []
+
+    @static_component
+    def footer(year: int):
+        calls.append(year)
+        return Footer(P(f"© {year}"))
+
+    with ViewContext() as ctx:
+        first = footer(2025)
+        second = footer(2025)
+        third = footer(year=2026)
+
+    assert first is second
+    assert first.render() == "<footer><p>© 2025</p></footer>"
+    assert third.render() == "<footer><p>© 2026</p></footer>"
+    assert calls == [2025, 2026]
+    assert ctx.get_actions() is None
+
+
+def test_static_component_with_reactive_content():
+    calls = []
+
+    @static_component(maxsize=1)
+    def nav():
+        calls.append(1)
+        return Nav(A("Home", href="/", active_class="active"))
+
+    with ViewContext() as ctx:
+        element = nav()
+        nav()
+
+    assert not isinstance(element, Static)
+    assert len(calls) == 2
+    assert ctx.get_actions() is not None
+
+
+def test_for_each_with_compiled_item_template():
+    items = State("users", [{"name": "Nik"}, {"name": "<Web>"}])
+    with ViewContext():
+        element = Ul(ForEach(items, lambda item: Li(item["name"]), parent=Id("users")), id="users")
+
+    # Values are escaped like the client fills the item template.
+    assert element.render() == '<ul id="users"><li>Nik</li><li>&lt;Web&gt;</li></ul>'
+
+
+def test_for_each_with_scalar_items():
+    with ViewContext():
+        element = Ul(ForEach(State("names", ["alice", "bob"]), lambda name: Li(name)))
+
+    assert element.render() == "<ul><li>alice</li><li>bob</li></ul>"
+
+
+def test_for_each_with_indexed_items():
+    with ViewContext():
+        element = Ul(ForEach(State("pairs", [("a", 1), ("b", 2)]), lambda pair: Li(str(pair[0]), title=str(pair[1]))))
+
+    assert element.render() == '<ul><li title="1">a</li><li title="2">b</li></ul>'
+
+
+def test_for_each_with_non_string_values_renders_like_the_client():
+    items = State("flags", [{"done": True, "note": None}, {"done": False, "note": "x"}])
+    with ViewContext():
+        element = Ul(ForEach(items, lambda item: Li(f"{item['done']}", title=item["note"])))
+        checked = ForEach(items, lambda item: Li("none" if item["note"] is None else "some"))
+
+    assert element.render() == '<ul><li title="">true</li><li title="x">false</li></ul>'
+    assert checked.render() == "<li>none</li><li>some</li>"
+
+
+def test_for_each_with_data_dependent_factory():
+    items = State("todos", [{"done": True}, {"done": False}])
+    with ViewContext():
+        element = Ul(ForEach(items, lambda item: Li("Todo", classes="done" if item["done"] else None)))
+
+    assert element.render() == '<ul><li class="done">Todo</li><li>Todo</li></ul>'
+
+
+def test_for_each_with_prototype_element():
+    with ViewContext():
+        element = ForEach(State("rows", [1, 2, 3]), Li("Row"))
+
+    assert element.render() == "<li>Row</li><li>Row</li><li>Row</li>"
+
+
+def test_generated_ids_are_deterministic_per_view():
+    def view():
+        active = State("active", False)
+        return Div(
+            P("One", on_click=ConsoleLog("one")),
+            P("Two", show=When(active)),
+            static_component(lambda: P("Three", on_click=ConsoleLog("three")))(),
+        )
+
+    renders = []
+    for _ in range(2):
+        with ViewContext(id_scope="v_1") as ctx:
+            renders.append(view().render() + to_json(ctx.get_actions()))
+
+    assert renders[0] == renders[1]
+    assert 'id="el_v_1_0"' in renders[0]
+    assert 'id="el_v_1_2"' in renders[0]
+
+
+def test_generated_ids_without_scope_are_random():
+    with ViewContext():
+        first, second = Id.generate("el"), Id.generate("el")
+
+    assert first.value != second.value
+
+
+def test_island_claims_the_deferred_partial():
+    with ViewContext() as ctx:
+        fragment = DeferredFragment(id="v_partial")
+        island = Island(fragment, placeholder=P("Loading..."), trigger="idle")
+
+    assert fragment.claimed
+    assert island.render() == '<fragment id="v_partial"><p>Loading...</p></fragment>'
+    assert to_json(ctx.get_actions()) == '[["loadIsland", ["v_partial", "idle"]]]'
+
+
+def test_island_with_rendered_children():
+    with ViewContext() as ctx:
+        island = Island(Ul(Li("Great")), placeholder=P("Loading..."))
+
+    assert island.render() == "<ul><li>Great</li></ul>"
+    assert ctx.get_actions() is None
+
+    with pytest.raises(ValueError, match="Unknown island trigger"):
+        Island(None, trigger="never")  # type: ignore[arg-type]
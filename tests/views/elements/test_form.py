@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from nik.utils.string import to_json
+from nik.views.callbacks import UpdateState
+from nik.views.context import ViewContext
+from nik.views.data import State
+from nik.views.elements import Button, Form, Input
+
+
+def test_form_sends_its_optimistic_updates_with_listen_submit():
+    with ViewContext() as ctx:
+        todos = State("todos", [], key="todos")
+        form = Form(
+            Input(name="title"),
+            optimistic=UpdateState(todos, {"title": "{{form.title}}"}, "append"),
+        )
+
+    actions = {name: params for name, *params in ctx.get_actions() or []}
+    assert actions["registerObservable"] == [
+        ["todos", []],
+        [f"{form.id}_form_state", "ready"],
+    ]
+    assert actions["listenSubmit"] == [[form.id, False, [["todos", None, {"title": "{{form.title}}"}, "append"]]]]
+
+
+def test_button_registers_its_optimistic_updates():
+    with ViewContext() as ctx:
+        done = State("done", False, key="done")
+        button = Button("Done", optimistic=[UpdateState(done, True)])
+
+    actions = {name: params for name, *params in ctx.get_actions() or []}
+    assert button.id is not None
+    assert actions["registerObservable"] == [["done", False]]
+    assert actions["optimistic"] == [[button.id, [["done", None, True, None]]]]
+
+
+def test_form_without_optimistic_updates_keeps_its_actions():
+    with ViewContext() as ctx:
+        form = Form(Input(name="title"), id="todo")
+
+    assert to_json(ctx.get_actions()) == to_json([["listenSubmit", [form.id, False]]])
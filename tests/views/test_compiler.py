@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from nik.views.compiler import CompiledElement, compiled_view
+from nik.views.context import Page, ViewContext
+from nik.views.data import State, When
+from nik.views.elements import Body, Div, Fragment, Head, Html, Script, Title
+
+
+@pytest.fixture
+def ctx():
+    with ViewContext(page=Page("/")) as ctx:
+        yield ctx
+
+
+def test_compiled_view_fills_route_args(ctx):
+    calls = []
+
+    @compiled_view
+    def view(patient_id: str):
+        calls.append(patient_id)
+        return Div(f"Patient ID={patient_id}", id=patient_id)
+
+    first = view(patient_id="1")
+    second = view(patient_id="2")
+
+    assert isinstance(second, CompiledElement)
+    assert first.render() == '<div id="1">Patient ID=1</div>'
+    assert second.render() == '<div id="2">Patient ID=2</div>'
+    # Traced twice on the first call, never called again afterwards.
+    assert len(calls) == 2
+
+
+def test_compiled_layout_with_children_and_page(ctx):
+    @compiled_view
+    def layout(children, page: Page):
+        return Html(Head(Title(page.title)), Body("Root layout", children))
+
+    ctx.page.title = "Patients"
+    result = layout(children=Fragment(Div("Home"), id="v_1"), page=ctx.page)
+    result.add_child(Script("run()"))
+
+    assert result.render() == (
+        "<html><head><title>Patients</title></head>"
+        '<body>Root layout<fragment id="v_1"><div>Home</div></fragment></body>'
+        "<script>run()</script></html>"
+    )
+
+
+async def test_compiled_async_view(ctx):
+    @compiled_view
+    async def view(name: str):
+        return Div(name)
+
+    assert (await view(name="nik")).render() == "<div>nik</div>"
+    result = await view(name="web")
+    assert isinstance(result, CompiledElement)
+    assert result.render() == "<div>web</div>"
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        lambda value: Div("one" if value == "1" else value),
+        lambda value: Div(str(len(value))),
+        lambda value: Div(value.upper()),
+        lambda value: Div(f"{value:>4}"),
+        lambda value: Div(value, id="el", show=When(State("visible", True))),
+        lambda value, query: Div(value),
+        lambda value: Div("set" if value else "empty"),
+        lambda value: Div("none" if value is None else "some"),
+    ],
+)
+def test_data_dependent_views_fall_back(ctx, func):
+    view = compiled_view(func)
+    kwargs: dict[str, Any] = {"value": "1"}
+    if "query" in func.__code__.co_varnames:
+        kwargs["query"] = {}
+
+    expected = func(**kwargs).render()
+    result = view(**kwargs)
+
+    assert not isinstance(result, CompiledElement)
+    assert result.render() == expected
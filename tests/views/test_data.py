@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import pytest
+from nik.utils.string import to_json
+from nik.views.context import ViewContext
+from nik.views.data import FROZEN_DICT_MAX_DEPTH, FrozenDict, FrozenList, State
+
+
+def test_frozen_list_shares_storage_with_the_latest_list():
+    first = FrozenList([1, 2])
+    second = first.with_appended(3)
+    third = second.with_extended([4, 5])
+
+    assert third._items is first._items
+    assert first == [1, 2]
+    assert second == [1, 2, 3]
+    assert third == [1, 2, 3, 4, 5]
+    assert third[-1] == 5
+    assert third[1:3] == [2, 3]
+
+
+def test_frozen_list_copies_when_an_older_list_is_appended():
+    first = FrozenList([1])
+    second = first.with_appended(2)
+    branch = first.with_appended(3)
+
+    assert branch._items is not first._items
+    assert second == [1, 2]
+    assert branch == [1, 3]
+    assert list(first) == [1]
+
+
+def test_frozen_list_has_no_mutating_list_methods():
+    items = FrozenList([1])
+
+    for name in ("append", "extend", "insert"):
+        with pytest.raises(AttributeError):
+            getattr(items, name)
+    assert items.with_inserted(0, 0) == [0, 1]
+    assert items == [1]
+
+
+def test_frozen_dict_layers_changes_without_modifying_the_original():
+    original = {"a": 1}
+    first = FrozenDict(original)
+    second = first.set("b", 2)
+    third = second.set("a", 3)
+
+    assert original == {"a": 1}
+    assert dict(first) == {"a": 1}
+    assert dict(second) == {"a": 1, "b": 2}
+    assert third == {"a": 3, "b": 2}
+    assert "c" not in third
+
+
+def test_frozen_dict_merges_layers():
+    value = FrozenDict({"a": 0})
+    for i in range(FROZEN_DICT_MAX_DEPTH * 2 + 1):
+        value = value.set("a", i + 1)
+
+    assert value._depth <= FROZEN_DICT_MAX_DEPTH
+    assert value["a"] == FROZEN_DICT_MAX_DEPTH * 2 + 1
+
+
+def test_updated_state_values_behave_like_a_list_and_a_dict():
+    with ViewContext():
+        items = State("items", [1]).append(2)
+        removed = State("tags", {"a": 1, "b": 2}).remove("a")
+
+    assert str(items) == items.render() == repr(items.value) == "[1, 2]"
+    assert items.value + [3] == [1, 2, 3]
+    assert [0] + items.value == [0, 1, 2]
+    assert to_json(items.value) == "[1, 2]"
+
+    assert str(removed) == removed.render() == "{'b': 2}"
+    assert removed.value | {"c": 3} == {"b": 2, "c": 3}
+    assert {"z": 0} | removed.value == {"z": 0, "b": 2}
+    assert to_json(removed.value) == '{"b": 2}'
+
+
+def test_state_append_keeps_previous_values():
+    with ViewContext() as ctx:
+        items = State("items", [{"id": 1}])
+        updated = items.append({"id": 2}).append({"id": 3})
+
+    assert items.value == [{"id": 1}]
+    assert updated.value == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert to_json(updated.value) == '[{"id": 1}, {"id": 2}, {"id": 3}]'
+    (action,) = ctx.actions["updateState"]
+    assert action.to_action()[2:] == [[{"id": 2}, {"id": 3}], "extend"]
+
+
+def test_state_appends_are_merged_until_another_update():
+    with ViewContext() as ctx:
+        items = State("items", [0])
+        other = State("other", [])
+        for i in range(1, 4):
+            items = items.append(i)
+        items = items.extend([4, 5])
+        other = other.append("a")
+        items = items.append(6).remove(0).append(7)
+
+    assert items.value == [1, 2, 3, 4, 5, 6, 7]
+    assert [action.to_action()[2:] for action in ctx.actions["updateState"]] == [
+        [[1, 2, 3, 4, 5], "extend"],
+        ["a", "append"],
+        [6, "append"],
+        [0, "remove"],
+        [7, "append"],
+    ]
+
+
+def test_state_set_item_keeps_previous_value():
+    with ViewContext() as ctx:
+        user = State("user", {"name": "Nik"})
+        user["age"] = 3
+
+    (action,) = ctx.actions["updateState"]
+    assert user.value == {"name": "Nik"}
+    assert action.to_action() == [user.key, "age", 3, None]
+
+
+def test_state_delta_operations_send_only_the_changes():
+    with ViewContext() as ctx:
+        rows = State("rows", [{"name": "a"}, {"name": "b"}, {"name": "c"}])
+        updated = rows.remove(-1).insert(0, {"name": "z"}).patch([1, "name"], "x").move(0, -1)
+
+    assert rows.value == [{"name": "a"}, {"name": "b"}, {"name": "c"}]
+    assert updated.value == [{"name": "x"}, {"name": "b"}, {"name": "z"}]
+    assert [action.to_action()[2:] for action in ctx.actions["updateState"]] == [
+        [2, "remove"],
+        [[0, {"name": "z"}], "insert"],
+        [[[1, "name"], "x"], "patch"],
+        [[0, 2], "move"],
+    ]
+
+
+def test_state_delta_operations_on_dicts():
+    with ViewContext() as ctx:
+        user = State("user", {"name": "Nik", "tags": ["a"], "age": 3})
+        updated = user.patch(["tags", 0], "b").remove("age")
+
+    assert user.value == {"name": "Nik", "tags": ["a"], "age": 3}
+    assert updated.value == {"name": "Nik", "tags": ["b"]}
+    assert [action.to_action()[2:] for action in ctx.actions["updateState"]] == [
+        [[["tags", 0], "b"], "patch"],
+        ["age", "remove"],
+    ]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from nik.views.callbacks import InsertElements
+from nik.views.context import ViewContext
+from nik.views.data import Id
+from nik.views.elements import A, Li
+from nik.views.templates import get_item_template
+
+
+def make_factory(prefix: str):
+    return lambda item: Li(A(item["name"], href=f"{prefix}/{item['id']}"))
+
+
+def test_item_template_is_compiled_and_cached():
+    with ViewContext():
+        template = get_item_template(make_factory("/users"))
+        again = get_item_template(make_factory("/users"))
+        other = get_item_template(make_factory("/admins"))
+
+    assert template.is_compiled
+    assert template is again
+    assert other is not template
+    assert template.html == '<li><a href="/users/{{value.id}}">{{value.name}}</a></li>'
+
+
+def test_item_template_fill_escapes_values_like_the_client():
+    factory = make_factory("/users")
+    with ViewContext():
+        template = get_item_template(factory)
+        items = [{"id": '1" onclick="x', "name": "<b>Nik</b>"}, {"id": 2.0, "name": None}, {"id": 3, "name": False}]
+        rendered = template.render(items, factory)
+
+    assert template.fill(items[0]) == '<li><a href="/users/1&quot; onclick=&quot;x">&lt;b&gt;Nik&lt;/b&gt;</a></li>'
+    assert template.fill(items[1]) == '<li><a href="/users/2"></a></li>'
+    assert template.fill(items[2]) == '<li><a href="/users/3">false</a></li>'
+    assert rendered == "".join(template.fill(item) or "" for item in items)
+
+
+def test_item_template_with_non_scalar_values_is_rendered_by_the_factory():
+    factory = make_factory("/users")
+    with ViewContext():
+        template = get_item_template(factory)
+        rendered = template.render([{"id": 1, "name": ["a", "b"]}], factory)
+
+    assert rendered == '<li><a href="/users/1">ab</a></li>'
+
+
+def test_item_template_binds_attributes_to_values():
+    with ViewContext():
+        template = get_item_template(lambda row: Li(row["label"], title=row["hint"], data_count=row["count"]))
+
+    assert template.is_compiled
+    assert template.fill({"label": "Nik", "hint": "", "count": 3}) == '<li title="" data_count="3">Nik</li>'
+
+
+def test_data_dependent_factory_is_not_compiled():
+    with ViewContext():
+        template = get_item_template(lambda item: Li("x", classes="done" if item["done"] else None))
+        transformed = get_item_template(lambda item: Li(item["name"].upper()))
+
+    assert not template.is_compiled
+    assert not transformed.is_compiled
+
+
+def test_insert_elements_uses_the_item_template():
+    with ViewContext():
+        action = InsertElements(make_factory("/users"), parent_id=Id("users")).to_action()
+
+    assert action[1] == '<li><a href="/users/{{value.id}}">{{value.name}}</a></li>'